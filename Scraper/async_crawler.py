@@ -0,0 +1,283 @@
+"""Browserless scraper: fetches listing and detail pages with aiohttp.
+
+Produces the same job_data as ``ActuaryListScraper`` (through ``CardParser``)
+without starting Chrome. Requests share one keep-alive connection pool, are
+limited per host, spaced by a politeness delay and retried with exponential
+backoff on connection errors, 429 and 5xx responses:
+
+    python async_crawler.py --max-jobs 100 --concurrency 4 --delay 0.5
+    python async_crawler.py --jobs-url http://127.0.0.1:8765/jobs   # against stub_site.py
+
+Listing pages are followed one after another (each names the next); detail
+pages, when ``--details`` is given, are fetched concurrently for cards
+without a description.
+
+Runs are incremental: ``--state`` keeps the postings and page validators
+seen so far, listing pages are requested conditionally, known postings are
+skipped and crawling stops at the first page with nothing new. ``--no-state``
+scrapes everything.
+
+Jobs are written to ``--output`` as they are scraped and, with ``--upload``,
+streamed to the API through ``upload_pipeline.UploadPipeline``.
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+from card_parser import CardParser
+from crawl_state import CrawlReport, CrawlState
+from upload_pipeline import API_URL, JsonArrayWriter, UploadPipeline, tee
+
+BASE_URL = "https://www.actuarylist.com"
+USER_AGENT = 'Mozilla/5.0 (compatible; JobListingScraper/1.0)'
+
+# Worth another try: rate limiting and server-side trouble
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+@dataclass
+class Page:
+    url: str
+    status: int
+    text: str
+    headers: CIMultiDict = field(default_factory=CIMultiDict)
+
+
+class FetchError(Exception):
+    """A page could not be fetched after all retries"""
+
+
+class AsyncFetcher:
+    """Fetches pages over a shared aiohttp session with per-host limits.
+
+    ``concurrency`` caps requests in flight per host, ``delay`` is the least
+    time between two request starts on the same host, and failed requests are
+    retried up to ``retries`` times, waiting ``backoff * 2**attempt`` seconds
+    plus jitter, or what Retry-After asks for.
+    """
+
+    def __init__(self, concurrency=4, delay=0.5, retries=3, backoff=0.5, timeout=20):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'bytes': 0}
+        self._host_slots = {}
+        self._host_locks = {}
+        self._host_next_start = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout, headers={'User-Agent': USER_AGENT}
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.concurrency)
+            self._host_locks[host] = asyncio.Lock()
+            self._host_next_start[host] = 0.0
+        return host
+
+    async def _wait_politely(self, host):
+        # Reserve the next start time under the lock, then sleep outside it
+        async with self._host_locks[host]:
+            now = time.monotonic()
+            start = max(now, self._host_next_start[host])
+            self._host_next_start[host] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _retry_wait(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass  # An HTTP date; fall back to backoff
+        return self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+
+    async def fetch(self, url, headers=None):
+        """GET ``url``; returns a Page for any final status, raises FetchError if unreachable"""
+        host = self._host(url)
+        async with self._host_slots[host]:
+            for attempt in range(self.retries + 1):
+                await self._wait_politely(host)
+                self.stats['requests'] += 1
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        text = await response.text(errors='replace')
+                        self.stats['bytes'] += len(text)
+                        page = Page(str(response.url), response.status, text, CIMultiDict(response.headers))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if attempt == self.retries:
+                        self.stats['failures'] += 1
+                        raise FetchError(f'{url}: {e!r}') from e
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self._retry_wait(attempt))
+                    continue
+
+                if page.status in RETRY_STATUSES and attempt < self.retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self._retry_wait(attempt, page.headers.get('Retry-After')))
+                    continue
+                return page
+
+
+class AsyncJobCrawler:
+    """Follows listing pages from ``jobs_url`` and extracts up to ``max_jobs`` jobs.
+
+    With a CrawlState, only new and changed postings are returned and counted
+    in ``report``; the caller records each one in the state once it is saved
+    and then commits it.
+    """
+
+    def __init__(self, jobs_url=f"{BASE_URL}/jobs", max_jobs=50, fetch_details=False,
+                 base_url=BASE_URL, state=None, **fetcher_options):
+        self.jobs_url = jobs_url
+        self.max_jobs = max_jobs
+        self.fetch_details = fetch_details
+        self.parser = CardParser(base_url)
+        self.state = state
+        self.report = CrawlReport()
+        self.fetcher_options = fetcher_options
+        self.stats = {}
+
+    async def _add_description(self, fetcher, job_data):
+        try:
+            page = await fetcher.fetch(job_data['url'])
+        except FetchError as e:
+            print(f"Error fetching details: {e}")
+            return
+        if page.status == 200:
+            job_data['description'] = await asyncio.to_thread(self.parser.detail_description, page.text)
+
+    async def crawl(self, sink=None):
+        """The scraped jobs, or with a ``sink``, pass each page's jobs to it and return []"""
+        jobs = []
+        scraped = 0
+        pages = 0
+        started = time.perf_counter()
+        async with AsyncFetcher(**self.fetcher_options) as fetcher:
+            url = self.jobs_url
+            seen_urls = set()
+            while url and scraped < self.max_jobs and url not in seen_urls:
+                seen_urls.add(url)
+                print(f"Fetching page {pages + 1}: {url}")
+                page_url = url
+                headers = self.state.conditional_headers(page_url) if self.state else None
+                try:
+                    page = await fetcher.fetch(page_url, headers)
+                except FetchError as e:
+                    print(f"Error fetching listing page: {e}")
+                    break
+                if page.status == 304:
+                    self.report.not_modified_pages += 1
+                    print("Page not modified since the last run, stopping")
+                    break
+                if page.status != 200:
+                    print(f"Listing page returned {page.status}, stopping")
+                    break
+                pages += 1
+                # Parsing is CPU-bound; keep the event loop free for other fetches
+                card_count, page_jobs, url = await asyncio.to_thread(
+                    self.parser.parse_listing, page.text, page.url
+                )
+                print(f"Found {card_count} job elements on page {pages}")
+                fresh_jobs = []
+                observed = 0
+                for job_data in page_jobs:
+                    if scraped >= self.max_jobs:
+                        break
+                    observed += 1
+                    if self.state is None or self.state.observe(job_data, self.report):
+                        fresh_jobs.append(job_data)
+                        scraped += 1
+
+                if self.fetch_details:
+                    await asyncio.gather(*(
+                        self._add_description(fetcher, job_data) for job_data in fresh_jobs
+                        if not job_data['description'] and job_data['url']
+                    ))
+                for job_data in fresh_jobs:
+                    if sink is not None:
+                        # A blocking sink (a full upload queue) must not stall the event loop
+                        await asyncio.to_thread(sink, job_data)
+                    else:
+                        jobs.append(job_data)
+
+                if self.state is not None:
+                    if observed == len(page_jobs):
+                        # Only once every card on it was looked at, or a 304 would hide the rest
+                        self.state.remember_page(page_url, page.headers)
+                    if page_jobs and not fresh_jobs:
+                        print("Every posting on this page is already known, stopping")
+                        break
+            self.stats = dict(fetcher.stats, pages=pages, jobs=scraped,
+                              seconds=round(time.perf_counter() - started, 3))
+        return jobs
+
+    def run(self, sink=None):
+        return asyncio.run(self.crawl(sink))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs-url', default=f"{BASE_URL}/jobs", help='First listing page')
+    parser.add_argument('--max-jobs', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight per host')
+    parser.add_argument('--delay', type=float, default=0.5, help='Seconds between request starts per host')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--details', action='store_true', help='Fetch detail pages for missing descriptions')
+    parser.add_argument('--output', default='scraped_jobs.json')
+    parser.add_argument('--state', default='crawl_state.db', help='Crawl state file for incremental runs')
+    parser.add_argument('--no-state', action='store_true', help='Scrape everything, ignoring the state')
+    parser.add_argument('--upload', action='store_true', help='Upload jobs to the API while scraping')
+    parser.add_argument('--api-url', default=API_URL)
+    parser.add_argument('--upload-workers', type=int, default=4, help='Concurrent upload connections')
+    args = parser.parse_args()
+
+    state = None if args.no_state else CrawlState(args.state)
+    record = state.record if state is not None else None
+    crawler = AsyncJobCrawler(
+        args.jobs_url, args.max_jobs, args.details, state=state,
+        concurrency=args.concurrency, delay=args.delay, retries=args.retries
+    )
+    try:
+        failed = 0
+        with JsonArrayWriter(args.output) as backup:
+            if args.upload:
+                with UploadPipeline(args.api_url, workers=args.upload_workers, on_uploaded=record) as pipeline:
+                    crawler.run(sink=tee(backup.write, pipeline.put))
+                failed = pipeline.stats['failed']
+            else:
+                # The JSON file is the only copy, so written means saved
+                crawler.run(sink=tee(backup.write, record) if record else backup.write)
+        print(f"Scraping completed. Total jobs scraped: {backup.count} ({crawler.stats})")
+        if state is not None:
+            print(f"Postings: {crawler.report}")
+        print(f"Jobs saved to {args.output}")
+        if args.upload:
+            print(pipeline.report())
+        if state is not None:
+            # Only the postings that were saved become known; an error skips this
+            state.commit(complete=not failed)
+    finally:
+        if state is not None:
+            state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare cards/sec of WebDriver and page-source extraction.
+
+Builds a synthetic listing page and extracts every card twice, through
+``ActuaryListScraper.find_job_cards`` and the extractor it picks:
+
+* ``webdriver``: the per-field ``find_element`` lookups of
+  ``ActuaryListScraper.extract_job_data``
+* ``page_source``: one ``page_source`` call per page, parsed by ``CardParser``
+
+Without ``--chrome``, the WebDriver is ``replay.ReplayDriver``: every driver
+call costs ``--rpc-ms`` of latency, a local chromedriver round trip being
+about 1-5 ms. With ``--chrome`` (needs Chrome), both modes run
+against a real headless browser that has the page loaded from a file. Either
+way, the script checks that both modes return the same job_data:
+
+    python bench_extraction.py --cards 200 --rpc-ms 2
+    python bench_extraction.py --cards 200 --chrome
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from replay import ReplayDriver, snapshot
+from scrape import ActuaryListScraper
+from stub_site import listing_page, make_postings
+
+BASE_URL = "https://www.actuarylist.com"
+
+
+def extract_with(extraction):
+    """(card count, job_data list) for the driver's current page, as the scraper extracts it"""
+    def extract(driver):
+        scraper = ActuaryListScraper(extraction=extraction, state_path=None, driver=driver)
+        cards, extract_card = scraper.find_job_cards()
+        return len(cards), [job for job in map(extract_card, cards) if job]
+    return extract
+
+
+def comparable(jobs):
+    # posting_date is relative to now, so compare its age in whole days
+    return [snapshot(job) for job in jobs]
+
+
+def run(name, extract, driver, round_trips=None):
+    start = time.perf_counter()
+    cards, jobs = extract(driver)
+    seconds = time.perf_counter() - start
+    calls = '' if round_trips is None else f'{round_trips() / max(cards, 1):9.2f}'
+    print(f'{name:<12} {cards:>6} {len(jobs):>6} {seconds:9.3f} {cards / seconds:10.1f} {calls}')
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, default=200, help='Job cards on the page')
+    parser.add_argument('--rpc-ms', type=float, default=2.0, help='Latency of one simulated WebDriver call')
+    parser.add_argument('--chrome', action='store_true', help='Use a real headless Chrome')
+    args = parser.parse_args()
+
+    html = listing_page(make_postings(args.cards))
+    print(f'{args.cards} cards, {len(html) / 1024:.0f} KiB of HTML')
+    print(f'{"mode":<12} {"cards":>6} {"jobs":>6} {"seconds":>9} {"cards/s":>10} {"calls/card":>9}')
+
+    if args.chrome:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        driver = webdriver.Chrome(options=options)
+        path = os.path.join(tempfile.mkdtemp(prefix='bench_extraction_'), 'jobs.html')
+        with open(path, 'w') as page:
+            page.write(html)
+        try:
+            driver.get(f'file://{path}')
+            before = run('webdriver', extract_with('webdriver'), driver)
+            after = run('page_source', extract_with('page_source'), driver)
+        finally:
+            driver.quit()
+        # file:// pages resolve links against the file, not the site
+        for job in before + after:
+            job['url'] = job['url'].rsplit('/', 1)[-1]
+    else:
+        driver = ReplayDriver({f'{BASE_URL}/jobs': html}, args.rpc_ms / 1000)
+        driver.get(f'{BASE_URL}/jobs')
+        driver.round_trips = 0
+        before = run('webdriver', extract_with('webdriver'), driver, lambda: driver.round_trips)
+        driver.round_trips = 0
+        after = run('page_source', extract_with('page_source'), driver, lambda: driver.round_trips)
+
+    if comparable(before) != comparable(after):
+        raise SystemExit('The two modes extracted different job data')
+    print('Both modes extracted identical job data')
+
+
+if __name__ == '__main__':
+    main()
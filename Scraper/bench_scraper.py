@@ -0,0 +1,188 @@
+"""Per-stage throughput of each scraper mode, replayed from a fixture.
+
+Every listing page of a recorded fixture (see ``replay.py``) goes through the
+stages of a scrape, timed one after another so each stage's cost shows:
+
+* fetch: load the page (``ReplayDriver.get`` and, for page_source, the
+  ``page_source`` call; an HTTP GET from ``StubSite`` for http)
+* extract: turn the page into job_data; in the browser modes, everything
+  else ``ActuaryListScraper.scrape_jobs`` does, paging included
+* normalize: ``validate_job``, the checks the API would apply
+* upload: POST the jobs through ``UploadPipeline`` to a local ``StubApi``
+
+The modes are the scrapers' three ways in: ``webdriver`` (per-field
+``find_element`` lookups), ``page_source`` (``CardParser`` over one snapshot
+per page), both run by ``ActuaryListScraper`` against a ``ReplayDriver``, and
+``http`` (the async crawler's fetcher, no browser). Driver
+calls cost ``--rpc-ms``; browser rendering time is not modelled. calls/card
+counts WebDriver calls, or HTTP requests in http mode:
+
+    python bench_scraper.py synthetic --repeat 5 --rpc-ms 2
+    python bench_scraper.py fixtures/actuarylist --modes page_source,http --api-latency-ms 20 --json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+from async_crawler import AsyncFetcher
+from card_parser import CardParser
+from replay import BASE_URL, Fixture, ReplayDriver, fixture_path, site_path
+from scrape import ActuaryListScraper
+from stub_site import StubApi, StubSite
+from upload_pipeline import UploadPipeline, ValidationFailed, validate_job
+
+MODES = ['webdriver', 'page_source', 'http']
+STAGES = ['fetch', 'extract', 'normalize', 'upload']
+
+
+class StageTimer:
+    """Seconds spent per stage"""
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+
+    def time(self, stage, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.seconds[stage] += time.perf_counter() - start
+        return result
+
+
+class TimedReplayDriver(ReplayDriver):
+    """ReplayDriver that books page loads to the fetch stage"""
+
+    def __init__(self, pages, rpc_seconds, timer):
+        super().__init__(pages, rpc_seconds)
+        self.timer = timer
+
+    def get(self, url):
+        self.timer.time('fetch', super().get, url)
+
+    @property
+    def page_source(self):
+        return self.timer.time('fetch', ReplayDriver.page_source.fget, self)
+
+
+def scrape_with_driver(mode, fixture, repeat, timer, rpc_seconds):
+    parser = CardParser(BASE_URL)
+    cards = repeat * sum(parser.extract_page(fixture.html(url), url)[0] for url in fixture.listing_urls())
+    pages = {url: fixture.html(url) for url in fixture.urls}
+    jobs, round_trips = [], 0
+    for _ in range(repeat):
+        driver = TimedReplayDriver(pages, rpc_seconds, timer)
+        scraper = ActuaryListScraper(max_jobs=cards, extraction=mode, state_path=None, driver=driver, delay=0)
+        fetched = timer.seconds['fetch']
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # It prints every job
+            jobs += scraper.scrape_jobs()
+        # Whatever was not spent loading pages went into extracting them
+        timer.seconds['extract'] += time.perf_counter() - start - (timer.seconds['fetch'] - fetched)
+        round_trips += driver.round_trips
+    return cards, jobs, round_trips
+
+
+def scrape_with_http(fixture, urls, timer, site_latency):
+    parser = CardParser(BASE_URL)
+
+    async def fetch_all(site_url):
+        async with AsyncFetcher(concurrency=1, delay=0) as fetcher:
+            return [(await fetcher.fetch(site_url + site_path(url))).text for url in urls]
+
+    with StubSite(fixture.site_pages(), latency=site_latency) as site:
+        pages = timer.time('fetch', asyncio.run, fetch_all(site.url))
+    cards, jobs = 0, []
+    for url, html in zip(urls, pages):
+        count, page_jobs = timer.time('extract', parser.extract_page, html, url)
+        cards += count
+        jobs += page_jobs
+    return cards, jobs, len(pages)
+
+
+def normalize(jobs):
+    payloads = []
+    for job_data in jobs:
+        try:
+            payloads.append(validate_job(job_data))
+        except ValidationFailed:
+            pass
+    return payloads
+
+
+def upload(payloads, api_latency, workers, timer):
+    with StubApi(latency=api_latency, keep_jobs=False) as api:
+        # Only the pipeline is timed, not starting and stopping the stand-in
+        with UploadPipeline(api.jobs_url, workers=workers) as pipeline:
+            for payload in payloads:
+                pipeline.put(payload)
+    timer.seconds['upload'] += pipeline.seconds
+    return pipeline.uploaded
+
+
+def bench_mode(mode, fixture, urls, args):
+    timer = StageTimer()
+    if mode == 'http':
+        cards, jobs, calls = scrape_with_http(fixture, urls, timer, args.site_latency_ms / 1000)
+    else:
+        cards, jobs, calls = scrape_with_driver(mode, fixture, args.repeat, timer, args.rpc_ms / 1000)
+    payloads = timer.time('normalize', normalize, jobs)
+    uploaded = upload(payloads, args.api_latency_ms / 1000, args.upload_workers, timer)
+
+    scrape_seconds = timer.seconds['fetch'] + timer.seconds['extract']
+    return {
+        'mode': mode,
+        'pages': len(urls),
+        'cards': cards,
+        'jobs': len(jobs),
+        'valid': len(payloads),
+        'uploaded': uploaded,
+        'calls_per_card': round(calls / max(cards, 1), 2),
+        'pages_per_second': round(len(urls) / scrape_seconds, 1) if scrape_seconds else None,
+        'cards_per_second': round(cards / scrape_seconds, 1) if scrape_seconds else None,
+        'stage_seconds': {stage: round(seconds, 4) for stage, seconds in timer.seconds.items()},
+    }
+
+
+def print_results(fixture, results):
+    print(f'{fixture.directory}: {results[0]["pages"]} pages, {results[0]["cards"]} cards per mode')
+    print(f'{"mode":<12} {"pages/s":>8} {"cards/s":>9} {"calls/card":>10} '
+          + ' '.join(f'{stage:>9}' for stage in STAGES) + f' {"uploaded":>8}')
+    for result in results:
+        print(f'{result["mode"]:<12} {result["pages_per_second"]:>8} {result["cards_per_second"]:>9} '
+              f'{result["calls_per_card"]:>10} '
+              + ' '.join(f'{result["stage_seconds"][stage]:>8.3f}s' for stage in STAGES)
+              + f' {result["uploaded"]:>8}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fixture', nargs='?', default='synthetic', help='Fixture name or directory')
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated subset of ' + ','.join(MODES))
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the listing pages this many times')
+    parser.add_argument('--rpc-ms', type=float, default=2.0, help='Latency of one WebDriver call')
+    parser.add_argument('--site-latency-ms', type=float, default=0.0, help='Latency of each page request (http)')
+    parser.add_argument('--api-latency-ms', type=float, default=0.0, help='Latency of each upload')
+    parser.add_argument('--upload-workers', type=int, default=4)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    fixture = Fixture(fixture_path(args.fixture))
+    urls = fixture.listing_urls() * args.repeat
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f'unknown modes: {", ".join(sorted(unknown))}')
+
+    results = [bench_mode(mode, fixture, urls, args) for mode in modes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(fixture, results)
+    if len({result['jobs'] for result in results}) > 1:
+        raise SystemExit('The modes extracted different numbers of jobs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""Job card extraction shared by the WebDriver and page-source scraping modes.
+
+``ActuaryListScraper`` used to ask the browser for every field of every card,
+trying each CSS selector in turn: dozens of WebDriver round trips per card.
+``CardParser`` instead takes one ``driver.page_source`` per page and finds the
+same elements locally with precompiled selectors. Both modes go through
+``build_job_data`` so they produce the same ``job_data`` dicts.
+
+This module does not import selenium, so it can also parse pages fetched
+without a browser.
+"""
+import re
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, NavigableString, Comment
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Same value as selenium's By.CSS_SELECTOR
+CSS_SELECTOR = 'css selector'
+
+JOB_CARD_SELECTOR = ".job-listing, .job-card, .job-item, [class*='job'], .listing-item"
+FALLBACK_CARD_SELECTOR = "article, .card, [data-job], .position"
+
+# Tried in order; the first element found with non-empty text wins
+FIELD_SELECTORS = {
+    'title': [
+        ".job-title", ".title", "h2", "h3", "h4",
+        "[class*='title']", ".position-title", ".job-name"
+    ],
+    'company': [
+        ".company", ".company-name", ".employer",
+        "[class*='company']", ".organization", ".firm"
+    ],
+    'location': [
+        ".location", ".job-location", ".city",
+        "[class*='location']", ".address", ".place"
+    ],
+    'date': [
+        ".date", ".posted", ".job-date",
+        "[class*='date']", ".time", ".posted-date"
+    ],
+    'tags': [
+        ".tags", ".skills", ".categories",
+        "[class*='tag']", ".keywords", ".labels"
+    ],
+    'description': [
+        ".description", ".job-description", ".summary",
+        "[class*='description']", ".details"
+    ],
+}
+
+# Links to the next results page, as tried by go_to_next_page
+NEXT_PAGE_SELECTORS = [
+    "a[aria-label='Next']", ".next", ".pagination-next",
+    "a:-soup-contains('Next')", ".page-next", "[class*='next']"
+]
+
+# Elements a browser renders on their own line, and ones it never renders
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'details', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table',
+    'tbody', 'thead', 'tfoot', 'tr', 'ul',
+])
+HIDDEN_TAGS = frozenset(['head', 'link', 'meta', 'noscript', 'script', 'style', 'template', 'title'])
+_HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.I)
+
+
+def parse_posting_date(date_text):
+    """Parse posting date from various formats"""
+    if not date_text:
+        return datetime.now()
+
+    date_text = date_text.lower().strip()
+
+    # Handle "X days ago", "X weeks ago", etc.
+    if "day" in date_text:
+        days_match = re.search(r'(\d+)\s*day', date_text)
+        if days_match:
+            days = int(days_match.group(1))
+            return datetime.now() - timedelta(days=days)
+
+    if "week" in date_text:
+        weeks_match = re.search(r'(\d+)\s*week', date_text)
+        if weeks_match:
+            weeks = int(weeks_match.group(1))
+            return datetime.now() - timedelta(weeks=weeks)
+
+    if "month" in date_text:
+        months_match = re.search(r'(\d+)\s*month', date_text)
+        if months_match:
+            months = int(months_match.group(1))
+            return datetime.now() - timedelta(days=months*30)
+
+    # Handle "today", "yesterday"
+    if "today" in date_text:
+        return datetime.now()
+    if "yesterday" in date_text:
+        return datetime.now() - timedelta(days=1)
+
+    # Default to current date if parsing fails
+    return datetime.now()
+
+
+def extract_job_type(job_text):
+    """Extract job type from job text"""
+    job_text_lower = job_text.lower()
+
+    if any(word in job_text_lower for word in ['intern', 'internship']):
+        return 'Internship'
+    elif any(word in job_text_lower for word in ['part-time', 'part time']):
+        return 'Part-time'
+    elif any(word in job_text_lower for word in ['contract', 'contractor', 'consulting']):
+        return 'Contract'
+    elif any(word in job_text_lower for word in ['temporary', 'temp']):
+        return 'Temporary'
+    else:
+        return 'Full-time'
+
+
+def build_job_data(find_text, full_text, get_href, base_url):
+    """Assemble a job_data dict from a card.
+
+    ``find_text(field)`` returns the card's text for a FIELD_SELECTORS entry
+    (or None), ``full_text`` is the whole card's text and ``get_href()``
+    returns the first link's absolute URL. Returns None for cards without a
+    title.
+    """
+    job_data = {}
+
+    title = find_text('title')
+    if not title:
+        return None
+    job_data['title'] = title.strip()
+
+    company = find_text('company')
+    if not company:
+        company = "Unknown Company"
+    job_data['company'] = company.strip()
+
+    location = find_text('location')
+    if not location:
+        location = "Remote/Not Specified"
+    job_data['location'] = location.strip()
+
+    job_data['posting_date'] = parse_posting_date(find_text('date'))
+    job_data['job_type'] = extract_job_type(full_text)
+
+    tags_text = find_text('tags')
+    if tags_text:
+        # Split by common delimiters and clean
+        tags = [tag.strip() for tag in re.split(r'[,|•·]', tags_text) if tag.strip()]
+        job_data['tags'] = ','.join(tags[:5])  # Limit to 5 tags
+    else:
+        job_data['tags'] = ''
+
+    description = find_text('description')
+    job_data['description'] = description[:500] if description else ''  # Limit length
+
+    try:
+        href = get_href()
+        if href and href.startswith('http'):
+            job_data['url'] = href
+        elif href:
+            job_data['url'] = base_url + href
+        else:
+            job_data['url'] = ''
+    except Exception:
+        job_data['url'] = ''
+
+    return job_data
+
+
+def find_text_by_selectors(element, selectors):
+    """Try multiple CSS selectors on a WebDriver element to find text"""
+    for selector in selectors:
+        try:
+            found_element = element.find_element(CSS_SELECTOR, selector)
+            text = found_element.text.strip()
+            if text:
+                return text
+        except Exception:
+            continue
+    return None
+
+
+def _is_hidden(tag):
+    if tag.name in HIDDEN_TAGS or tag.has_attr('hidden'):
+        return True
+    style = tag.get('style')
+    return bool(style) and _HIDDEN_STYLE.search(style) is not None
+
+
+def element_text(tag):
+    """Approximates WebDriver's ``element.text`` (rendered innerText).
+
+    Hidden elements are skipped, block elements start a new line, runs of
+    whitespace collapse to one space and blank lines are dropped. CSS from
+    stylesheets is not applied, so only inline ``display: none`` hides text;
+    like WebDriver, a hidden element has no text of its own.
+    """
+    if tag.name is not None and _is_hidden(tag):
+        return ''
+    pieces = []
+    stack = [tag]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            pieces.append('\n')  # Closing a block element
+        elif isinstance(node, NavigableString):
+            if not isinstance(node, Comment):
+                pieces.append(node)
+        elif node is tag or not _is_hidden(node):
+            block = node.name in BLOCK_TAGS
+            if block:
+                pieces.append('\n')
+                stack.append(None)
+            stack.extend(reversed(node.contents))
+    lines = (' '.join(line.split()) for line in ''.join(pieces).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+class CardParser:
+    """Extracts job cards from page HTML with selectors compiled once"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.card_selector = soupsieve.compile(JOB_CARD_SELECTOR)
+        self.fallback_card_selector = soupsieve.compile(FALLBACK_CARD_SELECTOR)
+        self.field_selectors = {
+            field: [soupsieve.compile(selector) for selector in selectors]
+            for field, selectors in FIELD_SELECTORS.items()
+        }
+        self.link_selector = soupsieve.compile('a')
+        self.next_page_selectors = [soupsieve.compile(selector) for selector in NEXT_PAGE_SELECTORS]
+
+    def parse(self, html):
+        return BeautifulSoup(html, HTML_PARSER)
+
+    def find_cards(self, soup):
+        """Job card elements in document order, like driver.find_elements"""
+        return self.card_selector.select(soup) or self.fallback_card_selector.select(soup)
+
+    def find_text(self, card, field):
+        # Like find_element: only the first match of each selector is looked at
+        for selector in self.field_selectors[field]:
+            found = selector.select_one(card)
+            if found is not None:
+                text = element_text(found)
+                if text:
+                    return text
+        return None
+
+    def extract_job_data(self, card, page_url):
+        """job_data for one card, resolving links against ``page_url`` like a browser"""
+        def get_href():
+            link = self.link_selector.select_one(card)
+            href = link.get('href') if link is not None else None
+            return urljoin(page_url, href.strip()) if href is not None else None
+
+        return build_job_data(
+            lambda field: self.find_text(card, field),
+            element_text(card),
+            get_href,
+            self.base_url,
+        )
+
+    def extract_page(self, html, page_url):
+        """(card count, job_data list) for every card with a title on the page"""
+        card_count, jobs, _ = self.parse_listing(html, page_url)
+        return card_count, jobs
+
+    def parse_listing(self, html, page_url):
+        """(card count, job_data list, next page URL or None) for a results page"""
+        soup = self.parse(html)
+        cards = self.find_cards(soup)
+        jobs = []
+        for card in cards:
+            job_data = self.extract_job_data(card, page_url)
+            if job_data:
+                jobs.append(job_data)
+        return len(cards), jobs, self.next_page_url(soup, page_url)
+
+    def next_page_url(self, soup, page_url):
+        for selector in self.next_page_selectors:
+            for link in selector.select(soup):
+                link = link if link.name == 'a' else link.find('a')
+                href = link.get('href') if link is not None else None
+                if href and not href.startswith(('#', 'javascript:')):
+                    return urljoin(page_url, href.strip())
+        return None
+
+    def detail_description(self, html):
+        """A detail page's description, cut like the card descriptions"""
+        description = self.find_text(self.parse(html), 'description')
+        return description[:500] if description else ''
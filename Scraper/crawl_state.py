@@ -0,0 +1,168 @@
+"""Persistent crawl state for incremental scraping.
+
+Remembers every posting seen (by URL, with a hash of its content) and the
+ETag/Last-Modified validators of fetched pages in a local SQLite file, so a
+re-scrape can skip postings it already has, ask servers for changed pages
+only, and stop paginating at the first page that holds nothing new.
+
+Nothing is written while scraping. Call ``record()`` for each job once it
+has been saved, then ``commit()`` at the end of the run, so postings that
+never reached the API are not marked as known.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+# Fields that identify a posting's content. posting_date is derived from
+# relative text like "3 days ago" and changes daily, so it is left out.
+HASHED_FIELDS = ('title', 'company', 'location', 'job_type', 'tags', 'description', 'url')
+
+NEW, CHANGED, UNCHANGED = 'new', 'changed', 'unchanged'
+
+
+def content_hash(job_data):
+    content = {name: job_data.get(name, '') for name in HASHED_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def posting_key(job_data):
+    """The posting URL, or its content when the card has no link"""
+    return job_data.get('url') or f"hash:{content_hash(job_data)}"
+
+
+class CrawlReport:
+    """New, changed and skipped postings of one run"""
+
+    def __init__(self):
+        self.new = 0
+        self.changed = 0
+        self.skipped = 0
+        self.not_modified_pages = 0
+
+    def count(self, status):
+        if status == NEW:
+            self.new += 1
+        elif status == CHANGED:
+            self.changed += 1
+        else:
+            self.skipped += 1
+
+    def as_dict(self):
+        return {'new': self.new, 'changed': self.changed, 'skipped': self.skipped,
+                'not_modified_pages': self.not_modified_pages}
+
+    def __str__(self):
+        text = f"{self.new} new, {self.changed} changed, {self.skipped} skipped"
+        if self.not_modified_pages:
+            text += f", {self.not_modified_pages} pages not modified"
+        return text
+
+
+class CrawlState:
+    def __init__(self, path='crawl_state.db'):
+        self.path = path
+        # The async crawler touches the state from worker threads too
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS postings (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at TEXT NOT NULL
+            );
+        ''')
+        self.connection.commit()
+        self._forget()
+
+    def _forget(self):
+        # This run's posting keys, and what commit() will write
+        self.seen = set()
+        self.recorded = []
+        self.pages = {}
+
+    def classify(self, job_data):
+        """NEW, CHANGED or UNCHANGED compared with what earlier runs saw"""
+        row = self.connection.execute(
+            'SELECT content_hash FROM postings WHERE url = ?', (posting_key(job_data),)
+        ).fetchone()
+        if row is None:
+            return NEW
+        return UNCHANGED if row[0] == content_hash(job_data) else CHANGED
+
+    def record(self, job_data):
+        """Mark a saved posting as known at the next commit(); safe from any thread"""
+        self.recorded.append((posting_key(job_data), content_hash(job_data)))
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for a page fetched before"""
+        row = self.connection.execute(
+            'SELECT etag, last_modified FROM pages WHERE url = ?', (url,)
+        ).fetchone()
+        headers = {}
+        if row is not None:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def remember_page(self, url, headers):
+        """Keep a page's validators from its response headers, if it sent any"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            self.pages[url] = (etag, last_modified)
+
+    def observe(self, job_data, report):
+        """Count a scraped job in ``report``; False when it is unchanged.
+
+        Unchanged postings are recorded right away, new and changed ones only
+        once the caller has saved them. A posting seen earlier in the same
+        run counts as unchanged.
+        """
+        key = posting_key(job_data)
+        if key in self.seen:
+            report.count(UNCHANGED)
+            return False
+        self.seen.add(key)
+        status = self.classify(job_data)
+        report.count(status)
+        if status == UNCHANGED:
+            self.record(job_data)
+        return status != UNCHANGED
+
+    def commit(self, complete=True):
+        """Write the recorded postings, and the page validators when ``complete``.
+
+        Pass ``complete=False`` when some jobs failed to save: a 304 for
+        their page next run would hide them, so the page is fetched again.
+        """
+        now = datetime.utcnow().isoformat()
+        self.connection.executemany('''
+            INSERT INTO postings (url, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET content_hash = excluded.content_hash, last_seen = excluded.last_seen
+        ''', [(key, digest, now, now) for key, digest in self.recorded])
+        if complete:
+            self.connection.executemany('''
+                INSERT INTO pages (url, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET etag = excluded.etag,
+                    last_modified = excluded.last_modified, fetched_at = excluded.fetched_at
+            ''', [(url, etag, last_modified, now) for url, (etag, last_modified) in self.pages.items()])
+        self.connection.commit()
+        self._forget()
+
+    def rollback(self):
+        """Drop this run's postings and pages without writing them"""
+        self.connection.rollback()
+        self._forget()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,326 @@
+"""Record listing pages once, then replay them to the scrapers offline.
+
+A fixture is a directory holding the captured pages, ``manifest.json``
+(URL -> file and ETag/Last-Modified) and ``expected.json``, the jobs the
+parser extracted when the pages were recorded. Replays serve the pages from
+a local HTTP server (``StubSite``, for the HTTP crawler) or from
+``ReplayDriver``, a file-backed stand-in for a Selenium WebDriver that
+``ActuaryListScraper(driver=...)`` drives like Chrome:
+
+    python replay.py record https://www.actuarylist.com/jobs --name actuarylist --pages 5
+    python replay.py serve fixtures/actuarylist --port 8765
+    python replay.py check fixtures/actuarylist
+
+``check`` re-parses the fixture and compares the result with
+``expected.json``, so changes to the card selectors, ``parse_posting_date`` or
+``extract_job_type`` show up without touching the live site.
+"""
+import argparse
+import json
+import os
+import re
+import time
+import warnings
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import soupsieve
+
+from card_parser import CSS_SELECTOR, CardParser, element_text
+from stub_site import StubSite
+
+try:
+    from selenium.common.exceptions import NoSuchElementException
+except ImportError:
+    class NoSuchElementException(Exception):
+        """Raised like selenium's when a selector matches nothing"""
+
+BASE_URL = "https://www.actuarylist.com"
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+USER_AGENT = 'Mozilla/5.0 (compatible; JobListingScraper/1.0)'
+
+
+def site_path(url):
+    """Path and query of ``url``, the key pages are served under"""
+    parts = urlsplit(url)
+    return parts.path + (f'?{parts.query}' if parts.query else '') or '/'
+
+
+class Fixture:
+    """Captured pages of one recording, keyed by their original URL"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = {'start_url': None, 'recorded_at': None, 'pages': {}}
+        manifest_path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest_file:
+                self.manifest = json.load(manifest_file)
+
+    @property
+    def start_url(self):
+        return self.manifest['start_url']
+
+    @property
+    def urls(self):
+        return list(self.manifest['pages'])
+
+    def html(self, url):
+        entry = self.manifest['pages'][url]
+        with open(os.path.join(self.directory, entry['file']), encoding='utf-8') as page:
+            return page.read()
+
+    def add(self, url, html, headers=None):
+        """Store a captured page under its original URL"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.start_url is None:
+            self.manifest['start_url'] = url
+            self.manifest['recorded_at'] = datetime.now().isoformat(timespec='seconds')
+        entry = self.manifest['pages'].get(url)
+        name = entry['file'] if entry else f"{len(self.manifest['pages']):03d}-" \
+            f"{re.sub(r'[^A-Za-z0-9]+', '-', site_path(url)).strip('-')[:60] or 'index'}.html"
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as page:
+            page.write(html)
+        headers = headers or {}
+        self.manifest['pages'][url] = {
+            'file': name,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        self.save()
+
+    def save(self):
+        with open(os.path.join(self.directory, 'manifest.json'), 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2)
+
+    def site_pages(self):
+        """{path: html} for StubSite"""
+        return {site_path(url): self.html(url) for url in self.urls}
+
+    def listing_urls(self):
+        """The listing pages in crawl order, following next links from the start"""
+        parser = CardParser(BASE_URL)
+        urls, url = [], self.start_url
+        while url in self.manifest['pages'] and url not in urls:
+            urls.append(url)
+            url = parser.next_page_url(parser.parse(self.html(url)), url)
+        return urls
+
+    def extract(self, parser=None):
+        """job_data of every card on the fixture's listing pages"""
+        parser = parser or CardParser(BASE_URL)
+        jobs = []
+        for url in self.listing_urls():
+            jobs.extend(parser.extract_page(self.html(url), url)[1])
+        return jobs
+
+    def write_expected(self):
+        with open(os.path.join(self.directory, 'expected.json'), 'w') as expected_file:
+            json.dump([snapshot(job) for job in self.extract()], expected_file, indent=2, ensure_ascii=False)
+
+    def expected(self):
+        with open(os.path.join(self.directory, 'expected.json'), encoding='utf-8') as expected_file:
+            return json.load(expected_file)
+
+    def check(self):
+        """Differences between a fresh parse and expected.json, as messages"""
+        expected, actual = self.expected(), [snapshot(job) for job in self.extract()]
+        problems = []
+        if len(expected) != len(actual):
+            problems.append(f'expected {len(expected)} jobs, parsed {len(actual)}')
+        for index, (want, got) in enumerate(zip(expected, actual)):
+            for name in sorted(set(want) | set(got)):
+                if want.get(name) != got.get(name):
+                    problems.append(f'job {index} {name}: expected {want.get(name)!r}, got {got.get(name)!r}')
+        return problems
+
+
+def snapshot(job_data):
+    """job_data with posting_date as whole days before now, which stays stable"""
+    job = dict(job_data)
+    job['posting_age_days'] = (datetime.now() - job.pop('posting_date')).days
+    return job
+
+
+def fixture_path(name_or_path):
+    return name_or_path if os.path.isdir(name_or_path) else os.path.join(FIXTURES_DIR, name_or_path)
+
+
+def record_http(start_url, directory, pages=5, details=False, delay=1.0):
+    """Capture ``pages`` listing pages (and their detail pages) over plain HTTP"""
+    fixture = Fixture(directory)
+    parser = CardParser(BASE_URL)
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    url, detail_urls = start_url, []
+    for _ in range(pages):
+        if not url or url in fixture.manifest['pages']:
+            break
+        response = session.get(url, timeout=20)
+        response.raise_for_status()
+        print(f"Recorded {url}")
+        fixture.add(url, response.text, response.headers)
+        _, jobs, next_url = parser.parse_listing(response.text, url)
+        detail_urls += [job['url'] for job in jobs if job['url']]
+        url = next_url
+        time.sleep(delay)
+    for detail_url in detail_urls if details else []:
+        response = session.get(detail_url, timeout=20)
+        if response.ok:
+            fixture.add(detail_url, response.text, response.headers)
+        time.sleep(delay)
+    fixture.write_expected()
+    return fixture
+
+
+class ReplayElement:
+    """The parts of a selenium WebElement the scrapers use"""
+
+    def __init__(self, driver, tag):
+        self._driver = driver
+        self._tag = tag
+
+    def find_element(self, by, selector):
+        found = self._driver._select(self._tag, by, selector, limit=1)
+        if not found:
+            raise NoSuchElementException(selector)
+        return found[0]
+
+    def find_elements(self, by, selector):
+        return self._driver._select(self._tag, by, selector)
+
+    @property
+    def text(self):
+        self._driver.round_trip()
+        return element_text(self._tag)
+
+    def get_attribute(self, name):
+        self._driver.round_trip()
+        value = self._tag.get(name)
+        if name == 'href' and value is not None:
+            return urljoin(self._driver.current_url, value)  # Browsers resolve links
+        return value
+
+    def is_enabled(self):
+        self._driver.round_trip()
+        return not self._tag.has_attr('disabled')
+
+    def click(self):
+        href = self.get_attribute('href')
+        if href:
+            self._driver.get(href)
+
+
+class ReplayDriver:
+    """File-backed stand-in for a selenium WebDriver.
+
+    ``get`` loads pages from ``pages`` ({url: html}); every call that would
+    cross to the browser costs ``rpc_seconds`` and is counted in
+    ``round_trips``, so WebDriver-heavy code can be timed realistically.
+    """
+
+    def __init__(self, pages, rpc_seconds=0.0):
+        self.pages = pages
+        self.rpc_seconds = rpc_seconds
+        self.round_trips = 0
+        self.current_url = None
+        self._html = ''
+        self._soup = None
+        self._parser = CardParser(BASE_URL)
+        self._compiled = {}
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.rpc_seconds:
+            time.sleep(self.rpc_seconds)
+
+    def _select(self, tag, by, selector, limit=0):
+        self.round_trip()
+        if by != CSS_SELECTOR:
+            return []  # XPath and friends: nothing to find offline
+        if selector not in self._compiled:
+            try:
+                with warnings.catch_warnings():
+                    # soupsieve still accepts :contains(), which browsers reject
+                    warnings.simplefilter('error', FutureWarning)
+                    self._compiled[selector] = soupsieve.compile(selector)
+            except (soupsieve.SelectorSyntaxError, FutureWarning):
+                self._compiled[selector] = None
+        compiled = self._compiled[selector]
+        return [ReplayElement(self, found) for found in compiled.select(tag, limit=limit)] if compiled else []
+
+    def get(self, url):
+        self.round_trip()
+        if url not in self.pages:
+            raise KeyError(f'{url} is not in the fixture')
+        self.current_url = url
+        self._html = self.pages[url]
+        self._soup = self._parser.parse(self._html)
+
+    @property
+    def page_source(self):
+        self.round_trip()
+        return self._html
+
+    def find_element(self, by, selector):
+        found = self._select(self._soup, by, selector, limit=1)
+        if not found:
+            raise NoSuchElementException(selector)
+        return found[0]
+
+    def find_elements(self, by, selector):
+        return self._select(self._soup, by, selector)
+
+    def execute_script(self, script, *args):
+        self.round_trip()
+
+    def quit(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help='Capture listing pages over HTTP')
+    record.add_argument('url', help='First listing page')
+    record.add_argument('--name', required=True, help='Fixture directory under fixtures/')
+    record.add_argument('--pages', type=int, default=5)
+    record.add_argument('--details', action='store_true', help='Also capture detail pages')
+    record.add_argument('--delay', type=float, default=1.0, help='Seconds between requests')
+    serve = commands.add_parser('serve', help='Serve a fixture over HTTP')
+    serve.add_argument('fixture')
+    serve.add_argument('--port', type=int, default=8765)
+    check = commands.add_parser('check', help='Compare a fresh parse with expected.json')
+    check.add_argument('fixture')
+    check.add_argument('--update', action='store_true', help='Rewrite expected.json instead')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        fixture = record_http(args.url, fixture_path(args.name), args.pages, args.details, args.delay)
+        print(f"Saved {len(fixture.urls)} pages to {fixture.directory}")
+    elif args.command == 'serve':
+        fixture = Fixture(fixture_path(args.fixture))
+        site = StubSite(fixture.site_pages(), args.port).start()
+        print(f"Serving {len(fixture.urls)} pages; start at {site.url}{site_path(fixture.start_url)}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            site.stop()
+    else:
+        fixture = Fixture(fixture_path(args.fixture))
+        if args.update:
+            fixture.write_expected()
+            print(f"Updated {fixture.directory}/expected.json")
+            return
+        problems = fixture.check()
+        for problem in problems:
+            print(problem)
+        if problems:
+            raise SystemExit(1)
+        print(f"{len(fixture.expected())} jobs match expected.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,54 @@
 import time
 import sys
 import os
-import re
-from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
-import requests
-import json
+from card_parser import (
+    CardParser, FIELD_SELECTORS, JOB_CARD_SELECTOR, FALLBACK_CARD_SELECTOR,
+    build_job_data, find_text_by_selectors, parse_posting_date, extract_job_type
+)
+from crawl_state import CrawlReport, CrawlState
+from upload_pipeline import JsonArrayWriter, UploadPipeline, tee
 
 # Add backend to path for database access
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 class ActuaryListScraper:
-    def __init__(self, headless=True, max_jobs=50):
-        """Initialize the scraper"""
+    def __init__(self, headless=True, max_jobs=50, extraction='page_source', state_path='crawl_state.db',
+                 driver=None, delay=1.0):
+        """Initialize the scraper.
+
+        ``extraction='page_source'`` parses each page's HTML locally in one
+        go; ``'webdriver'`` queries every card field through the browser.
+        With a ``state_path``, postings seen by earlier runs are skipped and
+        paging stops at the first page with nothing new; ``None`` scrapes
+        everything. A ``driver`` (e.g. ``replay.ReplayDriver``) is used
+        instead of starting Chrome. ``delay`` scales the pauses that let the
+        browser render a page; 0 skips them.
+        """
+        if extraction not in ('page_source', 'webdriver'):
+            raise ValueError(f"Unknown extraction mode: {extraction}")
         self.max_jobs = max_jobs
         self.base_url = "https://www.actuarylist.com"
         self.jobs_url = f"{self.base_url}/jobs"
         self.scraped_jobs = []
-        
+        self.extraction = extraction
+        self.card_parser = CardParser(self.base_url)
+        self.state = CrawlState(state_path) if state_path else None
+        self.report = CrawlReport()
+        self.delay = delay
+
+        if driver is not None:
+            self.driver = driver
+            self.wait = self._wait()
+            return
+
         # Setup Chrome options
         chrome_options = Options()
         if headless:
@@ -42,71 +66,37 @@ class ActuaryListScraper:
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.wait = WebDriverWait(self.driver, 10)
+            self.wait = self._wait()
             print("Chrome WebDriver initialized successfully!")
         except Exception as e:
             print(f"Error initializing Chrome WebDriver: {e}")
             print("Please make sure Chrome browser is installed and try again.")
             raise
         
+    def _wait(self):
+        # selenium takes a poll frequency of 0 to mean its 0.5s default
+        return WebDriverWait(self.driver, 10 * self.delay, poll_frequency=max(0.5 * self.delay, 0.001))
+
     def parse_posting_date(self, date_text):
         """Parse posting date from various formats"""
-        if not date_text:
-            return datetime.now()
-        
-        date_text = date_text.lower().strip()
-        
-        # Handle "X days ago", "X weeks ago", etc.
-        if "day" in date_text:
-            days_match = re.search(r'(\d+)\s*day', date_text)
-            if days_match:
-                days = int(days_match.group(1))
-                return datetime.now() - timedelta(days=days)
-        
-        if "week" in date_text:
-            weeks_match = re.search(r'(\d+)\s*week', date_text)
-            if weeks_match:
-                weeks = int(weeks_match.group(1))
-                return datetime.now() - timedelta(weeks=weeks)
-        
-        if "month" in date_text:
-            months_match = re.search(r'(\d+)\s*month', date_text)
-            if months_match:
-                months = int(months_match.group(1))
-                return datetime.now() - timedelta(days=months*30)
-        
-        # Handle "today", "yesterday"
-        if "today" in date_text:
-            return datetime.now()
-        if "yesterday" in date_text:
-            return datetime.now() - timedelta(days=1)
-        
-        # Default to current date if parsing fails
-        return datetime.now()
-    
+        return parse_posting_date(date_text)
+
     def extract_job_type(self, job_text):
         """Extract job type from job text"""
-        job_text_lower = job_text.lower()
-        
-        if any(word in job_text_lower for word in ['intern', 'internship']):
-            return 'Internship'
-        elif any(word in job_text_lower for word in ['part-time', 'part time']):
-            return 'Part-time'
-        elif any(word in job_text_lower for word in ['contract', 'contractor', 'consulting']):
-            return 'Contract'
-        elif any(word in job_text_lower for word in ['temporary', 'temp']):
-            return 'Temporary'
-        else:
-            return 'Full-time'
-    
-    def scrape_jobs(self):
-        """Main scraping method"""
+        return extract_job_type(job_text)
+
+    def scrape_jobs(self, sink=None):
+        """Main scraping method.
+
+        With a ``sink``, each job is passed to it as soon as it is extracted
+        instead of being collected in ``scraped_jobs``.
+        """
         try:
             print(f"Starting to scrape jobs from {self.jobs_url}")
             self.driver.get(self.jobs_url)
             
             # Wait for page to load
-            time.sleep(3)
+            time.sleep(3 * self.delay)
             
             # Accept cookies if present
             try:
@@ -114,7 +104,7 @@ class ActuaryListScraper:
                     EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'OK')]"))
                 )
                 cookie_button.click()
-                time.sleep(1)
+                time.sleep(self.delay)
             except TimeoutException:
                 print("No cookie banner found or already accepted")
             
@@ -125,14 +115,7 @@ class ActuaryListScraper:
             while job_count < self.max_jobs:
                 print(f"Scraping page {page}...")
                 
-                # Find job cards/listings
-                job_elements = self.driver.find_elements(By.CSS_SELECTOR, 
-                    ".job-listing, .job-card, .job-item, [class*='job'], .listing-item")
-                
-                if not job_elements:
-                    # Try alternative selectors
-                    job_elements = self.driver.find_elements(By.CSS_SELECTOR, 
-                        "article, .card, [data-job], .position")
+                job_elements, extract = self.find_job_cards()
                 
                 if not job_elements:
                     print("No job elements found. Checking page structure...")
@@ -141,15 +124,23 @@ class ActuaryListScraper:
                     break
                 
                 print(f"Found {len(job_elements)} job elements on page {page}")
+                page_jobs = fresh_jobs = 0
                 
                 for job_element in job_elements:
                     if job_count >= self.max_jobs:
                         break
                     
                     try:
-                        job_data = self.extract_job_data(job_element)
+                        job_data = extract(job_element)
                         if job_data:
-                            self.scraped_jobs.append(job_data)
+                            page_jobs += 1
+                            if self.state is not None and not self.state.observe(job_data, self.report):
+                                continue
+                            fresh_jobs += 1
+                            if sink is not None:
+                                sink(job_data)
+                            else:
+                                self.scraped_jobs.append(job_data)
                             job_count += 1
                             print(f"Scraped job {job_count}: {job_data['title']} at {job_data['company']}")
                     
@@ -157,16 +148,22 @@ class ActuaryListScraper:
                         print(f"Error extracting job data: {e}")
                         continue
                 
+                if self.state is not None and page_jobs and not fresh_jobs:
+                    print("Every posting on this page is already known, stopping")
+                    break
+
                 # Try to go to next page
                 if job_count < self.max_jobs:
                     if not self.go_to_next_page():
                         break
                     page += 1
-                    time.sleep(2)
+                    time.sleep(2 * self.delay)
                 else:
                     break
             
-            print(f"Scraping completed. Total jobs scraped: {len(self.scraped_jobs)}")
+            print(f"Scraping completed. Total jobs scraped: {job_count}")
+            if self.state is not None:
+                print(f"Postings: {self.report}")
             return self.scraped_jobs
 
         except Exception as e:
@@ -176,88 +173,30 @@ class ActuaryListScraper:
         finally:
             self.driver.quit()
 
+    def find_job_cards(self):
+        """Job cards on the current page and the function that extracts one"""
+        if self.extraction == 'page_source':
+            # One round trip for the whole page instead of several per field
+            page_url = self.driver.current_url
+            cards = self.card_parser.find_cards(self.card_parser.parse(self.driver.page_source))
+            return cards, lambda card: self.card_parser.extract_job_data(card, page_url)
+
+        # Find job cards/listings
+        job_elements = self.driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+        if not job_elements:
+            # Try alternative selectors
+            job_elements = self.driver.find_elements(By.CSS_SELECTOR, FALLBACK_CARD_SELECTOR)
+        return job_elements, self.extract_job_data
+
     def extract_job_data(self, job_element):
         """Extract job data from a job element"""
         try:
-            job_data = {}
-
-            # Extract title
-            title_selectors = [
-                ".job-title", ".title", "h2", "h3", "h4",
-                "[class*='title']", ".position-title", ".job-name"
-            ]
-            title = self.find_text_by_selectors(job_element, title_selectors)
-            if not title:
-                return None
-            job_data['title'] = title.strip()
-
-            # Extract company
-            company_selectors = [
-                ".company", ".company-name", ".employer",
-                "[class*='company']", ".organization", ".firm"
-            ]
-            company = self.find_text_by_selectors(job_element, company_selectors)
-            if not company:
-                company = "Unknown Company"
-            job_data['company'] = company.strip()
-
-            # Extract location
-            location_selectors = [
-                ".location", ".job-location", ".city",
-                "[class*='location']", ".address", ".place"
-            ]
-            location = self.find_text_by_selectors(job_element, location_selectors)
-            if not location:
-                location = "Remote/Not Specified"
-            job_data['location'] = location.strip()
-
-            # Extract posting date
-            date_selectors = [
-                ".date", ".posted", ".job-date",
-                "[class*='date']", ".time", ".posted-date"
-            ]
-            date_text = self.find_text_by_selectors(job_element, date_selectors)
-            job_data['posting_date'] = self.parse_posting_date(date_text)
-
-            # Extract job type
-            full_text = job_element.text
-            job_data['job_type'] = self.extract_job_type(full_text)
-
-            # Extract tags
-            tags_selectors = [
-                ".tags", ".skills", ".categories",
-                "[class*='tag']", ".keywords", ".labels"
-            ]
-            tags_text = self.find_text_by_selectors(job_element, tags_selectors)
-            if tags_text:
-                # Split by common delimiters and clean
-                tags = [tag.strip() for tag in re.split(r'[,|•·]', tags_text) if tag.strip()]
-                job_data['tags'] = ','.join(tags[:5])  # Limit to 5 tags
-            else:
-                job_data['tags'] = ''
-
-            # Extract description (if available)
-            desc_selectors = [
-                ".description", ".job-description", ".summary",
-                "[class*='description']", ".details"
-            ]
-            description = self.find_text_by_selectors(job_element, desc_selectors)
-            job_data['description'] = description[:500] if description else ''  # Limit length
-
-            # Extract URL (if available)
-            try:
-                link_element = job_element.find_element(By.CSS_SELECTOR, "a")
-                href = link_element.get_attribute('href')
-                if href and href.startswith('http'):
-                    job_data['url'] = href
-                elif href:
-                    job_data['url'] = self.base_url + href
-                else:
-                    job_data['url'] = ''
-            except:
-                job_data['url'] = ''
-
-            return job_data
+            return build_job_data(
+                lambda field: self.find_text_by_selectors(job_element, FIELD_SELECTORS[field]),
+                job_element.text,
+                lambda: job_element.find_element(By.CSS_SELECTOR, "a").get_attribute('href'),
+                self.base_url,
+            )
 
         except Exception as e:
             print(f"Error extracting job data: {e}")
@@ -265,15 +204,7 @@ class ActuaryListScraper:
 
     def find_text_by_selectors(self, element, selectors):
         """Try multiple CSS selectors to find text"""
-        for selector in selectors:
-            try:
-                found_element = element.find_element(By.CSS_SELECTOR, selector)
-                text = found_element.text.strip()
-                if text:
-                    return text
-            except:
-                continue
-        return None
+        return find_text_by_selectors(element, selectors)
 
     def go_to_next_page(self):
         """Navigate to next page"""
@@ -291,7 +222,7 @@ class ActuaryListScraper:
                     next_button = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if next_button.is_enabled():
                         next_button.click()
-                        time.sleep(2)
+                        time.sleep(2 * self.delay)
                         return True
                 except:
                     continue
@@ -302,30 +233,17 @@ class ActuaryListScraper:
             print(f"Error navigating to next page: {e}")
             return False
 
-    def save_to_api(self, jobs_data):
+    def save_to_api(self, jobs_data, api_url="http://localhost:5000/api/jobs"):
         """Save scraped jobs to backend API"""
-        api_url = "http://localhost:5000/api/jobs"
-        saved_count = 0
-
-        for job in jobs_data:
-            try:
-                # Convert datetime to string for JSON serialization
-                if isinstance(job.get('posting_date'), datetime):
-                    job['posting_date'] = job['posting_date'].isoformat()
-
-                response = requests.post(api_url, json=job)
-
-                if response.status_code == 201:
-                    saved_count += 1
-                    print(f"Saved job: {job['title']} at {job['company']}")
-                else:
-                    print(f"Failed to save job: {job['title']} - {response.text}")
-
-            except Exception as e:
-                print(f"Error saving job {job.get('title', 'Unknown')}: {e}")
-
-        print(f"Successfully saved {saved_count} out of {len(jobs_data)} jobs to database")
-        return saved_count
+        record = self.state.record if self.state is not None else None
+        with UploadPipeline(api_url, on_uploaded=record) as pipeline:
+            for job in jobs_data:
+                pipeline.put(job)
+        print(pipeline.report())
+        if self.state is not None:
+            # Only the postings the API stored become known
+            self.state.commit(complete=not pipeline.stats['failed'])
+        return pipeline.uploaded
 
 def main():
     """Main function to run the scraper"""
@@ -335,32 +253,22 @@ def main():
     scraper = ActuaryListScraper(headless=False, max_jobs=50)  # Set headless=True for production
 
     try:
-        # Scrape jobs
-        jobs = scraper.scrape_jobs()
-
-        if jobs:
-            print(f"\nSuccessfully scraped {len(jobs)} jobs")
-
-            # Save to JSON file as backup
-            with open('scraped_jobs.json', 'w') as f:
-                # Convert datetime objects to strings for JSON serialization
-                jobs_for_json = []
-                for job in jobs:
-                    job_copy = job.copy()
-                    if isinstance(job_copy.get('posting_date'), datetime):
-                        job_copy['posting_date'] = job_copy['posting_date'].isoformat()
-                    jobs_for_json.append(job_copy)
-
-                json.dump(jobs_for_json, f, indent=2)
-            print("Jobs saved to scraped_jobs.json")
-
-            # Save to API
-            print("\nSaving jobs to database via API...")
-            scraper.save_to_api(jobs)
-
+        # Jobs go to the JSON backup and the API while scraping continues
+        print("Saving jobs to scraped_jobs.json and the database via API as they are scraped...")
+        record = scraper.state.record if scraper.state is not None else None
+        with JsonArrayWriter('scraped_jobs.json') as backup, UploadPipeline(on_uploaded=record) as pipeline:
+            scraper.scrape_jobs(sink=tee(backup.write, pipeline.put))
+
+        if backup.count:
+            print(f"\nSuccessfully scraped {backup.count} jobs")
+            print(pipeline.report())
         else:
             print("No jobs were scraped")
 
+        # Only the postings the API stored become known; an error skips this
+        if scraper.state is not None:
+            scraper.state.commit(complete=not pipeline.stats['failed'])
+
     except Exception as e:
         print(f"Error in main: {e}")
 
@@ -1,6 +1,7 @@
 import requests
 from datetime import datetime
 import time
+from upload_pipeline import API_URL, UploadPipeline
 
 def create_sample_actuarial_jobs():
     """Create sample actuarial jobs that simulate scraped data"""
@@ -103,30 +104,18 @@ def create_sample_actuarial_jobs():
 
 def save_jobs_to_api(jobs_data):
     """Save scraped jobs to backend API"""
-    api_url = "http://localhost:5000/api/jobs"
-    saved_count = 0
-    failed_count = 0
-    
     print(f"📤 Saving {len(jobs_data)} scraped jobs to database...")
-    
-    for i, job in enumerate(jobs_data, 1):
-        try:
-            response = requests.post(api_url, json=job)
-            
-            if response.status_code == 201:
-                saved_count += 1
-                print(f"✅ [{i}/{len(jobs_data)}] Saved: {job['title']} at {job['company']}")
-            else:
-                failed_count += 1
-                print(f"❌ [{i}/{len(jobs_data)}] Failed: {job['title']} - {response.text}")
-                
-        except Exception as e:
-            failed_count += 1
-            print(f"❌ [{i}/{len(jobs_data)}] Error saving {job['title']}: {e}")
-        
-        # Small delay to avoid overwhelming the API
-        time.sleep(0.1)
-    
+
+    # Pooled keep-alive uploads; the API's 503s slow it down instead of a fixed sleep
+    with UploadPipeline(API_URL) as pipeline:
+        for job in jobs_data:
+            pipeline.put(job)
+
+    saved_count = pipeline.uploaded
+    failed_count = len(jobs_data) - saved_count
+    for title, reason in pipeline.failures:
+        print(f"❌ Failed: {title} - {reason}")
+
     print(f"\n📊 Scraping Results:")
     print(f"✅ Successfully saved: {saved_count} jobs")
     print(f"❌ Failed to save: {failed_count} jobs")
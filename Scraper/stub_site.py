@@ -0,0 +1,259 @@
+"""Local stand-ins for actuarylist.com and the jobs API, served over HTTP.
+
+Lets the scrapers run offline: pages come from a dict of request path (with
+query string) to HTML, and uploads go to ``StubApi``. Both can be made slow
+or flaky to exercise retries:
+
+    python stub_site.py --pages 5 --cards 40 --port 8765
+    python async_crawler.py --jobs-url http://127.0.0.1:8765/jobs
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TITLES = ['Actuarial Analyst', 'Senior Pricing Actuary', 'Reserving Actuary', 'Actuarial Intern',
+          'Chief Actuary', 'Pension Actuary (Contract)', 'Part-time Valuation Actuary']
+COMPANIES = ['Milliman', 'Aon', 'Swiss Re', 'Munich Re', 'Prudential', 'Travelers', 'Zurich']
+LOCATIONS = ['New York, NY', 'Remote', 'Chicago, IL', 'London, UK', 'Zürich, Switzerland']
+DATES = ['Today', 'Yesterday', '3 days ago', '2 weeks ago', '1 month ago']
+TAGS = ['Life', 'Health', 'P&C', 'Pricing', 'Reserving', 'Python', 'R', 'FSA', 'ASA', 'IFRS 17']
+
+
+def make_postings(count, seed=1, first_id=0):
+    """``count`` random postings with ids from ``first_id``"""
+    rng = random.Random(seed)
+    postings = []
+    for job_id in range(first_id, first_id + count):
+        title = rng.choice(TITLES)
+        slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+        postings.append({
+            'id': job_id,
+            'path': f'/actuarial-jobs/{job_id}-{slug}',
+            'title': title,
+            'company': rng.choice(COMPANIES),
+            'location': rng.choice(LOCATIONS),
+            'date': rng.choice(DATES),
+            'tags': rng.sample(TAGS, 4),
+            'summary': 'Support pricing and reserving work for our insurance clients. ' * 6,
+            'description': f'Full posting {job_id}. ' + 'Join our actuarial team. ' * rng.randint(5, 30),
+        })
+    return postings
+
+
+def listing_page(postings, next_href=None):
+    """HTML resembling an actuarylist.com results page"""
+    items = []
+    for posting in postings:
+        tags = ' · '.join(f'<span class="tag-item">{tag}</span>' for tag in posting['tags'])
+        items.append(f'''
+    <div class="job-card" data-job="{posting['id']}">
+      <a href="{posting['path']}">
+        <h3 class="job-title">{posting['title']}</h3>
+      </a>
+      <div class="company-name"><img src="/logo/{posting['id']}.png" alt=""> {posting['company']}</div>
+      <span class="location">{posting['location']}</span>
+      <span class="posted-date">{posting['date']}</span>
+      <div class="tags">{tags}</div>
+      <p class="description">{posting['summary']}</p>
+      <script>window.track && track({posting['id']});</script>
+    </div>''')
+    next_link = f'<a class="next" href="{next_href}">Next</a>' if next_href else ''
+    return f'''<!DOCTYPE html>
+<html><head><title>Actuarial Jobs</title><style>.job-card {{ margin: 1em; }}</style></head>
+<body>
+  <header><nav><a href="/">Actuary List</a> <a href="/jobs">Jobs</a></nav></header>
+  <main><h1>Actuarial jobs</h1>{''.join(items)}
+  </main>
+  <footer>{next_link}</footer>
+</body></html>'''
+
+
+def detail_page(posting):
+    return f'''<!DOCTYPE html>
+<html><head><title>{posting['title']}</title></head>
+<body><main><h1 class="job-title">{posting['title']}</h1>
+  <div class="company-name">{posting['company']}</div>
+  <div class="job-description"><p>{posting['description']}</p></div>
+</main></body></html>'''
+
+
+def synthetic_site(pages=3, cards=20, seed=1):
+    """{path: html} for ``pages`` linked listing pages and their postings' detail pages"""
+    site = {}
+    for page in range(1, pages + 1):
+        path = '/jobs' if page == 1 else f'/jobs?page={page}'
+        next_href = f'/jobs?page={page + 1}' if page < pages else None
+        postings = make_postings(cards, seed=seed + page, first_id=(page - 1) * cards)
+        site[path] = listing_page(postings, next_href)
+        for posting in postings:
+            site[posting['path']] = detail_page(posting)
+    return site
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # keep-alive response waits ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+    stub = None
+
+    def respond(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubServer:
+    """Runs a handler on 127.0.0.1 from a background thread.
+
+    ``latency`` delays every response; ``failure_rate`` answers that share of
+    requests with a 503 so retry logic can be tested.
+    """
+    handler = _Handler
+
+    def __init__(self, port=0, latency=0.0, failure_rate=0.0, seed=1):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        handler = type(self.handler.__name__, (self.handler,), {'stub': self})
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def arrive(self, path):
+        """Log a request and wait out the latency; True when it should fail"""
+        with self._lock:
+            self.requests.append(path)
+            fail = self._rng.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        return fail
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _SiteHandler(_Handler):
+    def do_GET(self):
+        fail = self.stub.arrive(self.path)
+        html = self.stub.pages.get(self.path)
+        if fail:
+            self.respond(503, b'Try again later', {'Retry-After': '0'})
+        elif html is None:
+            self.respond(404, b'Not found')
+        else:
+            body = html.encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.respond(304, b'', {'ETag': etag})
+            else:
+                self.respond(200, body, {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag})
+
+
+class StubSite(_StubServer):
+    """Serves ``pages`` ({path: html}). Pages carry an ETag and matching
+    ``If-None-Match`` requests get a 304."""
+    handler = _SiteHandler
+
+    def __init__(self, pages, port=0, latency=0.0, failure_rate=0.0, seed=1):
+        super().__init__(port, latency, failure_rate, seed)
+        self.pages = pages
+
+
+class _ApiHandler(_Handler):
+    def do_GET(self):
+        self.stub.arrive(self.path)
+        if self.path == '/api/health':
+            self.respond(200, b'{"status": "healthy"}', {'Content-Type': 'application/json'})
+        else:
+            self.respond(404, b'{"success": false}', {'Content-Type': 'application/json'})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        fail = self.stub.arrive(self.path)
+        if self.path != '/api/jobs':
+            self.respond(404, b'{"success": false}', {'Content-Type': 'application/json'})
+            return
+        if fail:
+            self.respond(503, b'{"success": false, "message": "Server busy"}', {'Retry-After': '0'})
+            return
+        job = json.loads(body)
+        with self.stub._lock:
+            self.stub.jobs_received += 1
+            job['id'] = self.stub.jobs_received
+            if self.stub.keep_jobs:
+                self.stub.jobs.append(job)
+        payload = json.dumps({'success': True, 'message': 'Job created successfully', 'data': job})
+        self.respond(201, payload.encode('utf-8'), {'Content-Type': 'application/json'})
+
+
+class StubApi(_StubServer):
+    """Accepts ``POST /api/jobs`` like the backend, without a database.
+
+    Counts the jobs in ``jobs_received`` and, with ``keep_jobs``, keeps them
+    in ``jobs``.
+    """
+    handler = _ApiHandler
+
+    def __init__(self, port=0, latency=0.0, failure_rate=0.0, seed=1, keep_jobs=True):
+        super().__init__(port, latency, failure_rate, seed)
+        self.keep_jobs = keep_jobs
+        self.jobs = []
+        self.jobs_received = 0
+
+    @property
+    def jobs_url(self):
+        return f'{self.url}/api/jobs'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=5, help='Linked listing pages')
+    parser.add_argument('--cards', type=int, default=40, help='Job cards per listing page')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    args = parser.parse_args()
+
+    site = StubSite(synthetic_site(args.pages, args.cards), args.port, args.latency, args.failure_rate)
+    print(f'Serving {len(site.pages)} pages at {site.url}/jobs (Ctrl+C to stop)')
+    site.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == '__main__':
+    main()
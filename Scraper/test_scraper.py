@@ -1,6 +1,15 @@
+import os
+import tempfile
 import requests
 import json
 from datetime import datetime
+from async_crawler import AsyncJobCrawler
+from card_parser import CardParser, extract_job_type, parse_posting_date
+from crawl_state import CrawlState
+from replay import Fixture, ReplayDriver, fixture_path, site_path, snapshot
+from scrape import ActuaryListScraper
+from stub_site import StubApi, StubSite, synthetic_site
+from upload_pipeline import UploadPipeline
 
 def test_api_connection():
     """Test if we can connect to the backend API"""
@@ -138,6 +147,184 @@ def create_sample_jobs():
     print(f"\n📊 Successfully created {created_jobs} out of {len(sample_jobs)} sample jobs")
     return created_jobs
 
+def test_async_crawler_offline():
+    """Test the HTTP crawler against a local stand-in site, including retries"""
+    pages = synthetic_site(pages=3, cards=10)
+    with StubSite(pages, failure_rate=0.2) as site:
+        jobs_url = f"{site.url}/jobs"
+        crawler = AsyncJobCrawler(jobs_url, max_jobs=25, concurrency=4, delay=0, backoff=0.01)
+        jobs = crawler.run()
+
+    # Same job data as parsing the pages directly
+    parser = CardParser(crawler.parser.base_url)
+    expected = []
+    for path in ['/jobs', '/jobs?page=2', '/jobs?page=3']:
+        expected.extend(parser.extract_page(pages[path], site.url + path)[1])
+    expected = expected[:25]
+
+    def comparable(job_list):
+        return [dict(job, posting_date=job['posting_date'].date()) for job in job_list]
+
+    assert comparable(jobs) == comparable(expected)
+    assert crawler.stats['pages'] == 3
+    assert crawler.stats['retries'] > 0
+    print(f"✅ Crawled {len(jobs)} jobs from {crawler.stats['pages']} pages offline "
+          f"({crawler.stats['retries']} retries)")
+
+
+def test_incremental_crawl_offline():
+    """Test that re-crawls skip known postings and stop at known pages"""
+    pages = synthetic_site(pages=3, cards=10)
+    state = CrawlState(os.path.join(tempfile.mkdtemp(), 'crawl_state.db'))
+
+    def crawl():
+        crawler = AsyncJobCrawler(f"{site.url}/jobs", max_jobs=100, state=state, delay=0)
+        jobs = crawler.run()
+        for job_data in jobs:
+            state.record(job_data)
+        state.commit()
+        return jobs, crawler.report
+
+    with StubSite(pages) as site:
+        jobs, report = crawl()
+        assert (len(jobs), report.new, report.skipped) == (30, 30, 0)
+
+        # Nothing changed: the first listing page answers 304
+        jobs, report = crawl()
+        assert jobs == [] and report.not_modified_pages == 1
+
+        # One posting on the first page changed: only it comes back, and
+        # crawling stops at the second page, which is not modified
+        pages['/jobs'] = pages['/jobs'].replace('Support pricing', 'Lead pricing', 1)
+        site.requests.clear()
+        jobs, report = crawl()
+        assert (len(jobs), report.changed, report.skipped, report.not_modified_pages) == (1, 1, 9, 1)
+        assert '/jobs?page=3' not in site.requests
+    state.close()
+    print(f"✅ Incremental crawl: {report}")
+
+
+def test_failed_uploads_stay_unknown_offline():
+    """Test that only postings the API stored are marked as known"""
+    state = CrawlState(os.path.join(tempfile.mkdtemp(), 'crawl_state.db'))
+    with StubSite(synthetic_site(pages=1, cards=20)) as site:
+        with StubApi(failure_rate=0.3) as api:
+            crawler = AsyncJobCrawler(f"{site.url}/jobs", max_jobs=100, state=state, delay=0)
+            with UploadPipeline(api.jobs_url, workers=2, retries=0, on_uploaded=state.record) as pipeline:
+                crawler.run(sink=pipeline.put)
+        failed = pipeline.stats['failed']
+        assert 0 < failed < 20
+        state.commit(complete=not failed)
+
+        # The failed postings come back, and the page is fetched in full, not 304
+        crawler = AsyncJobCrawler(f"{site.url}/jobs", max_jobs=100, state=state, delay=0)
+        jobs = crawler.run()
+        assert (len(jobs), crawler.report.new, crawler.report.not_modified_pages) == (failed, failed, 0)
+    state.close()
+    print(f"✅ {failed} failed uploads are crawled again: {crawler.report}")
+
+
+def test_streaming_upload_offline():
+    """Test that crawled jobs stream through a bounded pipeline into the API"""
+    with StubSite(synthetic_site(pages=5, cards=20), latency=0.005) as site, \
+            StubApi(latency=0.01, failure_rate=0.1) as api:
+        crawler = AsyncJobCrawler(f"{site.url}/jobs", max_jobs=100, delay=0)
+        with UploadPipeline(api.jobs_url, workers=2, queue_size=4, retries=5, backoff=0.01) as pipeline:
+            jobs = crawler.run(sink=pipeline.put)
+
+    assert jobs == []  # Nothing collected on the side
+    assert pipeline.uploaded == api.jobs_received == 100
+    assert pipeline.stats['failed'] == 0
+    # Two full queues, one job per uploader and one being validated
+    assert pipeline.peak_pending <= 2 * 4 + 2 + 1
+    print(f"✅ {pipeline.report()}")
+
+
+def test_pipeline_survives_unexpected_errors_offline():
+    """Test that an unexpected error fails one job instead of hanging close()"""
+    class BadTitle(str):
+        def strip(self):
+            raise ValueError('cannot strip')
+
+    def on_uploaded(job_data):
+        if job_data['title'] == 'Pricing Actuary 1':
+            raise RuntimeError('state database is locked')
+
+    with StubApi() as api:
+        pipeline = UploadPipeline(api.jobs_url, workers=2, retries=0, on_uploaded=on_uploaded).start()
+        pipeline.put({'title': BadTitle('Broken'), 'company': 'Acme', 'location': 'Remote'})
+        for i in range(3):
+            pipeline.put({'title': f'Pricing Actuary {i}', 'company': 'Acme', 'location': 'Remote'})
+        pipeline.close()
+    assert (pipeline.stats['uploaded'], pipeline.stats['failed'], pipeline.pending) == (3, 2, 0)
+    assert not any(thread.is_alive() for thread in pipeline._threads)
+    print(f"✅ {pipeline.report()}")
+
+def replay_driver(fixture):
+    return ReplayDriver({url: fixture.html(url) for url in fixture.urls})
+
+
+def test_replayed_browser_scrape_offline():
+    """Test that the browser scraper streams new postings and stops at known ones"""
+    fixture = Fixture(fixture_path('synthetic'))
+    state_path = os.path.join(tempfile.mkdtemp(), 'crawl_state.db')
+    driver = replay_driver(fixture)
+    scraper = ActuaryListScraper(max_jobs=100, state_path=state_path, driver=driver, delay=0)
+    with StubApi() as api:
+        with UploadPipeline(api.jobs_url, workers=2, on_uploaded=scraper.state.record) as pipeline:
+            jobs = scraper.scrape_jobs(sink=pipeline.put)
+    scraper.state.commit(complete=not pipeline.stats['failed'])
+    scraper.state.close()
+    # Both pages were followed, and every job went to the sink instead of the list
+    assert jobs == []
+    assert driver.current_url == fixture.listing_urls()[-1]
+    assert pipeline.uploaded == api.jobs_received == scraper.report.new == len(fixture.expected())
+
+    # Nothing new: the first page is all known, so paging stops there
+    driver = replay_driver(fixture)
+    rescraper = ActuaryListScraper(max_jobs=100, state_path=state_path, driver=driver, delay=0)
+    assert rescraper.scrape_jobs() == []
+    assert (rescraper.report.new, rescraper.report.skipped) == (0, 10)
+    assert driver.current_url == fixture.start_url
+    rescraper.state.close()
+    print(f"✅ Replayed browser scrape: {pipeline.report()}; again: {rescraper.report}")
+
+
+def test_replay_fixtures():
+    """Test parsing of recorded pages against their expected.json, in every mode"""
+    for name in ('edge_cases', 'synthetic'):
+        fixture = Fixture(fixture_path(name))
+        problems = fixture.check()
+        assert problems == [], problems
+        expected = fixture.expected()
+
+        # The browser scraper itself, paging through the fixture with a replayed driver
+        for extraction in ('webdriver', 'page_source'):
+            scraper = ActuaryListScraper(max_jobs=100, extraction=extraction, state_path=None,
+                                         driver=replay_driver(fixture), delay=0)
+            assert [snapshot(job) for job in scraper.scrape_jobs()] == expected, extraction
+
+        with StubSite(fixture.site_pages()) as site:
+            crawler = AsyncJobCrawler(site.url + site_path(fixture.start_url), max_jobs=100, delay=0)
+            crawled = crawler.run()
+        # The stub site serves the pages from its own host
+        assert [dict(snapshot(job), url=site_path(job['url'])) for job in crawled] == \
+            [dict(job, url=site_path(job['url'])) for job in expected]
+        print(f"✅ {name}: {len(expected)} jobs match in webdriver, page_source and http modes")
+
+    for text, days in [('Today', 0), ('Yesterday', 1), ('Posted 5 days ago', 5), ('1 day ago', 1),
+                       ('1 week ago', 7), ('3 weeks ago', 21), ('2 months ago', 60),
+                       ('', 0), (None, 0), ('Mar 3', 0)]:
+        posting_date = parse_posting_date(text)
+        assert (datetime.now() - posting_date).days == days, text
+    for text, job_type in [('Actuarial Intern', 'Internship'), ('Part Time Analyst', 'Part-time'),
+                           ('part-time', 'Part-time'), ('Pricing Consultant, consulting', 'Contract'),
+                           ('Contractor', 'Contract'), ('Temporary cover', 'Temporary'),
+                           ('Pricing Actuary', 'Full-time')]:
+        assert extract_job_type(text) == job_type, text
+    print("✅ parse_posting_date and extract_job_type cases pass")
+
+
 def main():
     """Main test function"""
     print("🧪 Testing Web Scraper Components...")
@@ -161,6 +348,31 @@ def main():
     print("\n4. Creating Sample Jobs:")
     created_count = create_sample_jobs()
     
+    # Test 5: Offline HTTP crawl
+    print("\n5. Testing Async HTTP Crawler (offline):")
+    test_async_crawler_offline()
+
+    # Test 6: Incremental re-crawl
+    print("\n6. Testing Incremental Crawl State (offline):")
+    test_incremental_crawl_offline()
+
+    # Test 7: Failed uploads
+    print("\n7. Testing Crawl State After Failed Uploads (offline):")
+    test_failed_uploads_stay_unknown_offline()
+
+    # Test 8: Streaming upload
+    print("\n8. Testing Streaming Upload Pipeline (offline):")
+    test_streaming_upload_offline()
+    test_pipeline_survives_unexpected_errors_offline()
+
+    # Test 9: Replay fixtures
+    print("\n9. Testing Replay Fixtures (offline):")
+    test_replay_fixtures()
+
+    # Test 10: Browser scraper against a replayed driver
+    print("\n10. Testing Browser Scraper With a Replayed Driver (offline):")
+    test_replayed_browser_scrape_offline()
+
     # Final Summary
     print("\n" + "=" * 50)
     print("🎉 Scraper Test Summary:")
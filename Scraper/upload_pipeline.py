@@ -0,0 +1,256 @@
+"""Streaming scrape -> validate -> upload pipeline.
+
+Scrapers hand each job to ``UploadPipeline.put`` as soon as it is extracted.
+A validation thread checks it against the backend's rules and a pool of
+uploader threads POSTs it over keep-alive connections, so uploads overlap
+scraping. The queues between the stages are bounded: when the API falls
+behind, ``put`` blocks and scraping slows down instead of piling jobs up in
+memory, so memory use does not grow with ``max_jobs``.
+
+    with UploadPipeline("http://localhost:5000/api/jobs", workers=4) as pipeline:
+        scraper.scrape_jobs(sink=pipeline.put)
+    print(pipeline.report())
+"""
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = "http://localhost:5000/api/jobs"
+
+# Mirror backend/models/job.py so bad jobs are dropped before a round trip
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']
+REQUIRED_FIELDS = ('title', 'company', 'location')
+MAX_LENGTHS = {'title': 200, 'company': 200, 'location': 200, 'url': 500}
+
+# Responses that mean the job was not stored and may be sent again; 503 is
+# also what the API's admission control answers when it sheds load
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# How many failed jobs the report lists
+MAX_REPORTED_FAILURES = 20
+
+_DONE = object()
+
+
+class ValidationFailed(Exception):
+    """A scraped job the API would reject"""
+
+
+def validate_job(job_data):
+    """The API payload for a scraped job; raises ValidationFailed if unusable"""
+    payload = dict(job_data)
+    for name in REQUIRED_FIELDS:
+        value = (payload.get(name) or '').strip()
+        if not value:
+            raise ValidationFailed(f'missing {name}')
+        payload[name] = value
+    for name, limit in MAX_LENGTHS.items():
+        if payload.get(name) and len(payload[name]) > limit:
+            raise ValidationFailed(f'{name} longer than {limit} characters')
+    if payload.get('job_type') and payload['job_type'] not in JOB_TYPES:
+        raise ValidationFailed(f"unknown job type {payload['job_type']!r}")
+    if isinstance(payload.get('posting_date'), datetime):
+        payload['posting_date'] = payload['posting_date'].isoformat()
+    return payload
+
+
+def api_session(retries=3, backoff=0.5):
+    """A keep-alive session that retries connection failures and shed load.
+
+    POSTs are retried only when the request never reached the app (connect
+    errors) or the app turned it away, never after a read timeout, where
+    the job may already have been created.
+    """
+    retry = Retry(
+        total=retries, connect=retries, read=0, status=retries,
+        status_forcelist=RETRY_STATUSES, allowed_methods=frozenset(['POST']),
+        backoff_factor=backoff, respect_retry_after_header=True, raise_on_status=False,
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class UploadPipeline:
+    """Bounded validate and upload stages fed by ``put``.
+
+    ``workers`` uploader threads each keep one connection open through their
+    own requests.Session (sessions are not thread-safe to share).
+    ``queue_size`` bounds each queue, which caps the jobs held in memory.
+    ``on_uploaded`` is called with each job the API stored, from an uploader
+    thread, e.g. ``CrawlState.record``.
+    """
+
+    def __init__(self, api_url=API_URL, workers=4, queue_size=32, retries=3, backoff=0.5, timeout=10,
+                 on_uploaded=None):
+        self.api_url = api_url
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.on_uploaded = on_uploaded
+        self._validate_queue = queue.Queue(queue_size)
+        self._upload_queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        self.invalid_reasons = Counter()
+        self.failures = []
+        self.pending = 0
+        self.peak_pending = 0
+        self._threads = []
+        self._started = None
+        self.seconds = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._validate, name='validate', daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._upload, name=f'upload-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def put(self, job_data):
+        """Queue a scraped job; blocks while the pipeline is full"""
+        with self._lock:
+            self.stats['scraped'] += 1
+            self.pending += 1
+        self._validate_queue.put(job_data)
+        with self._lock:
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def close(self):
+        """Wait until every queued job has been uploaded or has failed"""
+        self._validate_queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self.seconds = time.perf_counter() - self._started
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _validate(self):
+        # Whatever happens to one job, the uploaders are told to stop, or
+        # close() would wait for them forever
+        try:
+            while True:
+                job_data = self._validate_queue.get()
+                if job_data is _DONE:
+                    return
+                try:
+                    self._upload_queue.put((job_data, validate_job(job_data)))
+                except (ValidationFailed, AttributeError, TypeError) as e:
+                    with self._lock:
+                        self.stats['invalid'] += 1
+                        self.invalid_reasons[str(e)] += 1
+                        self.pending -= 1
+                except Exception as e:
+                    self._fail(job_data, repr(e))
+                    with self._lock:
+                        self.pending -= 1
+        finally:
+            for _ in range(self.workers):
+                self._upload_queue.put(_DONE)
+
+    def _upload(self):
+        session = api_session(self.retries, self.backoff)
+        try:
+            while True:
+                item = self._upload_queue.get()
+                if item is _DONE:
+                    return
+                try:
+                    self._post(session, *item)
+                except Exception as e:
+                    self._fail(item[1], repr(e))
+                finally:
+                    with self._lock:
+                        self.pending -= 1
+        finally:
+            session.close()
+
+    def _post(self, session, job_data, payload):
+        try:
+            response = session.post(self.api_url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._fail(payload, repr(e))
+            return
+        if response.status_code == 201:
+            self._count('uploaded')
+            if self.on_uploaded is not None:
+                self.on_uploaded(job_data)
+        else:
+            self._fail(payload, f'{response.status_code} {response.text[:200]}')
+
+    def _fail(self, job_data, reason):
+        title = job_data.get('title') if isinstance(job_data, dict) else None
+        with self._lock:
+            self.stats['failed'] += 1
+            if len(self.failures) < MAX_REPORTED_FAILURES:
+                self.failures.append((title, reason))
+
+    @property
+    def uploaded(self):
+        return self.stats['uploaded']
+
+    def report(self):
+        rate = self.stats['uploaded'] / self.seconds if self.seconds else 0.0
+        lines = [
+            f"Scraped {self.stats['scraped']}, uploaded {self.stats['uploaded']}, "
+            f"invalid {self.stats['invalid']}, failed {self.stats['failed']} "
+            f"in {self.seconds:.1f}s ({rate:.1f} uploads/s, at most {self.peak_pending} jobs in flight)"
+        ]
+        lines += [f"  invalid: {reason} ({count})" for reason, count in self.invalid_reasons.most_common()]
+        lines += [f"  failed: {title} - {reason}" for title, reason in self.failures]
+        return '\n'.join(lines)
+
+
+class JsonArrayWriter:
+    """Writes jobs to a JSON array file one at a time instead of all at the end"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def __enter__(self):
+        self.file = open(self.path, 'w')
+        self.file.write('[')
+        return self
+
+    def write(self, job_data):
+        job_copy = dict(job_data)
+        if isinstance(job_copy.get('posting_date'), datetime):
+            job_copy['posting_date'] = job_copy['posting_date'].isoformat()
+        self.file.write(',\n' if self.count else '\n')
+        self.file.write(json.dumps(job_copy, indent=2))
+        self.count += 1
+
+    def __exit__(self, *exc_info):
+        self.file.write('\n]\n')
+        self.file.close()
+
+
+def tee(*sinks):
+    """One sink that passes each job to all of ``sinks``"""
+    def sink(job_data):
+        for each in sinks:
+            each(job_data)
+    return sink
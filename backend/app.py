@@ -4,6 +4,17 @@ from flask_cors import CORS
 from config import config
 from db import init_db
 from routes.job_routes import job_bp
+from routes.saved_search_routes import saved_search_bp
+from services.similarity import init_similarity
+from services.saved_search_matcher import init_saved_search_matcher
+from services.change_feed import init_change_feed
+from services.archive import register_archive_command
+from services.search_columns import register_backfill_command
+from services.descriptions import register_description_commands
+from services.columnar import init_columnar
+from services.coalescing import init_coalescing
+from services.admission import init_admission, admission_stats
+from services.profiling import init_profiling
 
 def create_app(config_name=None):
     """Application factory pattern"""
@@ -18,9 +29,36 @@ def create_app(config_name=None):
     
     # Initialize database
     init_db(app)
+
+    # Keep the "similar jobs" index in sync with writes
+    init_similarity(app)
+
+    # Match new and updated jobs against saved searches
+    init_saved_search_matcher(app)
+
+    # Tombstones and live notifications for the change feed
+    init_change_feed(app)
+
+    # Optional in-memory read engine for the list endpoint
+    init_columnar(app)
+
+    # Single-flight coalescing of identical list queries
+    init_coalescing(app)
+
+    # Per-class concurrency limits and early 503s under overload
+    init_admission(app)
+
+    # Opt-in per-request cProfile / tracemalloc capture (PROFILING_ENABLED)
+    init_profiling(app)
     
     # Register blueprints
     app.register_blueprint(job_bp)
+    app.register_blueprint(saved_search_bp)
+
+    # CLI: flask archive-jobs, flask backfill-search-columns, flask offload-descriptions
+    register_archive_command(app)
+    register_backfill_command(app)
+    register_description_commands(app)
     
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
@@ -30,6 +68,17 @@ def create_app(config_name=None):
             'message': 'Job Listing API is running'
         }), 200
     
+    # Runtime metrics
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        return jsonify({
+            'success': True,
+            'data': {
+                'list_coalescing': app.extensions['list_single_flight'].stats(),
+                'admission': admission_stats(app)
+            }
+        }), 200
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -49,4 +98,5 @@ def create_app(config_name=None):
 
 if __name__ == '__main__':
     app = create_app()
+    app.extensions['similarity_index'].start_saver()
     app.run(debug=True, host='0.0.0.0', port=5000)
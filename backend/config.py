@@ -3,10 +3,79 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     """Base configuration class"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Persisted TF-IDF matrix for the "similar jobs" endpoint
+    SIMILARITY_INDEX_PATH = os.environ.get('SIMILARITY_INDEX_PATH') or \
+        os.path.join(basedir, 'instance', 'similarity_index.npz')
+    # How often a worker pulls other workers' writes into its index, and how
+    # often a changed index is saved in the background
+    SIMILARITY_SYNC_SECONDS = float(os.environ.get('SIMILARITY_SYNC_SECONDS', 2))
+    SIMILARITY_SAVE_SECONDS = float(os.environ.get('SIMILARITY_SAVE_SECONDS', 30))
+
+    # Written jobs are matched against saved searches in batches collected
+    # over this many seconds, off the request path (0 matches in the request)
+    SAVED_SEARCH_MATCH_BATCH_SECONDS = float(os.environ.get('SAVED_SEARCH_MATCH_BATCH_SECONDS', 0.5))
+
+    # Change feed: how long deletes stay visible and how event streams behave
+    CHANGE_FEED_TOMBSTONE_DAYS = int(os.environ.get('CHANGE_FEED_TOMBSTONE_DAYS', 30))
+    CHANGE_FEED_POLL_SECONDS = float(os.environ.get('CHANGE_FEED_POLL_SECONDS', 2))
+    CHANGE_FEED_HEARTBEAT_SECONDS = 15
+    CHANGE_FEED_STREAM_SECONDS = int(os.environ.get('CHANGE_FEED_STREAM_SECONDS', 300))
+    # Each open stream holds one of the worker's GUNICORN_THREADS; leave the
+    # rest for ordinary requests
+    CHANGE_FEED_MAX_STREAMS = int(os.environ.get('CHANGE_FEED_MAX_STREAMS',
+                                                 max(1, int(os.environ.get('GUNICORN_THREADS', 4)) // 2)))
+    CHANGE_FEED_RETRY_MS = 3000
+    # Reads reach this far behind a token, for writes stamped before a later commit
+    CHANGE_FEED_OVERLAP_SECONDS = float(os.environ.get('CHANGE_FEED_OVERLAP_SECONDS', 5))
+
+    # flask archive-jobs: age cut-off and batching for moving expired postings
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    ARCHIVE_BATCH_PAUSE_SECONDS = float(os.environ.get('ARCHIVE_BATCH_PAUSE_SECONDS', 0.05))
+
+    # Read engine for GET /api/jobs: 'sql' or the in-memory 'columnar' snapshot
+    READ_ENGINE = os.environ.get('READ_ENGINE', 'sql')
+    COLUMNAR_SYNC_SECONDS = float(os.environ.get('COLUMNAR_SYNC_SECONDS', 1))
+
+    # Share one query between identical concurrent GET /api/jobs requests
+    LIST_COALESCING = os.environ.get('LIST_COALESCING', '1') == '1'
+    COALESCING_FOLLOWER_TIMEOUT = float(os.environ.get('COALESCING_FOLLOWER_TIMEOUT', 10))
+
+    # Admission control: shares of a worker's threads (GUNICORN_THREADS) each
+    # priority class may run and queue on, and the time budget a request may
+    # spend queued plus running. The frontend gives up after 10s, so
+    # answering later than that is wasted work.
+    ADMISSION_CONTROL = os.environ.get('ADMISSION_CONTROL', '1') == '1'
+    ADMISSION_WORKER_THREADS = int(os.environ.get('GUNICORN_THREADS', 4))
+    ADMISSION_CLASSES = {
+        'expensive': (0.25, 0.25),  # Unfiltered list, stats, full change sync
+        'default': (0.5, 0.25),     # Filtered lists and writes
+        'cheap': (1.0, 0),          # Single job lookups
+    }
+    ADMISSION_DEADLINE_SECONDS = float(os.environ.get('ADMISSION_DEADLINE_SECONDS', 8))
+
+    # Largest number of jobs a batch fetch, update or delete may touch
+    BATCH_MAX_JOBS = int(os.environ.get('BATCH_MAX_JOBS', 1000))
+
+    # Time budget of count=exact on paginated lists before it falls back to an estimate
+    COUNT_TIMEOUT_SECONDS = float(os.environ.get('COUNT_TIMEOUT_SECONDS', 0.5))
+
+    # On-demand request profiling: requests carrying X-Profile-Token (or a
+    # random PROFILING_SAMPLE_RATE share) get cProfile, stack samples and a
+    # tracemalloc snapshot saved under PROFILING_DIR. Off unless enabled.
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_STACK_INTERVAL = float(os.environ.get('PROFILING_STACK_INTERVAL', 0.001))
+    PROFILING_DIR = os.environ.get('PROFILING_DIR') or os.path.join(basedir, 'instance', 'profiles')
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', 200))
     
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -32,6 +101,9 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SIMILARITY_INDEX_PATH = None
+    # The in-memory database is one connection; keep matching in the request thread
+    SAVED_SEARCH_MATCH_BATCH_SECONDS = 0
 
 # Configuration dictionary
 config = {
@@ -0,0 +1,59 @@
+"""gunicorn settings for the production entry point (wsgi.py).
+
+    cd backend
+    DATABASE_URL=mysql+pymysql://... gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be tuned through the environment without editing this file.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Preforked processes, each serving requests on a small thread pool. The
+# threads cover I/O waits (database, event streams); the processes give
+# CPU-bound work (serialisation, similarity scoring) more than one core.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to cap slow memory growth; jitter keeps them
+# from all restarting at once. 0 disables it.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # '-' for stdout; off by default
+errorlog = '-'
+
+
+def when_ready(server):
+    from wsgi import app, warm_up_shared
+    warm_up_shared(app)
+    server.log.info('Shared caches loaded before forking %s workers', server.cfg.workers)
+
+
+def post_fork(server, worker):
+    from wsgi import app, warm_up_worker, shut_down_worker
+    warm_up_worker(app, server.cfg.threads)
+
+    # gunicorn installs worker.handle_exit as the SIGTERM handler after this
+    # hook, so wrapping it here lets open event streams end before the grace period
+    handle_exit = worker.handle_exit
+
+    def handle_exit_and_close_streams(sig, frame):
+        shut_down_worker(app)
+        handle_exit(sig, frame)
+
+    worker.handle_exit = handle_exit_and_close_streams
+
+
+def worker_exit(server, worker):
+    from wsgi import app, close_worker
+    close_worker(app)
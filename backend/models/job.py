@@ -1,25 +1,134 @@
+import unicodedata
+import zlib
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
 from db import db, ma
 from marshmallow import fields, validate
 
-class Job(db.Model):
-    """Job model for storing job listings"""
-    __tablename__ = 'jobs'
-    
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']
+
+# Only the start of the description is searchable, to keep search_blob small
+SEARCH_DESCRIPTION_CHARS = 500
+
+# Fields that feed search_blob
+SEARCH_BLOB_FIELDS = ('title', 'company', 'tags', 'description')
+
+# Normalised columns hold lowercase, accent-free text, so MySQL can compare
+# them with a binary collation instead of a case-insensitive one
+NormalizedString = db.String(200).with_variant(mysql.VARCHAR(200, collation='utf8mb4_bin'), 'mysql')
+NormalizedText = db.Text().with_variant(mysql.TEXT(collation='utf8mb4_bin'), 'mysql')
+
+# Change-feed timestamps need sub-second precision; MySQL's DATETIME keeps whole seconds
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+def normalize_search_text(text):
+    """Lowercase and strip accents, the form filters compare against"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def build_search_blob(title, company, tags, description):
+    """Normalised title, company, tags and description start, one per line"""
+    parts = (title, company, tags, (description or '')[:SEARCH_DESCRIPTION_CHARS])
+    return '\n'.join(normalize_search_text(part) for part in parts)
+
+def normalized_column_changes(changes):
+    """location_norm / tags_norm values implied by a dict of column changes"""
+    derived = {}
+    if 'location' in changes:
+        derived['location_norm'] = normalize_search_text(changes['location'])
+    if 'tags' in changes:
+        derived['tags_norm'] = normalize_search_text(changes['tags'])
+    return derived
+
+class JobDescription(db.Model):
+    """zlib-compressed job description, kept out of the jobs table.
+
+    Keyed by job id and shared by live and archived jobs (archiving keeps
+    the id), so moving a job to the archive never touches its description.
+    """
+    __tablename__ = 'job_descriptions'
+
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    body = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # Uncompressed UTF-8 bytes
+    compressed_size = db.Column(db.Integer, nullable=False)
+
+    @staticmethod
+    def pack(text):
+        """Column values storing ``text``"""
+        raw = text.encode('utf-8')
+        body = zlib.compress(raw)
+        return {'body': body, 'size': len(raw), 'compressed_size': len(body)}
+
+    @staticmethod
+    def unpack(body):
+        return zlib.decompress(body).decode('utf-8') if body is not None else None
+
+    @property
+    def text(self):
+        return self.unpack(self.body)
+
+def load_descriptions(job_ids, chunk_size=500):
+    """Map job id to description for the given jobs, a few IN queries at most"""
+    job_ids = list(job_ids)
+    descriptions = {}
+    for start in range(0, len(job_ids), chunk_size):
+        rows = db.session.query(JobDescription.job_id, JobDescription.body) \
+            .filter(JobDescription.job_id.in_(job_ids[start:start + chunk_size]))
+        descriptions.update((job_id, JobDescription.unpack(body)) for job_id, body in rows)
+    return descriptions
+
+def replace_descriptions(job_ids, text):
+    """Set the description of jobs changed by a bulk UPDATE, in the same transaction"""
+    JobDescription.query.filter(JobDescription.job_id.in_(job_ids)).delete(synchronize_session=False)
+    if text is not None:
+        db.session.bulk_insert_mappings(JobDescription, [
+            dict(JobDescription.pack(text), job_id=job_id) for job_id in job_ids
+        ])
+
+def delete_descriptions(job_ids):
+    JobDescription.query.filter(JobDescription.job_id.in_(job_ids)).delete(synchronize_session=False)
+
+class JobColumnsMixin:
+    """Columns shared by live jobs and the archive table"""
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     company = db.Column(db.String(200), nullable=False)
     location = db.Column(db.String(200), nullable=False)
-    posting_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    posting_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     job_type = db.Column(db.String(50), nullable=False, default='Full-time')
     tags = db.Column(db.Text)  # Comma-separated tags
-    description = db.Column(db.Text)
     url = db.Column(db.String(500))  # Original job posting URL
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+    updated_at = db.Column(PreciseDateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Bumped on every write
+
+    # Normalised copies maintained on write for the list filters
+    search_blob = db.Column(NormalizedText)
+    location_norm = db.Column(NormalizedString)
+    tags_norm = db.Column(NormalizedText)
+
     def __repr__(self):
         return f'<Job {self.title} at {self.company}>'
+
+    @property
+    def description(self):
+        """Description text, loaded from job_descriptions on first access"""
+        record = self.description_record
+        return record.text if record is not None else None
+
+    @description.setter
+    def description(self, text):
+        if text is None:
+            self.description_record = None
+        elif self.description_record is not None:
+            for name, value in JobDescription.pack(text).items():
+                setattr(self.description_record, name, value)
+        else:
+            self.description_record = JobDescription(**JobDescription.pack(text))
     
     def to_dict(self):
         """Convert job object to dictionary"""
@@ -34,25 +143,99 @@ class Job(db.Model):
             'description': self.description,
             'url': self.url,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version
         }
 
+    def refresh_search_columns(self):
+        """Recompute the normalised filter columns from the source fields"""
+        self.search_blob = build_search_blob(self.title, self.company, self.tags, self.description)
+        self.location_norm = normalize_search_text(self.location)
+        self.tags_norm = normalize_search_text(self.tags)
+
+class Job(JobColumnsMixin, db.Model):
+    """Job model for storing job listings"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # MySQL can only index a prefix of a TEXT column
+        db.Index('ix_jobs_search_blob', 'search_blob', mysql_length=191),
+        # Never reuse the id of an archived job: its description stays keyed by it
+        {'sqlite_autoincrement': True},
+    )
+
+    description_record = db.relationship(
+        JobDescription, primaryjoin='foreign(JobDescription.job_id) == Job.id',
+        uselist=False, cascade='all, delete-orphan'
+    )
+
+@event.listens_for(Job, 'before_insert')
+@event.listens_for(Job, 'before_update')
+def _refresh_job_search_columns(mapper, connection, job):
+    job.refresh_search_columns()
+
+def refresh_search_blobs(job_ids):
+    """Rewrite search_blob for jobs changed by a bulk UPDATE, in the same transaction"""
+    rows = db.session.query(Job.id, Job.title, Job.company, Job.tags, JobDescription.body) \
+        .outerjoin(JobDescription, JobDescription.job_id == Job.id) \
+        .filter(Job.id.in_(job_ids)).all()
+    db.session.bulk_update_mappings(Job, [
+        {'id': row.id,
+         'search_blob': build_search_blob(row.title, row.company, row.tags, JobDescription.unpack(row.body))}
+        for row in rows
+    ])
+
+def lock_search_sources(job_id, with_description=True):
+    """Version, title, company, tags and (compressed) description body of one job.
+
+    Locks the job row until commit so the search_blob built from these
+    stays current; None when the job does not exist.
+    """
+    columns = [Job.version, Job.title, Job.company, Job.tags]
+    if with_description:
+        # A subquery rather than a join keeps FOR UPDATE on the jobs row alone
+        columns.append(db.session.query(JobDescription.body)
+                       .filter(JobDescription.job_id == Job.id).scalar_subquery().label('body'))
+    return db.session.query(*columns).filter(Job.id == job_id).with_for_update().first()
+
+class ArchivedJob(JobColumnsMixin, db.Model):
+    """Expired job moved out of the hot table by the archive-jobs command"""
+    __tablename__ = 'jobs_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # Keeps the original job id
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    description_record = db.relationship(
+        JobDescription, primaryjoin='foreign(JobDescription.job_id) == ArchivedJob.id',
+        uselist=False, viewonly=True
+    )
+
+class JobTombstone(db.Model):
+    """Marker left behind by a deleted job so change feeds can report the delete"""
+    __tablename__ = 'job_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(PreciseDateTime, nullable=False, default=datetime.utcnow, index=True)
+
 class JobSchema(ma.SQLAlchemyAutoSchema):
     """Marshmallow schema for Job serialization"""
     class Meta:
         model = Job
         load_instance = False  # Return dictionaries, not model instances
         include_fk = True
+        exclude = ('search_blob', 'location_norm', 'tags_norm')  # Internal filter columns
     
     # Validation rules
     title = fields.Str(required=True, validate=validate.Length(min=1, max=200))
     company = fields.Str(required=True, validate=validate.Length(min=1, max=200))
     location = fields.Str(required=True, validate=validate.Length(min=1, max=200))
-    job_type = fields.Str(validate=validate.OneOf(['Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']))
+    job_type = fields.Str(validate=validate.OneOf(JOB_TYPES))
     tags = fields.Str(allow_none=True)
     description = fields.Str(allow_none=True)
     url = fields.Str(allow_none=True, validate=validate.Length(max=500))
+    version = fields.Int(dump_only=True)
 
 # Schema instances
 job_schema = JobSchema()
 jobs_schema = JobSchema(many=True)
+job_list_schema = JobSchema(many=True, exclude=('description',))  # Lists load descriptions only on request
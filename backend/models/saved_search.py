@@ -0,0 +1,51 @@
+from datetime import datetime
+from db import db, ma
+from marshmallow import fields, validate
+from models.job import JOB_TYPES
+
+class SavedSearch(db.Model):
+    """Saved job filters that users want to be alerted about"""
+    __tablename__ = 'saved_searches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200))
+    email = db.Column(db.String(200))  # Where alerts should go
+    # Same filter vocabulary as GET /api/jobs
+    job_type = db.Column(db.String(50))
+    location = db.Column(db.String(200))
+    tag = db.Column(db.String(200))
+    search = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SavedSearch {self.id} {self.name}>'
+
+class SavedSearchMatch(db.Model):
+    """A job that matched a saved search when it was created or updated"""
+    __tablename__ = 'saved_search_matches'
+    __table_args__ = (
+        db.UniqueConstraint('saved_search_id', 'job_id', name='uq_saved_search_match'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_searches.id', ondelete='CASCADE'),
+                                nullable=False, index=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    matched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SavedSearchSchema(ma.SQLAlchemyAutoSchema):
+    """Marshmallow schema for SavedSearch serialization"""
+    class Meta:
+        model = SavedSearch
+        load_instance = False
+
+    name = fields.Str(allow_none=True, validate=validate.Length(max=200))
+    email = fields.Email(allow_none=True)
+    job_type = fields.Str(allow_none=True, validate=validate.OneOf(JOB_TYPES))
+    location = fields.Str(allow_none=True, validate=validate.Length(max=200))
+    tag = fields.Str(allow_none=True, validate=validate.Length(max=200))
+    search = fields.Str(allow_none=True, validate=validate.Length(max=200))
+
+# Schema instances
+saved_search_schema = SavedSearchSchema()
+saved_searches_schema = SavedSearchSchema(many=True)
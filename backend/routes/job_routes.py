@@ -1,82 +1,313 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_, desc, asc
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from sqlalchemy import desc, asc, select, union_all, update
+from sqlalchemy.orm import selectinload
 from db import db
-from models.job import Job, job_schema, jobs_schema
+from models.job import Job, ArchivedJob, JobDescription, job_schema, jobs_schema, job_list_schema, \
+    normalize_search_text, normalized_column_changes, refresh_search_blobs, build_search_blob, lock_search_sources, \
+    SEARCH_BLOB_FIELDS, load_descriptions, replace_descriptions, delete_descriptions
+from services.archive import ARCHIVED_COLUMNS
+from services.similarity import get_similarity_index
+from services.columnar import get_columnar_store
+from services.coalescing import get_list_single_flight, list_query_key
+from services.change_feed import ChangeTokenExpired, parse_token, get_changes, iter_change_events, \
+    record_tombstones
+from services.counting import COUNT_MODES, CountTimeout, exact_count, estimate_count
+from signals import jobs_saved, jobs_deleted, send_after_commit
 from marshmallow import ValidationError
 from datetime import datetime
 
 # Create Blueprint
 job_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
+# Sort options of get_jobs: column name and direction
+SORT_OPTIONS = {
+    'posting_date_desc': ('posting_date', desc),
+    'posting_date_asc': ('posting_date', asc),
+    'title_asc': ('title', asc),
+    'title_desc': ('title', desc),
+    'company_asc': ('company', asc),
+    'company_desc': ('company', desc),
+}
+
+def job_filter_conditions(columns, args):
+    """Build the get_jobs filter conditions against a model or table columns.
+
+    Text filters run against columns normalised on write, so the needle is
+    normalised once here and compared as a plain substring, no lower() per row.
+    """
+    conditions = []
+    job_type = args.get('job_type')
+    location = args.get('location')
+    tag = args.get('tag')
+    search = args.get('search')
+
+    if job_type:
+        conditions.append(columns.job_type == job_type)
+
+    if location:
+        conditions.append(columns.location_norm.contains(normalize_search_text(location), autoescape=True))
+
+    if tag:
+        conditions.append(columns.tags_norm.contains(normalize_search_text(tag), autoescape=True))
+
+    if search:
+        conditions.append(columns.search_blob.contains(normalize_search_text(search), autoescape=True))
+    return conditions
+
+def job_sort_clauses(columns, sort_by):
+    """ORDER BY clauses for a get_jobs sort option, ties broken by id"""
+    if sort_by not in SORT_OPTIONS:
+        return [asc(columns.id)]
+    name, direction = SORT_OPTIONS[sort_by]
+    return [direction(getattr(columns, name)), asc(columns.id)]
+
+def wants_archived(args):
+    """True when a request explicitly asks to include archived jobs"""
+    return args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+def wants_descriptions(args):
+    """True when a list request asks for descriptions with ``include=description``"""
+    return 'description' in args.get('include', '').split(',')
+
+def with_descriptions(rows):
+    """Copies of serialized jobs with their descriptions, loaded in bulk"""
+    descriptions = load_descriptions(row['id'] for row in rows)
+    return [dict(row, description=descriptions.get(row['id'])) for row in rows]
+
+def job_etag(job_id, version):
+    """Strong ETag identifying one version of a job"""
+    return f'"{job_id}-{version}"'
+
+def expected_version(job_id, body_version=None):
+    """Version a write must match, from If-Match or a ``version`` body field.
+
+    Returns None for unconditional writes and -1 when If-Match names no
+    version of this job, which can never match.
+    """
+    if request.if_match and not request.if_match.star_tag:
+        prefix = f'{job_id}-'
+        for tag in request.if_match.as_set():
+            if tag.startswith(prefix) and tag[len(prefix):].isdigit():
+                return int(tag[len(prefix):])
+        return -1
+    if body_version is not None:
+        if isinstance(body_version, bool) or not str(body_version).isdigit():
+            raise ValidationError({'version': ['Not a valid integer.']})
+        return int(body_version)
+    return None
+
+def update_job_returning_version(job_id, values):
+    """UPDATE one job and bump its version; returns the new version, or None if the job is gone.
+
+    PostgreSQL hands the version back with RETURNING and MySQL through
+    LAST_INSERT_ID(expr), which the server reports with the UPDATE itself.
+    SQLite reads it first and retries if another write slips in between.
+    """
+    statement = update(Job).where(Job.id == job_id).execution_options(synchronize_session=False)
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return db.session.execute(
+            statement.values(dict(values, version=Job.version + 1)).returning(Job.version)
+        ).scalar()
+    if dialect == 'mysql':
+        result = db.session.execute(statement.values(dict(values, version=db.func.last_insert_id(Job.version + 1))))
+        return result.lastrowid if result.rowcount else None
+    while True:
+        version = db.session.query(Job.version).filter(Job.id == job_id).scalar()
+        if version is None:
+            return None
+        result = db.session.execute(statement.where(Job.version == version).values(dict(values, version=version + 1)))
+        if result.rowcount:
+            return version + 1
+
+def version_mismatch_response(job_id):
+    """404 if the job is gone, otherwise 409 with its current version"""
+    current = db.session.query(Job.version).filter(Job.id == job_id).scalar()
+    if current is None:
+        return jsonify({
+            'success': False,
+            'message': 'Job not found'
+        }), 404
+    return jsonify({
+        'success': False,
+        'message': 'Job was modified by someone else',
+        'current_version': current
+    }), 409, {'ETag': job_etag(job_id, current)}
+
+def page_bounds(args):
+    """``(limit, offset)`` of a get_jobs page; a limit of None returns every match"""
+    limit = args.get('limit', type=int)
+    offset = max(args.get('offset', 0, type=int), 0)
+    return (max(limit, 1) if limit is not None else None), offset
+
+def fetch_job_list(args):
+    """Run a get_jobs query and return the serialized page and, if known for free, the total"""
+    sort_by = args.get('sort', 'posting_date_desc')
+    limit, offset = page_bounds(args)
+    columnar_store = get_columnar_store()
+
+    if columnar_store and not wants_archived(args):
+        # In-memory engine already holds serialized rows and counts them exactly
+        result, total = columnar_store.query(args, sort_by, limit, offset)
+        return (with_descriptions(result) if wants_descriptions(args) else result), total
+
+    if wants_archived(args):
+        # Historical query: filter each table, then sort the union
+        columns = [Job.__table__.c[name] for name in ARCHIVED_COLUMNS]
+        archived_columns = [ArchivedJob.__table__.c[name] for name in ARCHIVED_COLUMNS]
+        combined = union_all(
+            select(*columns).where(*job_filter_conditions(Job, args)),
+            select(*archived_columns).where(*job_filter_conditions(ArchivedJob, args))
+        ).subquery()
+        statement = select(combined).order_by(*job_sort_clauses(combined.c, sort_by))
+        if limit is not None or offset:
+            statement = statement.limit(limit).offset(offset)
+        jobs = db.session.execute(statement).all()
+    else:
+        # Default query only touches the hot table
+        query = Job.query \
+            .filter(*job_filter_conditions(Job, args)) \
+            .order_by(*job_sort_clauses(Job, sort_by))
+        if limit is not None or offset:
+            query = query.limit(limit).offset(offset)
+        jobs = query.all()
+
+    # Descriptions live in a side table and are only read when asked for
+    result = job_list_schema.dump(jobs)
+    return (with_descriptions(result) if wants_descriptions(args) else result), None
+
+def count_job_list(args, result, total):
+    """``(count, count_type)`` for a get_jobs page, following ``count=exact|estimate|none``"""
+    mode = args.get('count', 'exact')
+    if mode == 'none':
+        return None, 'none'
+    if total is not None:
+        return total, 'exact'
+
+    # A page that ends before its limit is the last one, so the total is known
+    limit, offset = page_bounds(args)
+    if (limit is None or len(result) < limit) and (result or not offset):
+        return offset + len(result), 'exact'
+
+    tables = [Job.__table__, ArchivedJob.__table__] if wants_archived(args) else [Job.__table__]
+
+    def conditions_for(columns):
+        return job_filter_conditions(columns, args)
+
+    if mode == 'exact':
+        try:
+            timeout = current_app.config['COUNT_TIMEOUT_SECONDS']
+            return sum(exact_count(table, conditions_for, timeout) for table in tables), 'exact'
+        except CountTimeout:
+            pass  # Too expensive right now; report an estimate instead
+
+    estimate = sum(estimate_count(table, conditions_for) for table in tables)
+    # Never estimate fewer jobs than this page proves exist
+    return max(estimate, offset + len(result)), 'estimate'
+
+def render_job_list(args):
+    """Serialized get_jobs response body"""
+    result, total = fetch_job_list(args)
+    count, count_type = count_job_list(args, result, total)
+    return jsonify({
+        'success': True,
+        'data': result,
+        'count': count,
+        'count_type': count_type
+    }).get_data()
+
 @job_bp.route('', methods=['GET'])
 def get_jobs():
     """Get all jobs with optional filtering and sorting"""
     try:
-        # Start with base query
-        query = Job.query
-        
-        # Apply filters
-        job_type = request.args.get('job_type')
-        location = request.args.get('location')
-        tag = request.args.get('tag')
-        search = request.args.get('search')
-        
-        if job_type:
-            query = query.filter(Job.job_type == job_type)
-        
-        if location:
-            query = query.filter(Job.location.ilike(f'%{location}%'))
-        
-        if tag:
-            query = query.filter(Job.tags.ilike(f'%{tag}%'))
-        
-        if search:
-            query = query.filter(
-                or_(
-                    Job.title.ilike(f'%{search}%'),
-                    Job.company.ilike(f'%{search}%'),
-                    Job.description.ilike(f'%{search}%')
-                )
-            )
-        
-        # Apply sorting
-        sort_by = request.args.get('sort', 'posting_date_desc')
-        
-        if sort_by == 'posting_date_desc':
-            query = query.order_by(desc(Job.posting_date))
-        elif sort_by == 'posting_date_asc':
-            query = query.order_by(asc(Job.posting_date))
-        elif sort_by == 'title_asc':
-            query = query.order_by(asc(Job.title))
-        elif sort_by == 'title_desc':
-            query = query.order_by(desc(Job.title))
-        elif sort_by == 'company_asc':
-            query = query.order_by(asc(Job.company))
-        elif sort_by == 'company_desc':
-            query = query.order_by(desc(Job.company))
-        
-        # Execute query
-        jobs = query.all()
+        args = request.args
+        if args.get('count', 'exact') not in COUNT_MODES:
+            return jsonify({
+                'success': False,
+                'message': 'count must be exact, estimate or none'
+            }), 400
+
+        single_flight = get_list_single_flight()
+        if single_flight:
+            # Identical concurrent requests share one query and one dump
+            body = single_flight.do(list_query_key(args), lambda: render_job_list(args))
+        else:
+            body = render_job_list(args)
+
+        return current_app.response_class(body, status=200, mimetype='application/json')
         
-        # Serialize and return
-        result = jobs_schema.dump(jobs)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching jobs: {str(e)}'
+        }), 500
+
+@job_bp.route('/changes', methods=['GET'])
+def get_job_changes():
+    """Get jobs created, updated or deleted since a change token"""
+    try:
+        since = parse_token(request.args.get('since'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid change token'
+        }), 400
+
+    try:
+        changes = get_changes(since, wants_descriptions(request.args))
         return jsonify({
             'success': True,
-            'data': result,
-            'count': len(result)
+            'data': changes,
+            'count': len(changes['updated']) + len(changes['deleted'])
         }), 200
-        
+
+    except ChangeTokenExpired:
+        return jsonify({
+            'success': False,
+            'message': 'Change token expired, fetch the full list again'
+        }), 410
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Error fetching jobs: {str(e)}'
+            'message': f'Error fetching job changes: {str(e)}'
         }), 500
 
+@job_bp.route('/changes/stream', methods=['GET'])
+def stream_job_changes():
+    """Server-sent event stream of job changes"""
+    # EventSource resends the id of the last event it saw when reconnecting
+    token = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        parse_token(token)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid change token'
+        }), 400
+
+    # A stream occupies a worker thread for its whole life; cap them per worker
+    notifier = current_app.extensions['change_notifier']
+    if not notifier.open_stream(current_app.config['CHANGE_FEED_MAX_STREAMS']):
+        return jsonify({
+            'success': False,
+            'message': 'Too many open change streams, poll /api/jobs/changes instead'
+        }), 503, {'Retry-After': str(current_app.config['CHANGE_FEED_RETRY_MS'] // 1000)}
+
+    response = Response(
+        stream_with_context(iter_change_events(token, wants_descriptions(request.args))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(notifier.close_stream)
+    return response
+
 @job_bp.route('/<int:job_id>', methods=['GET'])
 def get_job(job_id):
     """Get a single job by ID"""
     try:
         job = Job.query.get(job_id)
+        if not job and wants_archived(request.args):
+            job = ArchivedJob.query.get(job_id)
         if not job:
             return jsonify({
                 'success': False,
@@ -87,7 +318,7 @@ def get_job(job_id):
         return jsonify({
             'success': True,
             'data': result
-        }), 200
+        }), 200, {'ETag': job_etag(job.id, job.version)}
         
     except Exception as e:
         return jsonify({
@@ -95,6 +326,41 @@ def get_job(job_id):
             'message': f'Error fetching job: {str(e)}'
         }), 500
 
+@job_bp.route('/<int:job_id>/similar', methods=['GET'])
+def get_similar_jobs(job_id):
+    """Get the jobs most similar to a job by title, tags and description"""
+    try:
+        k = min(max(request.args.get('k', 10, type=int), 1), 50)
+
+        neighbours = get_similarity_index().most_similar([job_id], k=k).get(job_id)
+        if neighbours is None:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+
+        # Load the neighbours in one query and keep the similarity order
+        scores = dict(neighbours)
+        jobs = Job.query.filter(Job.id.in_(scores)).all() if scores else []
+        jobs.sort(key=lambda job: scores[job.id], reverse=True)
+
+        result = job_list_schema.dump(jobs)
+        if wants_descriptions(request.args):
+            result = with_descriptions(result)
+        for item in result:
+            item['similarity'] = round(scores[item['id']], 4)
+        return jsonify({
+            'success': True,
+            'data': result,
+            'count': len(result)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching similar jobs: {str(e)}'
+        }), 500
+
 @job_bp.route('', methods=['POST'])
 def create_job():
     """Create a new job"""
@@ -106,6 +372,7 @@ def create_job():
         new_job = Job(**job_data)
         db.session.add(new_job)
         db.session.commit()
+        send_after_commit(jobs_saved, current_app._get_current_object(), jobs=[new_job])
 
         result = job_schema.dump(new_job)
         return jsonify({
@@ -129,17 +396,27 @@ def create_job():
 
 @job_bp.route('/<int:job_id>', methods=['PUT'])
 def update_job(job_id):
-    """Update an existing job"""
+    """Update an existing job, optionally guarded by its version"""
     try:
-        job = Job.query.get(job_id)
+        job_data = request.json
+        if not isinstance(job_data, dict):
+            raise ValidationError({'_schema': ['Invalid input type.']})
+        job_data = dict(job_data)
+        expected = expected_version(job_id, job_data.pop('version', None))
+
+        # Lock the row so the version checked here is the one replaced
+        job = Job.query.filter(Job.id == job_id).with_for_update().first()
         if not job:
             return jsonify({
                 'success': False,
                 'message': 'Job not found'
             }), 404
+        if expected is not None and job.version != expected:
+            db.session.rollback()
+            return version_mismatch_response(job_id)
 
         # Validate input data - this now returns a dictionary
-        job_data = job_schema.load(request.json, partial=True)
+        job_data = job_schema.load(job_data, partial=True)
 
         # Update job fields
         for key, value in job_data.items():
@@ -147,16 +424,19 @@ def update_job(job_id):
                 setattr(job, key, value)
 
         job.updated_at = datetime.utcnow()
+        job.version += 1
         db.session.commit()
+        send_after_commit(jobs_saved, current_app._get_current_object(), jobs=[job])
 
         result = job_schema.dump(job)
         return jsonify({
             'success': True,
             'message': 'Job updated successfully',
             'data': result
-        }), 200
+        }), 200, {'ETag': job_etag(job.id, job.version)}
 
     except ValidationError as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'message': 'Validation error',
@@ -169,20 +449,105 @@ def update_job(job_id):
             'message': f'Error updating job: {str(e)}'
         }), 500
 
-@job_bp.route('/<int:job_id>', methods=['DELETE'])
-def delete_job(job_id):
-    """Delete a job"""
+@job_bp.route('/<int:job_id>', methods=['PATCH'])
+def patch_job(job_id):
+    """Partially update a job with one UPDATE, optionally guarded by its version"""
     try:
-        job = Job.query.get(job_id)
-        if not job:
+        job_data = request.json
+        if not isinstance(job_data, dict):
+            raise ValidationError({'_schema': ['Invalid input type.']})
+        job_data = dict(job_data)
+        expected = expected_version(job_id, job_data.pop('version', None))
+
+        # Validate input data - this now returns a dictionary
+        job_data = job_schema.load(job_data, partial=True)
+        job_data.pop('id', None)
+        job_data.pop('created_at', None)
+        if not job_data:
             return jsonify({
                 'success': False,
-                'message': 'Job not found'
-            }), 404
+                'message': 'No changes given'
+            }), 400
+        patched = dict(job_data)
+
+        description = job_data.pop('description', None)
+        values = dict(job_data, **normalized_column_changes(job_data))
+        values['updated_at'] = datetime.utcnow()
+        if any(field in patched for field in SEARCH_BLOB_FIELDS):
+            # search_blob also depends on fields the patch leaves out: read
+            # only those, under the row lock, and write the blob in the UPDATE
+            current = lock_search_sources(job_id, with_description='description' not in patched)
+            if current is None or expected not in (None, current.version):
+                db.session.rollback()
+                return version_mismatch_response(job_id)
+            expected = current.version
+            values['search_blob'] = build_search_blob(
+                values.get('title', current.title), values.get('company', current.company),
+                values.get('tags', current.tags),
+                description if 'description' in patched else JobDescription.unpack(current.body)
+            )
+
+        # UPDATE jobs SET ..., version = version + 1 WHERE id = ? [AND version = ?]
+        if expected is None:
+            version = update_job_returning_version(job_id, values)
+        else:
+            updated = Job.query.filter(Job.id == job_id, Job.version == expected) \
+                .update(dict(values, version=expected + 1), synchronize_session=False)
+            version = expected + 1 if updated else None
+        if version is not None and 'description' in patched:
+            replace_descriptions([job_id], description)
+        db.session.commit()
+
+        if version is None:
+            return version_mismatch_response(job_id)
+
+        # Receivers get what was written, not a re-read of the whole row
+        change = dict(values, id=job_id, version=version)
+        if 'description' in patched:
+            change['description'] = description
+        send_after_commit(jobs_saved, current_app._get_current_object(), changes=[change])
+
+        result = dict(job_schema.dump(patched), id=job_id, version=version)
+        return jsonify({
+            'success': True,
+            'message': 'Job updated successfully',
+            'data': result
+        }), 200, {'ETag': job_etag(job_id, version)}
+
+    except ValidationError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Validation error',
+            'errors': e.messages
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error updating job: {str(e)}'
+        }), 500
 
-        db.session.delete(job)
+@job_bp.route('/<int:job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Delete a job with one DELETE, optionally guarded by its version"""
+    try:
+        query = Job.query.filter(Job.id == job_id)
+        expected = expected_version(job_id)
+        if expected is not None:
+            query = query.filter(Job.version == expected)
+        deleted = query.delete(synchronize_session=False)
+        if deleted:
+            delete_descriptions([job_id])
+            # Same transaction as the delete, so the change feed can never miss it
+            record_tombstones([job_id])
         db.session.commit()
 
+        if not deleted:
+            return version_mismatch_response(job_id)
+
+        send_after_commit(jobs_deleted, current_app._get_current_object(), job_ids=[job_id])
+
         return jsonify({
             'success': True,
             'message': 'Job deleted successfully'
@@ -200,13 +565,20 @@ def get_job_stats():
     """Get job statistics"""
     try:
         total_jobs = Job.query.count()
-        job_types = db.session.query(Job.job_type, db.func.count(Job.id)).group_by(Job.job_type).all()
+        job_types = dict(db.session.query(Job.job_type, db.func.count(Job.id)).group_by(Job.job_type).all())
+
+        if wants_archived(request.args):
+            total_jobs += ArchivedJob.query.count()
+            archived_types = db.session.query(ArchivedJob.job_type, db.func.count(ArchivedJob.id)) \
+                .group_by(ArchivedJob.job_type).all()
+            for job_type, count in archived_types:
+                job_types[job_type] = job_types.get(job_type, 0) + count
 
         return jsonify({
             'success': True,
             'data': {
                 'total_jobs': total_jobs,
-                'job_types': dict(job_types)
+                'job_types': job_types
             }
         }), 200
 
@@ -215,3 +587,182 @@ def get_job_stats():
             'success': False,
             'message': f'Error fetching stats: {str(e)}'
         }), 500
+
+def parse_job_ids(values):
+    """Parse ids given as a list or comma-separated strings; raises ValueError"""
+    ids = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            ids.append(value)
+        elif isinstance(value, str):
+            ids.extend(int(part) for part in value.split(',') if part.strip())
+        else:
+            raise ValueError(f'Invalid job id: {value!r}')
+    # Keep the caller's order but drop duplicates
+    return list(dict.fromkeys(ids))
+
+def batch_condition(payload):
+    """WHERE clause for the jobs addressed by a batch body (``ids`` or ``filter``); raises ValueError"""
+    if not isinstance(payload, dict):
+        raise ValueError('Body must be a JSON object')
+    if payload.get('ids'):
+        ids = payload['ids']
+        try:
+            ids = parse_job_ids(ids if isinstance(ids, list) else [ids])
+        except ValueError:
+            raise ValueError('ids must be a list of integers')
+        return Job.id.in_(ids)
+    if payload.get('filter'):
+        batch_filter = payload['filter']
+        if not isinstance(batch_filter, dict) or not all(isinstance(value, str) for value in batch_filter.values()):
+            raise ValueError('filter must be an object of strings')
+        conditions = job_filter_conditions(Job, batch_filter)
+        if not conditions:
+            raise ValueError('filter must contain job_type, location, tag or search')
+        return db.and_(*conditions)
+    raise ValueError('Provide ids or filter')
+
+def select_batch_ids(payload):
+    """Lock and return the ids addressed by a batch body; raises ValueError"""
+    limit = current_app.config['BATCH_MAX_JOBS']
+    # The ids are needed for descriptions, tombstones and the signals, and
+    # MySQL has no UPDATE/DELETE ... RETURNING, so lock the rows and read
+    # them, in id order so concurrent batches lock in the same order
+    ids = [row.id for row in db.session.query(Job.id).filter(batch_condition(payload))
+           .order_by(Job.id).limit(limit + 1).with_for_update()]
+    if len(ids) > limit:
+        raise ValueError(f'Batch is limited to {limit} jobs')
+    return ids
+
+@job_bp.route('/batch', methods=['GET'])
+def get_jobs_batch():
+    """Get several jobs by id with one query"""
+    try:
+        ids = parse_job_ids(request.args.getlist('ids'))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'ids must be a comma-separated list of integers'
+        }), 400
+
+    if len(ids) > current_app.config['BATCH_MAX_JOBS']:
+        return jsonify({
+            'success': False,
+            'message': f'Batch is limited to {current_app.config["BATCH_MAX_JOBS"]} jobs'
+        }), 400
+
+    try:
+        query = Job.query.options(selectinload(Job.description_record)).filter(Job.id.in_(ids))
+        jobs = {job.id: job for job in query} if ids else {}
+
+        # Return jobs in the requested order and report the ids that do not exist
+        result = jobs_schema.dump([jobs[job_id] for job_id in ids if job_id in jobs])
+        return jsonify({
+            'success': True,
+            'data': result,
+            'count': len(result),
+            'missing': [job_id for job_id in ids if job_id not in jobs]
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching jobs: {str(e)}'
+        }), 500
+
+@job_bp.route('/batch', methods=['PATCH'])
+def update_jobs_batch():
+    """Apply the same changes to jobs selected by ids or filter"""
+    try:
+        payload = request.json or {}
+        if not isinstance(payload, dict):
+            raise ValueError('Body must be a JSON object')
+        changes = job_schema.load(payload.get('changes') or {}, partial=True)
+        changes.pop('id', None)
+        changes.pop('created_at', None)
+        if not changes:
+            return jsonify({
+                'success': False,
+                'message': 'No changes given'
+            }), 400
+
+        ids = select_batch_ids(payload)
+        updated = 0
+        if ids:
+            changes_blob = any(field in changes for field in SEARCH_BLOB_FIELDS)
+            changes_description = 'description' in changes
+            description = changes.pop('description', None)
+            changes.update(normalized_column_changes(changes))
+            changes['updated_at'] = datetime.utcnow()
+            changes['version'] = Job.version + 1
+            # One set-based UPDATE for the whole batch
+            updated = Job.query.filter(Job.id.in_(ids)).update(changes, synchronize_session=False)
+            if changes_description:
+                replace_descriptions(ids, description)
+            if changes_blob:
+                refresh_search_blobs(ids)
+        db.session.commit()
+
+        if ids:
+            jobs = Job.query.options(selectinload(Job.description_record)).filter(Job.id.in_(ids)).all()
+            send_after_commit(jobs_saved, current_app._get_current_object(), jobs=jobs)
+
+        return jsonify({
+            'success': True,
+            'message': f'{updated} jobs updated successfully',
+            'data': {'updated': updated, 'ids': ids}
+        }), 200
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation error',
+            'errors': e.messages
+        }), 400
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error updating jobs: {str(e)}'
+        }), 500
+
+@job_bp.route('/batch', methods=['DELETE'])
+def delete_jobs_batch():
+    """Delete jobs selected by ids or filter"""
+    try:
+        ids = select_batch_ids(request.json or {})
+        deleted = 0
+        if ids:
+            # One set-based DELETE for the whole batch
+            deleted = Job.query.filter(Job.id.in_(ids)).delete(synchronize_session=False)
+            delete_descriptions(ids)
+            record_tombstones(ids)
+        db.session.commit()
+
+        if ids:
+            send_after_commit(jobs_deleted, current_app._get_current_object(), job_ids=ids)
+
+        return jsonify({
+            'success': True,
+            'message': f'{deleted} jobs deleted successfully',
+            'data': {'deleted': deleted, 'ids': ids}
+        }), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error deleting jobs: {str(e)}'
+        }), 500
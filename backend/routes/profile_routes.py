@@ -0,0 +1,42 @@
+import json
+import os
+from flask import Blueprint, current_app, jsonify, send_from_directory
+from services.profiling import PROFILE_FILES, profile_token_valid
+
+# Registered by init_profiling only when PROFILING_ENABLED is set
+profiles_bp = Blueprint('profiles', __name__, url_prefix='/api/profiles')
+
+@profiles_bp.before_request
+def require_token():
+    if not profile_token_valid(current_app.config):
+        return jsonify({
+            'success': False,
+            'message': 'Valid X-Profile-Token required'
+        }), 403
+
+@profiles_bp.route('', methods=['GET'])
+def list_profiles():
+    """Summaries of stored profiles, newest first"""
+    directory = current_app.config['PROFILING_DIR']
+    summaries = []
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory), reverse=True):
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name)) as summary_file:
+                    summaries.append(json.load(summary_file))
+    return jsonify({
+        'success': True,
+        'data': summaries,
+        'count': len(summaries),
+        'formats': PROFILE_FILES
+    }), 200
+
+@profiles_bp.route('/<profile_id>.<kind>', methods=['GET'])
+def download_profile(profile_id, kind):
+    """Download one file of a stored profile"""
+    if kind not in PROFILE_FILES:
+        return jsonify({
+            'success': False,
+            'message': f'Unknown profile file type: {kind}'
+        }), 404
+    return send_from_directory(current_app.config['PROFILING_DIR'], f'{profile_id}.{kind}', as_attachment=True)
@@ -0,0 +1,128 @@
+from flask import Blueprint, request, jsonify
+from db import db
+from models.job import Job, job_list_schema
+from models.saved_search import SavedSearch, SavedSearchMatch, saved_search_schema, saved_searches_schema
+from services.saved_search_matcher import get_saved_search_index
+from routes.job_routes import wants_descriptions, with_descriptions
+from marshmallow import ValidationError
+
+# Create Blueprint
+saved_search_bp = Blueprint('saved_searches', __name__, url_prefix='/api/saved-searches')
+
+@saved_search_bp.route('', methods=['GET'])
+def get_saved_searches():
+    """Get all saved searches"""
+    try:
+        saved_searches = SavedSearch.query.order_by(SavedSearch.id).all()
+        result = saved_searches_schema.dump(saved_searches)
+        return jsonify({
+            'success': True,
+            'data': result,
+            'count': len(result)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching saved searches: {str(e)}'
+        }), 500
+
+@saved_search_bp.route('', methods=['POST'])
+def create_saved_search():
+    """Save a set of job filters"""
+    try:
+        search_data = saved_search_schema.load(request.json)
+
+        saved_search = SavedSearch(**search_data)
+        db.session.add(saved_search)
+        db.session.commit()
+        get_saved_search_index().add(saved_search)
+
+        result = saved_search_schema.dump(saved_search)
+        return jsonify({
+            'success': True,
+            'message': 'Saved search created successfully',
+            'data': result
+        }), 201
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation error',
+            'errors': e.messages
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error creating saved search: {str(e)}'
+        }), 500
+
+@saved_search_bp.route('/<int:search_id>', methods=['DELETE'])
+def delete_saved_search(search_id):
+    """Delete a saved search and its matches"""
+    try:
+        saved_search = SavedSearch.query.get(search_id)
+        if not saved_search:
+            return jsonify({
+                'success': False,
+                'message': 'Saved search not found'
+            }), 404
+
+        SavedSearchMatch.query.filter_by(saved_search_id=search_id).delete()
+        db.session.delete(saved_search)
+        db.session.commit()
+        get_saved_search_index().remove(search_id)
+
+        return jsonify({
+            'success': True,
+            'message': 'Saved search deleted successfully'
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error deleting saved search: {str(e)}'
+        }), 500
+
+@saved_search_bp.route('/<int:search_id>/matches', methods=['GET'])
+def get_saved_search_matches(search_id):
+    """Feed of jobs matched by a saved search, oldest first after ``since``"""
+    try:
+        if not SavedSearch.query.get(search_id):
+            return jsonify({
+                'success': False,
+                'message': 'Saved search not found'
+            }), 404
+
+        since = request.args.get('since', 0, type=int)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+
+        rows = db.session.query(SavedSearchMatch, Job) \
+            .join(Job, Job.id == SavedSearchMatch.job_id) \
+            .filter(SavedSearchMatch.saved_search_id == search_id, SavedSearchMatch.id > since) \
+            .order_by(SavedSearchMatch.id) \
+            .limit(limit) \
+            .all()
+
+        result = job_list_schema.dump([job for _, job in rows])
+        if wants_descriptions(request.args):
+            result = with_descriptions(result)
+        for item, (match, _) in zip(result, rows):
+            item['match_id'] = match.id
+            item['matched_at'] = match.matched_at.isoformat() if match.matched_at else None
+
+        return jsonify({
+            'success': True,
+            'data': result,
+            'count': len(result),
+            # Pass back as ``since`` to get only newer matches
+            'next_since': rows[-1][0].id if rows else since
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error fetching saved search matches: {str(e)}'
+        }), 500
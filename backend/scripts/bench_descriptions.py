@@ -0,0 +1,167 @@
+"""Report table sizes and list latency before and after offloading descriptions.
+
+Builds a throwaway SQLite database with descriptions inline in ``jobs`` (the
+old layout), measures it, runs the offload-descriptions migration, and
+measures again:
+
+    python scripts/bench_descriptions.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+_workdir = tempfile.mkdtemp(prefix='bench_descriptions_')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_workdir, "bench.db")}')
+os.environ.setdefault('SIMILARITY_INDEX_PATH', os.path.join(_workdir, 'similarity_index.npz'))
+
+from sqlalchemy import text  # noqa: E402
+from app import create_app  # noqa: E402
+from db import db  # noqa: E402
+from models.job import Job, JobDescription, job_list_schema, normalize_search_text, build_search_blob  # noqa: E402
+from services.descriptions import offload_descriptions, drop_inline_descriptions  # noqa: E402
+
+TITLES = ['Actuary', 'Senior Actuary', 'Pricing Analyst', 'Reserving Actuary', 'Actuarial Analyst']
+COMPANIES = ['Acme Re', 'Munich Re', 'State Farm', 'Allianz', 'Zürich Insurance', 'AXA']
+LOCATIONS = ['New York, NY', 'Remote', 'Chicago, IL', 'Hartford, CT', 'London']
+TAGS = ['Life,Pricing', 'P&C,Reserving', 'Health,Python', 'Pensions,Capital']
+SENTENCES = [
+    'You will build and maintain pricing models for our personal lines portfolio.',
+    'Partner with underwriting and claims to understand experience and emerging trends.',
+    'Prepare quarterly reserve reviews and present results to senior stakeholders.',
+    'Experience with Python, R or SQL is a plus; exam progress is supported.',
+    'We offer hybrid working, study leave and a generous pension contribution.',
+    'Own the IFRS 17 valuation process and automate reporting pipelines.',
+    'Mentor junior analysts and review their work for accuracy and clarity.',
+    'Model mortality and lapse assumptions for the in-force life book.',
+]
+
+
+def recreate_with_inline_descriptions():
+    """Recreate jobs with description in its old place, between tags and url"""
+    ddl = [sql for sql, in db.session.execute(
+        text("SELECT sql FROM sqlite_schema WHERE tbl_name = 'jobs' AND sql IS NOT NULL ORDER BY type DESC"))]
+    db.session.execute(text('DROP TABLE jobs'))
+    ddl[0] = ddl[0].replace('\ttags TEXT, \n', '\ttags TEXT, \n\tdescription TEXT, \n')
+    for statement in ddl:
+        db.session.execute(text(statement))
+
+
+def seed(app, count, description_sentences, chunk=5000):
+    rng = random.Random(11)
+    insert = text(
+        'INSERT INTO jobs (title, company, location, posting_date, job_type, tags, description, '
+        'created_at, updated_at, version, search_blob, location_norm, tags_norm) VALUES '
+        '(:title, :company, :location, :now, :job_type, :tags, :description, :now, :now, 1, '
+        ':search_blob, :location_norm, :tags_norm)'
+    )
+    with app.app_context():
+        recreate_with_inline_descriptions()
+        for start in range(0, count, chunk):
+            rows = []
+            for _ in range(min(chunk, count - start)):
+                row = {
+                    'title': rng.choice(TITLES), 'company': rng.choice(COMPANIES),
+                    'location': rng.choice(LOCATIONS), 'job_type': 'Full-time', 'tags': rng.choice(TAGS),
+                    'description': ' '.join(rng.choices(SENTENCES, k=description_sentences)),
+                    'now': f'2024-01-{rng.randint(1, 28):02d} 09:00:00',
+                }
+                row['search_blob'] = build_search_blob(row['title'], row['company'], row['tags'],
+                                                       row['description'])
+                row['location_norm'] = normalize_search_text(row['location'])
+                row['tags_norm'] = normalize_search_text(row['tags'])
+                rows.append(row)
+            db.session.execute(insert, rows)
+            db.session.commit()
+
+
+def table_sizes():
+    """Bytes per table (and its indexes) from SQLite's dbstat, after VACUUM"""
+    db.session.commit()
+    with db.engine.connect() as connection:
+        connection.execute(text('VACUUM'))
+        rows = connection.execute(text(
+            "SELECT COALESCE(tbl_name, name), SUM(pgsize) FROM dbstat "
+            "JOIN sqlite_schema USING (name) GROUP BY tbl_name"
+        )).all()
+    return dict(rows)
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def report(label, sizes):
+    print(f'\n{label}')
+    for table in ('jobs', 'job_descriptions'):
+        print(f'  {table:<24} {sizes.get(table, 0) / 1024 / 1024:10.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Jobs in the benchmark table')
+    parser.add_argument('--sentences', type=int, default=20, help='Sentences per description')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, best one is reported')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    app.config['LIST_COALESCING'] = False
+    client = app.test_client()
+    print(f'Database: {app.config["SQLALCHEMY_DATABASE_URI"]}')
+    seed(app, args.rows, args.sentences)
+
+    # Columns get_jobs serialises, and a filter that has to scan every row
+    list_columns = ', '.join(name for name in job_list_schema.fields if name in Job.__table__.columns)
+    list_sql = text(f'SELECT {list_columns} FROM jobs ORDER BY posting_date DESC, id')
+    scan_sql = text("SELECT COUNT(*) FROM jobs WHERE location_norm LIKE '%remote%'")
+    with app.app_context():
+        before = table_sizes()
+        report(f'Inline descriptions ({args.rows} jobs)', before)
+        old_list = best_of(args.repeat, lambda: db.session.execute(
+            text('SELECT * FROM jobs ORDER BY posting_date DESC, id')).all())
+        narrow_before = best_of(args.repeat, lambda: db.session.execute(list_sql).all())
+        scan_before = best_of(args.repeat, lambda: db.session.execute(scan_sql).all())
+        print(f'  list query, all columns    {old_list:10.1f} ms   (what get_jobs used to read)')
+        print(f'  list query, list columns   {narrow_before:10.1f} ms')
+        print(f'  location filter scan       {scan_before:10.1f} ms')
+
+        start = time.perf_counter()
+        offload_descriptions('jobs', 1000)
+        drop_inline_descriptions('jobs')
+        migration_seconds = time.perf_counter() - start
+
+        after = table_sizes()
+        report(f'Offloaded descriptions (migration took {migration_seconds:.1f}s)', after)
+        narrow_after = best_of(args.repeat, lambda: db.session.execute(list_sql).all())
+        scan_after = best_of(args.repeat, lambda: db.session.execute(scan_sql).all())
+        print(f'  list query, list columns   {narrow_after:10.1f} ms')
+        print(f'  location filter scan       {scan_after:10.1f} ms')
+        raw, compressed = db.session.query(db.func.sum(JobDescription.size),
+                                           db.func.sum(JobDescription.compressed_size)).one()
+        print(f'  description bytes          {raw / 1024 / 1024:10.1f} MiB raw, '
+              f'{compressed / 1024 / 1024:.1f} MiB compressed ({raw / compressed:.1f}x)')
+        db.session.remove()
+
+    api_list = best_of(args.repeat, lambda: client.get('/api/jobs'))
+    api_list_full = best_of(args.repeat, lambda: client.get('/api/jobs?include=description'))
+    api_job = best_of(args.repeat, lambda: [client.get(f'/api/jobs/{job_id}') for job_id in range(1, 101)]) / 100
+    print(f'  GET /api/jobs                          {api_list:10.1f} ms')
+    print(f'  GET /api/jobs?include=description      {api_list_full:10.1f} ms')
+    print(f'  GET /api/jobs/<id> (lazy description)  {api_job:10.2f} ms')
+    print(f'\njobs table {before["jobs"] / after["jobs"]:.1f}x smaller; list query '
+          f'{old_list / narrow_after:.1f}x faster than reading inline rows, '
+          f'{narrow_before / narrow_after:.1f}x for the same columns; filter scan {scan_before / scan_after:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
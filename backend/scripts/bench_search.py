@@ -0,0 +1,150 @@
+"""Compare list filters on lower() per row with the precomputed normalised columns.
+
+Builds a throwaway SQLite table, then times the same searches both ways.
+Stored descriptions are compressed, so the lower() baseline scans a plain
+copy kept in a bench-only table, as the inline column it replaced:
+
+    python scripts/bench_search.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+_workdir = tempfile.mkdtemp(prefix='bench_search_')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_workdir, "bench.db")}')
+os.environ.setdefault('SIMILARITY_INDEX_PATH', os.path.join(_workdir, 'similarity_index.npz'))
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, func, or_  # noqa: E402
+from app import create_app  # noqa: E402
+from db import db  # noqa: E402
+from models.job import Job, JobDescription, normalize_search_text, build_search_blob  # noqa: E402
+
+TITLES = ['Actuary', 'Senior Actuary', 'Pricing Analyst', 'Reserving Actuary', 'Data Scientist',
+          'Actuarial Analyst', 'Chief Actuary', 'Capital Modelling Lead']
+COMPANIES = ['Acme Re', 'Munich Re', 'State Farm', 'Allianz', 'Zürich Insurance', 'AXA', 'Aegon']
+LOCATIONS = ['New York, NY', 'Remote', 'Chicago, IL', 'Hartford, CT', 'London', 'Zürich']
+TAGS = ['Life,Pricing', 'P&C,Reserving', 'Health,Python', 'Pensions,Capital', 'Python,R,SQL']
+WORDS = ('model pricing reserving python capital solvency experience mortality lapse '
+         'stakeholder reporting valuation ifrs17 stochastic').split()
+
+QUERIES = [
+    {'search': 'pricing'},
+    {'search': 'zurich'},
+    {'search': 'xyz-no-match'},
+    {'location': 'remote'},
+    {'tag': 'python'},
+    {'search': 'actuary', 'location': 'new york'},
+]
+
+# Plain-text descriptions for the lower() baseline, outside the app's tables
+inline_descriptions = Table(
+    'bench_inline_descriptions', MetaData(),
+    Column('job_id', Integer, primary_key=True),
+    Column('description', Text),
+)
+
+
+def seed(app, count, chunk=20000):
+    rng = random.Random(7)
+    with app.app_context():
+        inline_descriptions.drop(db.engine, checkfirst=True)
+        inline_descriptions.create(db.engine)
+        db.session.query(JobDescription).delete()
+        db.session.query(Job).delete()
+        # Explicit ids, so descriptions can be inserted next to their jobs
+        next_id = (db.session.query(func.max(Job.id)).scalar() or 0) + 1
+        for start in range(0, count, chunk):
+            rows, descriptions = [], []
+            for offset in range(min(chunk, count - start)):
+                description = ' '.join(rng.choices(WORDS, k=40))
+                row = {
+                    'id': next_id + start + offset,
+                    'title': rng.choice(TITLES), 'company': rng.choice(COMPANIES),
+                    'location': rng.choice(LOCATIONS), 'job_type': 'Full-time',
+                    'tags': rng.choice(TAGS),
+                }
+                # bulk_insert_mappings skips ORM events, so fill the columns here
+                row['search_blob'] = build_search_blob(row['title'], row['company'], row['tags'], description)
+                row['location_norm'] = normalize_search_text(row['location'])
+                row['tags_norm'] = normalize_search_text(row['tags'])
+                rows.append(row)
+                descriptions.append((row['id'], description))
+            db.session.bulk_insert_mappings(Job, rows)
+            db.session.bulk_insert_mappings(JobDescription, [
+                dict(JobDescription.pack(description), job_id=job_id) for job_id, description in descriptions
+            ])
+            db.session.execute(inline_descriptions.insert(), [
+                {'job_id': job_id, 'description': description} for job_id, description in descriptions
+            ])
+            db.session.commit()
+
+
+def lowered_conditions(args):
+    """The filters as they were before the normalised columns: ilike per row"""
+    conditions = []
+    if args.get('location'):
+        conditions.append(Job.location.ilike(f'%{args["location"]}%'))
+    if args.get('tag'):
+        conditions.append(Job.tags.ilike(f'%{args["tag"]}%'))
+    if args.get('search'):
+        term = f'%{args["search"]}%'
+        conditions.append(or_(Job.title.ilike(term), Job.company.ilike(term),
+                              inline_descriptions.c.description.ilike(term)))
+    return conditions
+
+
+def normalized_conditions(args):
+    conditions = []
+    if args.get('location'):
+        conditions.append(Job.location_norm.contains(normalize_search_text(args['location']), autoescape=True))
+    if args.get('tag'):
+        conditions.append(Job.tags_norm.contains(normalize_search_text(args['tag']), autoescape=True))
+    if args.get('search'):
+        conditions.append(Job.search_blob.contains(normalize_search_text(args['search']), autoescape=True))
+    return conditions
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='Jobs in the benchmark table')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query, best one is reported')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    print(f'Database: {app.config["SQLALCHEMY_DATABASE_URI"]}')
+    start = time.perf_counter()
+    seed(app, args.rows)
+    print(f'Seeded {args.rows} jobs in {time.perf_counter() - start:.1f}s\n')
+
+    print(f'{"filters":<44} {"lower() ms":>11} {"normalised ms":>14} {"speed-up":>9} {"matches":>9}')
+    with app.app_context():
+        for query in QUERIES:
+            lowered = db.session.query(func.count(Job.id)) \
+                .outerjoin(inline_descriptions, inline_descriptions.c.job_id == Job.id) \
+                .filter(*lowered_conditions(query))
+            normalized = db.session.query(func.count(Job.id)).filter(*normalized_conditions(query))
+            old_seconds, old_count = best_of(args.repeat, lowered.scalar)
+            new_seconds, new_count = best_of(args.repeat, normalized.scalar)
+            label = '&'.join(f'{name}={value}' for name, value in query.items())
+            # Counts differ where accent folding finds more, e.g. "zurich" in "Zürich"
+            print(f'{label:<44} {old_seconds * 1000:11.1f} {new_seconds * 1000:14.1f} '
+                  f'{old_seconds / new_seconds:8.1f}x {old_count:>4}/{new_count}')
+
+
+if __name__ == '__main__':
+    main()
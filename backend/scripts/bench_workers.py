@@ -0,0 +1,146 @@
+"""Measure requests/sec of the gunicorn entry point by worker count.
+
+Seeds a throwaway SQLite database, then for each worker count starts
+``gunicorn -c gunicorn.conf.py wsgi:app``, drives it with keep-alive client
+threads for a fixed time and stops it with SIGTERM:
+
+    python scripts/bench_workers.py --workers 1 2 4 8 --clients 32 --seconds 20
+"""
+import argparse
+import http.client
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+_workdir = tempfile.mkdtemp(prefix='bench_workers_')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_workdir, "bench.db")}')
+os.environ.setdefault('SIMILARITY_INDEX_PATH', os.path.join(_workdir, 'similarity_index.npz'))
+
+LOCATIONS = ['New York, NY', 'Remote', 'Chicago, IL', 'Hartford, CT', 'London']
+
+
+def seed(count):
+    from app import create_app
+    from db import db
+    from models.job import Job
+
+    app = create_app('production')
+    with app.app_context():
+        rng = random.Random(3)
+        db.session.add_all([
+            Job(title=f'Actuary {i}', company=f'Company {i % 50}', location=rng.choice(LOCATIONS),
+                tags='Pricing,Python', description='Benchmark posting ' * 30)
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def request_mix(job_count):
+    """Mostly single jobs, some filtered lists, a few stats, like the UI"""
+    roll = random.random()
+    if roll < 0.5:
+        return f'/api/jobs/{random.randint(1, job_count)}'
+    if roll < 0.9:
+        return f'/api/jobs?location={random.choice(["remote", "london", "chicago"])}&sort=title_asc'
+    return '/api/jobs/stats'
+
+
+def drive(port, clients, seconds, job_count):
+    """Closed-loop load: each client sends its next request when the last one returns"""
+    counts = {'ok': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        ok = rejected = errors = 0
+        while time.monotonic() < stop_at:
+            try:
+                connection.request('GET', request_mix(job_count))
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    ok += 1
+                elif response.status == 503:
+                    rejected += 1
+                else:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        connection.close()
+        with lock:
+            counts['ok'] += ok
+            counts['rejected'] += rejected
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counts['seconds'] = time.monotonic() - start
+    return counts
+
+
+def wait_until_healthy(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during start-up')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not become healthy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to compare')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=15, help='Load duration per worker count')
+    parser.add_argument('--jobs', type=int, default=2000, help='Jobs in the database')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    seed(args.jobs)
+    print(f'{os.cpu_count()} CPUs, {args.jobs} jobs, {args.clients} clients, {args.threads} threads/worker')
+    if max(args.workers) > os.cpu_count():
+        print('More workers than CPUs: these rows show scheduling overhead, not scaling')
+    print(f'{"workers":>7} {"req/s":>9} {"ok":>8} {"503":>6} {"errors":>7} {"stop s":>7}')
+    for workers in args.workers:
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(args.threads),
+                   GUNICORN_BIND=f'127.0.0.1:{args.port}', FLASK_ENV='production')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_healthy(args.port, process)
+            counts = drive(args.port, args.clients, args.seconds, args.jobs)
+        finally:
+            stopping = time.monotonic()
+            process.send_signal(signal.SIGTERM)
+            process.wait()
+            stop_seconds = time.monotonic() - stopping
+        print(f'{workers:>7} {counts["ok"] / counts["seconds"]:9.1f} {counts["ok"]:>8} '
+              f'{counts["rejected"]:>6} {counts["errors"]:>7} {stop_seconds:7.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Measure single-job write throughput through the Flask app.
+
+Runs in-process against a throwaway SQLite file unless DATABASE_URL is set:
+
+    python scripts/bench_writes.py --jobs 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+_workdir = tempfile.mkdtemp(prefix='bench_writes_')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(_workdir, "bench.db")}')
+os.environ.setdefault('SIMILARITY_INDEX_PATH', os.path.join(_workdir, 'similarity_index.npz'))
+
+from app import create_app  # noqa: E402
+from db import db  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+from models.job import Job, JobDescription  # noqa: E402
+from signals import jobs_saved, jobs_deleted  # noqa: E402
+
+
+def seed(app, count):
+    with app.app_context():
+        db.session.query(JobDescription).delete()
+        db.session.query(Job).delete()
+        # Explicit ids, so descriptions can be inserted next to their jobs
+        first_id = (db.session.query(func.max(Job.id)).scalar() or 0) + 1
+        ids = list(range(first_id, first_id + count))
+        db.session.bulk_insert_mappings(Job, [
+            {'id': job_id, 'title': f'Actuary {job_id}', 'company': 'Bench Insurance', 'location': 'Remote',
+             'tags': 'Pricing,Python'}
+            for job_id in ids
+        ])
+        # Descriptions live in their own table; bulk inserts skip the relationship
+        db.session.bulk_insert_mappings(JobDescription, [
+            dict(JobDescription.pack('Benchmark job ' * 20), job_id=job_id) for job_id in ids
+        ])
+        db.session.commit()
+        return ids
+
+
+def timed(label, client, method, ids, body_for):
+    start = time.perf_counter()
+    failures = 0
+    for job_id in ids:
+        response = client.open(f'/api/jobs/{job_id}', method=method, json=body_for(job_id))
+        if response.status_code >= 300:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {len(ids) / elapsed:9.1f} req/s   ({len(ids)} requests, {failures} failed)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--without-hooks', action='store_true',
+                        help='Disconnect post-commit index updates to time only the write path')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    app.config['ADMISSION_CONTROL'] = False
+    if args.without_hooks:
+        for signal in (jobs_saved, jobs_deleted):
+            for receiver in list(signal.receivers_for(app)):
+                signal.disconnect(receiver, sender=app)
+    client = app.test_client()
+    print(f'Database: {app.config["SQLALCHEMY_DATABASE_URI"]}')
+
+    ids = seed(app, args.jobs)
+    timed('PUT /api/jobs/<id>', client, 'PUT', ids, lambda job_id: {'title': f'Updated {job_id}'})
+
+    if any(rule.rule == '/api/jobs/<int:job_id>' and 'PATCH' in rule.methods for rule in app.url_map.iter_rules()):
+        timed('PATCH /api/jobs/<id>', client, 'PATCH', ids, lambda job_id: {'title': f'Patched {job_id}'})
+        # A column search_blob does not depend on: no read before the UPDATE
+        timed('PATCH (location only)', client, 'PATCH', ids, lambda job_id: {'location': f'City {job_id}'})
+
+    timed('DELETE /api/jobs/<id>', client, 'DELETE', ids, lambda job_id: None)
+
+
+if __name__ == '__main__':
+    main()
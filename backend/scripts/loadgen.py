@@ -0,0 +1,375 @@
+"""Open-loop load generator with per-endpoint latency, throughput and error reports.
+
+Starts the production server (gunicorn + wsgi.py) against a throwaway SQLite
+database, or DATABASE_URL if set (e.g. a local MySQL), seeds it, then sends a
+weighted mix of calls at a fixed arrival rate and writes JSON and HTML reports:
+
+    python scripts/loadgen.py --rate 50 --duration 30 --json report.json --html report.html
+    python scripts/loadgen.py --url http://localhost:5000 --mix detail=80,filtered=20
+
+Arrivals are scheduled in advance (Poisson by default), and latency is
+measured from each request's scheduled time. A slow server therefore shows
+up as queueing delay instead of quietly lowering the offered load.
+"""
+import argparse
+import html
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DEFAULT_MIX = 'list=10,filtered=40,detail=35,stats=5,create=5,update=5'
+
+LOCATIONS = ['New York, NY', 'Remote', 'Chicago, IL', 'Hartford, CT', 'London', 'Zürich']
+TITLES = ['Actuary', 'Senior Actuary', 'Pricing Analyst', 'Reserving Actuary', 'Actuarial Analyst']
+TAGS = ['Life,Pricing', 'P&C,Reserving', 'Health,Python', 'Pensions,Capital']
+JOB_TYPES = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']
+SEARCH_TERMS = ['actuary', 'pricing', 'python', 'reserving', 'zurich', 'capital']
+
+
+class Workload:
+    """Builds the next request for each kind of call"""
+
+    def __init__(self, job_count, page_size, rng):
+        self.job_count = job_count
+        self.page_size = page_size
+        self.rng = rng
+
+    def _page(self):
+        return f'&limit={self.page_size}' if self.page_size else ''
+
+    def list(self):
+        return 'GET', f'/api/jobs?sort=posting_date_desc{self._page()}', None
+
+    def filtered(self):
+        rng = self.rng
+        filters = rng.choice([
+            {'location': rng.choice(['remote', 'new york', 'london'])},
+            {'search': rng.choice(SEARCH_TERMS)},
+            {'job_type': rng.choice(JOB_TYPES), 'tag': rng.choice(['python', 'pricing', 'life'])},
+        ])
+        filters['sort'] = rng.choice(['posting_date_desc', 'title_asc', 'company_asc'])
+        return 'GET', f'/api/jobs?{urlencode(filters)}{self._page()}', None
+
+    def detail(self):
+        return 'GET', f'/api/jobs/{self.rng.randint(1, self.job_count)}', None
+
+    def stats(self):
+        return 'GET', '/api/jobs/stats', None
+
+    def create(self):
+        return 'POST', '/api/jobs', random_job(self.rng)
+
+    def update(self):
+        body = {'title': f'{self.rng.choice(TITLES)} {self.rng.randint(1, 99)}'}
+        return 'PATCH', f'/api/jobs/{self.rng.randint(1, self.job_count)}', body
+
+
+def random_job(rng):
+    return {
+        'title': rng.choice(TITLES),
+        'company': f'Company {rng.randint(1, 200)}',
+        'location': rng.choice(LOCATIONS),
+        'job_type': rng.choice(JOB_TYPES),
+        'tags': rng.choice(TAGS),
+        'description': 'Load test posting. ' * rng.randint(5, 40),
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if not hasattr(Workload, name) or name.startswith('_'):
+            raise SystemExit(f'Unknown call type in --mix: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def arrival_times(rate, duration, poisson, rng):
+    """Offsets (seconds from start) at which requests are due"""
+    times, now = [], 0.0
+    while True:
+        now += rng.expovariate(rate) if poisson else 1.0 / rate
+        if now >= duration:
+            return times
+        times.append(now)
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, kind, latency, status):
+        with self._lock:
+            self.latencies[kind].append(latency)
+            self.statuses[kind][status] += 1
+
+
+def run_load(base_url, mix, rate, duration, concurrency, poisson, workload, seed):
+    """Send the scheduled requests; returns (recorder, wall seconds, late starts)"""
+    target = urlsplit(base_url)
+    local = threading.local()
+    recorder = Recorder()
+    rng = random.Random(seed)
+    schedule = arrival_times(rate, duration, poisson, rng)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=len(schedule))
+
+    def connection():
+        if getattr(local, 'connection', None) is None:
+            local.connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+        return local.connection
+
+    def send(kind, method, path, body, due):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        try:
+            conn = connection()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            local.connection = None
+            status = type(e).__name__
+        recorder.record(kind, time.monotonic() - due, status)
+
+    late = 0
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset, kind in zip(schedule, kinds):
+            due = start + offset
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.01:
+                late += 1
+            # Build the request on this thread so the random stream stays reproducible
+            method, path, body = getattr(workload, kind)()
+            pool.submit(send, kind, method, path, body, due)
+    return recorder, time.monotonic() - start, late
+
+
+def summarize(samples, statuses, seconds):
+    latencies = np.array(samples) * 1000
+    errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+    rejected = statuses.get(503, 0)
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / seconds, 2),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'rejected_503': rejected,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'max_ms': round(float(latencies.max()), 2),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+def build_report(recorder, seconds, late, args, slo):
+    endpoints = {
+        kind: summarize(recorder.latencies[kind], recorder.statuses[kind], seconds)
+        for kind in sorted(recorder.latencies)
+    }
+    overall_statuses = Counter()
+    for statuses in recorder.statuses.values():
+        overall_statuses.update(statuses)
+    all_samples = [latency for samples in recorder.latencies.values() for latency in samples]
+    report = {
+        'config': {
+            'url': args.url or 'local gunicorn', 'rate_rps': args.rate, 'duration_s': args.duration,
+            'arrivals': 'fixed' if args.fixed_interval else 'poisson', 'mix': args.mix,
+            'concurrency': args.concurrency, 'jobs': args.jobs, 'page_size': args.page_size,
+        },
+        'late_dispatches': late,
+        'overall': summarize(all_samples, overall_statuses, seconds) if all_samples else {},
+        'endpoints': endpoints,
+    }
+    if slo:
+        report['slo'] = slo
+        for stats in [report['overall'], *endpoints.values()]:
+            stats['slo_met'] = all(stats[f'{name}_ms'] <= limit for name, limit in slo.items()) \
+                and stats['error_rate'] <= args.slo_error_rate
+    return report
+
+
+def render_html(report):
+    """Self-contained HTML page with the summary table and a latency bar chart"""
+    rows = [('overall', report['overall'])] + list(report['endpoints'].items())
+    slowest = max((stats['p99_ms'] for _, stats in rows if stats), default=1) or 1
+    columns = ['requests', 'throughput_rps', 'error_rate', 'rejected_503', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    has_slo = 'slo' in report
+
+    table_rows = []
+    for name, stats in rows:
+        if not stats:
+            continue
+        cells = ''.join(f'<td>{stats[column]}</td>' for column in columns)
+        if has_slo:
+            met = stats['slo_met']
+            cells += f'<td class="{"ok" if met else "bad"}">{"met" if met else "missed"}</td>'
+        bars = ''.join(
+            f'<div class="bar {label}" style="width:{stats[f"{label}_ms"] / slowest * 100:.1f}%">'
+            f'{label} {stats[f"{label}_ms"]} ms</div>'
+            for label in ('p50', 'p95', 'p99')
+        )
+        table_rows.append(f'<tr><th>{html.escape(name)}</th>{cells}<td class="chart">{bars}</td></tr>')
+
+    header = ''.join(f'<th>{column}</th>' for column in columns) + ('<th>SLO</th>' if has_slo else '')
+    config = html.escape(json.dumps(report['config']))
+    slo = html.escape(json.dumps(report.get('slo', {})))
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Load test report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+td.chart {{ width: 320px; text-align: left; }}
+.bar {{ font-size: 11px; color: #fff; margin: 1px 0; white-space: nowrap; }}
+.p50 {{ background: #4a90d9; }} .p95 {{ background: #e8a33d; }} .p99 {{ background: #d9534f; }}
+.ok {{ color: #2e7d32; }} .bad {{ color: #c62828; font-weight: bold; }}
+</style></head><body>
+<h1>Load test report</h1>
+<p>Config: <code>{config}</code></p>
+<p>SLO: <code>{slo}</code> &middot; late dispatches: {report["late_dispatches"]}</p>
+<table><tr><th>endpoint</th>{header}<th>latency</th></tr>
+{"".join(table_rows)}
+</table></body></html>
+'''
+
+
+def print_summary(report):
+    print(f'{"endpoint":<10} {"req":>6} {"rps":>7} {"err%":>6} {"p50":>8} {"p95":>8} {"p99":>8}  slo')
+    rows = [('overall', report['overall'])] + list(report['endpoints'].items())
+    for name, stats in rows:
+        if stats:
+            slo = {True: 'met', False: 'MISSED'}.get(stats.get('slo_met'), '')
+            print(f'{name:<10} {stats["requests"]:>6} {stats["throughput_rps"]:>7} '
+                  f'{stats["error_rate"] * 100:>5.1f}% {stats["p50_ms"]:>8} {stats["p95_ms"]:>8} '
+                  f'{stats["p99_ms"]:>8}  {slo}')
+    if report['late_dispatches']:
+        print(f'{report["late_dispatches"]} requests were dispatched late; the generator itself is saturated')
+
+
+def seed_database(env, count):
+    """Insert jobs through the app so the normalised columns are filled"""
+    code = (
+        'import random, sys; sys.argv = ["seed"]\n'
+        'from app import create_app\n'
+        'from db import db\n'
+        'from models.job import Job\n'
+        'from scripts.loadgen import random_job\n'
+        'app = create_app("production")\n'
+        'rng = random.Random(1)\n'
+        'with app.app_context():\n'
+        '    if Job.query.count() == 0:\n'
+        f'        db.session.add_all([Job(**random_job(rng)) for _ in range({count})])\n'
+        '        db.session.commit()\n'
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def wait_until_healthy(base_url, process, timeout=60):
+    target = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit('Server exited during start-up')
+        try:
+            connection = http.client.HTTPConnection(target.hostname, target.port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit('Server did not become healthy')
+
+
+def start_server(args):
+    workdir = tempfile.mkdtemp(prefix='loadgen_')
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_BIND=f'127.0.0.1:{args.port}',
+    )
+    env.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(workdir, "loadgen.db")}')
+    env.setdefault('SIMILARITY_INDEX_PATH', os.path.join(workdir, 'similarity_index.npz'))
+    print(f'Database: {env["DATABASE_URL"]}')
+    seed_database(env, args.jobs)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{args.port}'
+    wait_until_healthy(base_url, process)
+    return base_url, process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Existing server to test; by default a local gunicorn is started')
+    parser.add_argument('--rate', type=float, default=20, help='Arrival rate in requests/sec')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weighted call mix (default {DEFAULT_MIX})')
+    parser.add_argument('--fixed-interval', action='store_true', help='Evenly spaced instead of Poisson arrivals')
+    parser.add_argument('--concurrency', type=int, default=64, help='Most requests in flight at once')
+    parser.add_argument('--jobs', type=int, default=2000, help='Jobs seeded into a new database')
+    parser.add_argument('--page-size', type=int, default=50, help='limit for list calls, 0 for whole lists')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers of the local server')
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--seed', type=int, default=7, help='Random seed for arrivals and requests')
+    parser.add_argument('--slo-p95-ms', type=float, help='Mark endpoints whose p95 exceeds this')
+    parser.add_argument('--slo-p99-ms', type=float, help='Mark endpoints whose p99 exceeds this')
+    parser.add_argument('--slo-error-rate', type=float, default=0.01, help='Highest error rate within SLO')
+    parser.add_argument('--json', help='Write the JSON report here')
+    parser.add_argument('--html', help='Write the HTML report here')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    slo = {name: limit for name, limit in (('p95', args.slo_p95_ms), ('p99', args.slo_p99_ms)) if limit}
+
+    process = None
+    base_url = args.url
+    if not base_url:
+        base_url, process = start_server(args)
+    try:
+        workload = Workload(args.jobs, args.page_size, random.Random(args.seed))
+        recorder, seconds, late = run_load(base_url, mix, args.rate, args.duration, args.concurrency,
+                                           not args.fixed_interval, workload, args.seed)
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGTERM)
+            process.wait()
+
+    report = build_report(recorder, seconds, late, args, slo)
+    print_summary(report)
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.html:
+        with open(args.html, 'w') as report_file:
+            report_file.write(render_html(report))
+
+
+if __name__ == '__main__':
+    main()
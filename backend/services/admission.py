@@ -0,0 +1,165 @@
+import math
+import threading
+import time
+from flask import current_app, g, jsonify, request
+
+# Endpoints that are never limited: long-lived streams and monitoring
+EXEMPT_ENDPOINTS = frozenset(['jobs.stream_job_changes', 'health_check', 'metrics'])
+
+# Filters that make a list query selective enough to count as a normal request
+LIST_FILTERS = ('job_type', 'location', 'tag', 'search')
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded wait queue and deadline-aware rejection.
+
+    A request is admitted straight away while fewer than ``max_concurrent``
+    are running. Otherwise it waits in a queue of at most ``max_queue``, but
+    only if it would still finish by its deadline (the expected wait for a
+    slot plus its own average service time); anything else is rejected at
+    once instead of timing out later on the client.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_service_seconds = 0.0
+
+    def expected_wait(self, position):
+        """Seconds until a request at ``position`` in the queue would start"""
+        return (position + 1) * self.avg_service_seconds / self.max_concurrent
+
+    def acquire(self, deadline):
+        with self._condition:
+            # Do not overtake requests that are already queued
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return True
+
+            budget = deadline - time.monotonic()
+            expected_finish = self.expected_wait(self.waiting) + self.avg_service_seconds
+            if self.waiting >= self.max_queue or expected_finish > budget:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self, service_seconds):
+        with self._condition:
+            self.active -= 1
+            # Exponentially weighted average keeps the estimate current under load changes
+            if self.avg_service_seconds:
+                self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * service_seconds
+            else:
+                self.avg_service_seconds = service_seconds
+            self._condition.notify()
+
+    def retry_after(self):
+        """Whole seconds a rejected client should wait before retrying"""
+        with self._condition:
+            return max(1, math.ceil(self.expected_wait(self.waiting)))
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'avg_service_ms': round(self.avg_service_seconds * 1000, 2)
+            }
+
+
+def priority_class(endpoint, args):
+    """Map a request to the limiter that should admit it"""
+    if endpoint == 'jobs.get_jobs':
+        return 'default' if any(args.get(name) for name in LIST_FILTERS) else 'expensive'
+    if endpoint in ('jobs.get_job_stats', 'jobs.get_job_changes'):
+        return 'expensive'
+    if endpoint == 'jobs.get_job':
+        return 'cheap'
+    return 'default'
+
+
+def request_deadline(config):
+    """Monotonic deadline from the server budget or a shorter client timeout"""
+    budget = config['ADMISSION_DEADLINE_SECONDS']
+    client_timeout = request.headers.get('X-Request-Timeout-Ms', type=int)
+    if client_timeout:
+        # Leave headroom for the response to travel back before the client gives up
+        budget = min(budget, client_timeout / 1000 * 0.8)
+    return time.monotonic() + budget
+
+
+def class_limits(threads, concurrent_share, queue_share):
+    """``(max_concurrent, max_queue)`` of a class from its shares of a worker's threads.
+
+    The limiter runs inside the worker's thread pool, and a queued request
+    holds a thread while it waits, so a class never gets more threads than
+    the worker has; beyond that gunicorn queues connections unseen.
+    """
+    max_concurrent = max(1, int(threads * concurrent_share))
+    max_queue = min(int(threads * queue_share), threads - max_concurrent)
+    return max_concurrent, max(max_queue, 0)
+
+
+def init_admission(app):
+    """Limit concurrent requests per priority class and shed load early"""
+    if not app.config.get('ADMISSION_CONTROL'):
+        return
+    threads = app.config['ADMISSION_WORKER_THREADS']
+    limiters = {
+        name: AdmissionLimiter(name, *class_limits(threads, *shares))
+        for name, shares in app.config['ADMISSION_CLASSES'].items()
+    }
+    app.extensions['admission_limiters'] = limiters
+
+    @app.before_request
+    def admit_request():
+        if request.endpoint is None or request.endpoint in EXEMPT_ENDPOINTS:
+            return None
+        limiter = limiters[priority_class(request.endpoint, request.args)]
+        if not limiter.acquire(request_deadline(current_app.config)):
+            response = jsonify({
+                'success': False,
+                'message': 'Server is busy, please retry shortly'
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(limiter.retry_after())
+            return response
+        g.admission = (limiter, time.monotonic())
+        return None
+
+    @app.teardown_request
+    def release_request(error=None):
+        admission = g.pop('admission', None)
+        if admission:
+            limiter, started = admission
+            limiter.release(time.monotonic() - started)
+
+
+def admission_stats(app):
+    """Per-class limiter counters for the metrics endpoint"""
+    limiters = app.extensions.get('admission_limiters', {})
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import insert, delete, select
+from db import db
+from models.job import Job, ArchivedJob
+from services.change_feed import purge_expired_tombstones, record_tombstones
+from signals import jobs_deleted, send_after_commit
+
+# Columns copied verbatim from the hot table into the archive
+ARCHIVED_COLUMNS = [column.name for column in Job.__table__.columns]
+
+
+def archive_expired_jobs(older_than_days, batch_size, pause_seconds=0.0):
+    """Move jobs posted before the cutoff into the archive table.
+
+    Each batch is its own short transaction (copy, then delete by primary
+    key) so the hot table is never locked for the whole run. Returns the
+    number of archived jobs.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    hot = Job.__table__
+    archive = ArchivedJob.__table__
+    archived = 0
+
+    while True:
+        ids = [row.id for row in db.session.execute(
+            select(hot.c.id).where(hot.c.posting_date < cutoff).order_by(hot.c.id).limit(batch_size)
+        )]
+        if not ids:
+            break
+
+        db.session.execute(insert(archive).from_select(
+            ARCHIVED_COLUMNS,
+            select(*[hot.c[name] for name in ARCHIVED_COLUMNS]).where(hot.c.id.in_(ids))
+        ))
+        db.session.execute(delete(hot).where(hot.c.id.in_(ids)))
+        # Archived jobs leave the live list, so change feeds report them as deleted
+        record_tombstones(ids)
+        db.session.commit()
+        send_after_commit(jobs_deleted, current_app._get_current_object(), job_ids=ids)
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return archived
+
+
+def register_archive_command(app):
+    """Add ``flask archive-jobs`` for cron or another scheduler to run"""
+
+    @app.cli.command('archive-jobs')
+    @click.option('--older-than-days', type=int, default=None,
+                  help='Archive jobs posted more than this many days ago.')
+    @click.option('--batch-size', type=int, default=None, help='Jobs moved per transaction.')
+    def archive_jobs_command(older_than_days, batch_size):
+        """Move expired postings out of the hot jobs table and purge old tombstones"""
+        config = current_app.config
+        archived = archive_expired_jobs(
+            older_than_days if older_than_days is not None else config['ARCHIVE_AFTER_DAYS'],
+            batch_size or config['ARCHIVE_BATCH_SIZE'],
+            config['ARCHIVE_BATCH_PAUSE_SECONDS']
+        )
+        click.echo(f'Archived {archived} jobs')
+        click.echo(f'Purged {purge_expired_tombstones()} expired change feed tombstones')
@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from db import db
+from models.job import Job, JobTombstone, jobs_schema, job_list_schema
+from signals import jobs_saved, jobs_deleted
+
+
+class ChangeTokenExpired(Exception):
+    """The token predates the oldest tombstone we still keep"""
+
+
+def parse_token(token):
+    """Return the datetime encoded in a change token, or None for a full sync.
+
+    Tokens are naive UTC; one with an offset (e.g. ``...Z``) is converted.
+    Raises ValueError for anything that is not an ISO timestamp.
+    """
+    if not token:
+        return None
+    since = datetime.fromisoformat(token.replace('Z', '+00:00') if token.endswith('Z') else token)
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def changed_jobs(since, include_description=False):
+    """Return ``(jobs, deleted_ids, token)`` for changes after ``since``.
+
+    ``updated_at`` is stamped before the transaction commits, so a write
+    that commits late can carry a time older than a token already handed
+    out. Reads therefore start CHANGE_FEED_OVERLAP_SECONDS before ``since``
+    and may repeat changes; consumers apply them idempotently, keeping the
+    highest ``version`` of each job.
+    """
+    config = current_app.config
+    if since is not None:
+        retention = timedelta(days=config['CHANGE_FEED_TOMBSTONE_DAYS'])
+        if since < datetime.utcnow() - retention:
+            raise ChangeTokenExpired()
+
+    query = Job.query.order_by(Job.updated_at, Job.id)
+    if include_description:
+        query = query.options(selectinload(Job.description_record))
+    tombstones = []
+    if since is not None:
+        window_start = since - timedelta(seconds=config['CHANGE_FEED_OVERLAP_SECONDS'])
+        query = query.filter(Job.updated_at >= window_start)
+        tombstones = JobTombstone.query \
+            .filter(JobTombstone.deleted_at >= window_start) \
+            .order_by(JobTombstone.deleted_at) \
+            .all()
+    jobs = query.all()
+
+    latest = [since] if since else []
+    if jobs and jobs[-1].updated_at:
+        latest.append(jobs[-1].updated_at)
+    if tombstones:
+        latest.append(tombstones[-1].deleted_at)
+
+    deleted = sorted({tombstone.job_id for tombstone in tombstones})
+    return jobs, deleted, max(latest).isoformat() if latest else ''
+
+
+def get_changes(since, include_description=False):
+    """Return ``{'updated', 'deleted', 'token'}`` for changes after ``since``"""
+    jobs, deleted, token = changed_jobs(since, include_description)
+    schema = jobs_schema if include_description else job_list_schema
+    return {'updated': schema.dump(jobs), 'deleted': deleted, 'token': token}
+
+
+class ChangeNotifier:
+    """Wakes up event streams of this worker as soon as a job is written"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._version = 0
+        self.closed = False
+        self.streams = 0
+
+    def open_stream(self, limit):
+        """Count a new stream in, unless ``limit`` streams are already open"""
+        with self._condition:
+            if self.streams >= limit:
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self._condition:
+            self.streams -= 1
+
+    def notify(self):
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def close(self):
+        """End open streams, e.g. when the worker is shutting down"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past ``version`` or the timeout expires"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version or self.closed, timeout=timeout)
+            return self._version
+
+    @property
+    def version(self):
+        return self._version
+
+
+def iter_change_events(token, include_description=False):
+    """Yield server-sent events carrying the same deltas as get_changes.
+
+    Writes made by this worker wake the stream immediately; writes made by
+    other workers are picked up by the periodic poll. The stream ends after
+    CHANGE_FEED_STREAM_SECONDS, or as soon as the worker shuts down, so that
+    long-lived connections do not pin a worker forever; EventSource
+    reconnects with ``Last-Event-ID``. Changes the overlapping reads repeat
+    are sent once per stream.
+    """
+    config = current_app.config
+    notifier = current_app.extensions['change_notifier']
+    deadline = time.monotonic() + config['CHANGE_FEED_STREAM_SECONDS']
+    last_sent = time.monotonic()
+    version = notifier.version
+    first = True
+    sent_versions = {}
+    sent_deletes = set()
+
+    yield f'retry: {config["CHANGE_FEED_RETRY_MS"]}\n\n'
+    while time.monotonic() < deadline and not notifier.closed:
+        try:
+            changes = get_changes(parse_token(token), include_description)
+        except ChangeTokenExpired:
+            yield 'event: resync\ndata: {}\n\n'
+            return
+        finally:
+            # Do not hold a connection (or a stale snapshot) between polls
+            db.session.remove()
+
+        token = changes['token'] = changes['token'] or token
+        changes['updated'] = [job for job in changes['updated'] if sent_versions.get(job['id']) != job['version']]
+        changes['deleted'] = [job_id for job_id in changes['deleted'] if job_id not in sent_deletes]
+        if changes['updated'] or changes['deleted'] or first:
+            first = False
+            sent_versions.update((job['id'], job['version']) for job in changes['updated'])
+            sent_deletes.update(changes['deleted'])
+            yield f'id: {token}\nevent: changes\ndata: {json.dumps(changes)}\n\n'
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= config['CHANGE_FEED_HEARTBEAT_SECONDS']:
+            yield ': heartbeat\n\n'
+            last_sent = time.monotonic()
+
+        version = notifier.wait(version, config['CHANGE_FEED_POLL_SECONDS'])
+
+
+def record_tombstones(job_ids):
+    """Add tombstones for deleted jobs to the current transaction"""
+    now = datetime.utcnow()
+    db.session.add_all([JobTombstone(job_id=job_id, deleted_at=now) for job_id in job_ids])
+
+
+def purge_expired_tombstones():
+    """Delete tombstones older than any token still accepted; returns how many.
+
+    Run by ``flask archive-jobs`` rather than with each delete, so deletes
+    do not scan the tombstone table.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['CHANGE_FEED_TOMBSTONE_DAYS'])
+    purged = JobTombstone.query.filter(JobTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return purged
+
+
+def _on_jobs_written(app, **kwargs):
+    app.extensions['change_notifier'].notify()
+
+
+def init_change_feed(app):
+    """Wake event streams on writes; the routes record tombstones with each delete"""
+    app.extensions['change_notifier'] = ChangeNotifier()
+    jobs_saved.connect(_on_jobs_written, sender=app)
+    jobs_deleted.connect(_on_jobs_written, sender=app)
@@ -0,0 +1,89 @@
+import threading
+from flask import current_app
+
+
+class _Call:
+    """An in-flight execution that followers can wait on"""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running (followers) wait for the leader and share its
+    result or exception. Nothing is cached once the leader finishes.
+    """
+
+    def __init__(self, follower_timeout=None):
+        self.follower_timeout = follower_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if call.done.wait(self.follower_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The leader is stuck; stop waiting and run the query ourselves
+            with self._lock:
+                self.coalesced -= 1
+                self.executed += 1
+            return fn()
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'coalescing_ratio': round(self.coalesced / total, 4) if total else 0.0
+            }
+
+
+def list_query_key(args):
+    """Normalise list query parameters so equivalent requests share a key"""
+    params = {name: value for name, value in args.items(multi=True) if value != ''}
+    params.setdefault('sort', 'posting_date_desc')
+    return tuple(sorted(params.items()))
+
+
+def init_coalescing(app):
+    """Attach the single-flight group used by the job list endpoint"""
+    app.extensions['list_single_flight'] = SingleFlight(app.config['COALESCING_FOLLOWER_TIMEOUT'])
+
+
+def get_list_single_flight():
+    """Return the single-flight group of the current app, or None when disabled"""
+    if not current_app.config.get('LIST_COALESCING'):
+        return None
+    return current_app.extensions.get('list_single_flight')
@@ -0,0 +1,360 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+import numpy as np
+from flask import current_app
+from sqlalchemy.engine import make_url
+from models.job import job_list_schema, normalize_search_text
+from services.change_feed import ChangeTokenExpired, parse_token, changed_jobs
+from signals import jobs_saved, jobs_deleted
+
+# Text filters of get_jobs and the normalised job column each one scans
+SEARCH_FILTERS = {
+    'location': 'location_norm',
+    'tag': 'tags_norm',
+    'search': 'search_blob',
+}
+
+# Sort options of get_jobs: field and direction (ties are broken by id)
+SORTS = {
+    'posting_date_desc': ('posting_date', True),
+    'posting_date_asc': ('posting_date', False),
+    'title_asc': ('title', False),
+    'title_desc': ('title', True),
+    'company_asc': ('company', False),
+    'company_desc': ('company', True),
+}
+
+SORTED_FIELDS = ('title', 'company', 'job_type')
+
+# Rebuild the snapshot once rows written since outnumber this share of it
+TAIL_RATIO = 0.05
+
+
+class Collation:
+    """How the database compares strings, so results match the SQL path"""
+
+    def __init__(self, dialect):
+        # MySQL's default collations ignore case and accents; SQLite compares
+        # BINARY and PostgreSQL's equality is case-sensitive too
+        self.key = _fold_case_and_accents if dialect == 'mysql' else _binary
+
+
+def _binary(value):
+    return value
+
+
+def _fold_case_and_accents(value):
+    """Comparison key under a case- and accent-insensitive collation ('Ä' == 'a')"""
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _intern(values):
+    """Dictionary-encode values: (distinct values, int32 code per row)"""
+    uniques = {}
+    codes = np.fromiter((uniques.setdefault(value, len(uniques)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return list(uniques), codes
+
+
+class InternedColumn:
+    """Dictionary-encoded string column with dense sort ranks"""
+
+    def __init__(self, values, collation):
+        self.collation = collation
+        self.values, self.codes = _intern(values)
+
+        # Dense ranks, so values the collation considers equal tie (and fall back to id)
+        self.keys = [collation.key(value) for value in self.values]
+        self.sorted_keys = sorted(set(self.keys))
+        self.dense = {key: rank for rank, key in enumerate(self.sorted_keys)}
+        self.ranks = np.array([self.dense[key] for key in self.keys], dtype=np.int64)
+
+    def equals(self, value):
+        """Row mask for ``column = value`` under the collation"""
+        target = self.collation.key(value)
+        return np.array([key == target for key in self.keys], dtype=bool)[self.codes]
+
+    def row_ranks(self):
+        return self.ranks[self.codes]
+
+    def rank_of(self, value):
+        """Rank of any value; one this column lacks falls between its neighbours"""
+        key = self.collation.key(value)
+        rank = self.dense.get(key)
+        return rank if rank is not None else bisect_left(self.sorted_keys, key) - 0.5
+
+
+class SearchColumn:
+    """Dictionary-encoded normalised text for substring filters.
+
+    The distinct values are joined into one NUL-separated string, so a
+    filter is a handful of C-level ``str.find`` calls over the distinct
+    values followed by one vectorised gather over the rows.
+    """
+
+    def __init__(self, values):
+        self.values, self.codes = _intern([value.replace('\x00', '') for value in values])
+        self.offsets = np.cumsum([0] + [len(text) + 1 for text in self.values])
+        self.joined = '\x00'.join(self.values) + '\x00'
+
+    def contains(self, needle):
+        """Row mask for ``column LIKE '%needle%'`` with a literal, normalised needle"""
+        matched = np.zeros(len(self.values), dtype=bool)
+        position = self.joined.find(needle)
+        # An empty needle also "matches" the empty tail after the last separator
+        while position != -1 and position < len(self.joined):
+            index = int(np.searchsorted(self.offsets, position, side='right')) - 1
+            matched[index] = True
+            position = self.joined.find(needle, self.offsets[index + 1])
+        return matched[self.codes]
+
+
+class ColumnarSnapshot:
+    """Immutable columnar copy of the jobs table with precomputed sort orders.
+
+    Rows written after it was built are passed to ``query`` as a small
+    unsorted tail, filtered row by row and merged into the precomputed order.
+    """
+
+    def __init__(self, rows, texts, collation):
+        self.rows = rows
+        self.collation = collation
+        self.ids = np.fromiter((row['id'] for row in rows), dtype=np.int64, count=len(rows))
+        self.posting_dates = np.array([row['posting_date'] for row in rows], dtype='datetime64[us]') \
+            .astype(np.int64)
+        self.columns = {
+            field: InternedColumn([row[field] for row in rows], collation)
+            for field in SORTED_FIELDS
+        }
+        self.search_columns = {
+            name: SearchColumn([row_texts[position] for row_texts in texts])
+            for position, name in enumerate(SEARCH_FILTERS)
+        }
+
+        # Per sort: row order, and each row's key in that order (ties broken by id)
+        self.permutations = {None: np.argsort(self.ids, kind='stable')}
+        self.sorted_keys = {None: np.zeros(len(rows))}
+        for sort_by, (field, descending) in SORTS.items():
+            keys = self.posting_dates if field == 'posting_date' else self.columns[field].row_ranks()
+            keys = (-keys if descending else keys).astype(np.float64)
+            # lexsort sorts by the last key first; keep id ascending
+            permutation = np.lexsort((self.ids, keys))
+            self.permutations[sort_by] = permutation
+            self.sorted_keys[sort_by] = keys[permutation]
+
+    def query(self, args, sort_by, alive, limit=None, offset=0, tail=()):
+        """Return ``(dumped jobs of the page, total matches)`` for get_jobs filters"""
+        if sort_by not in SORTS:
+            sort_by = None
+        mask = alive.copy()
+
+        job_type = args.get('job_type')
+        if job_type:
+            mask &= self.columns['job_type'].equals(job_type)
+
+        needles = {}
+        for name, column in self.search_columns.items():
+            value = args.get(name)
+            if value:
+                needles[name] = normalize_search_text(value)
+                mask &= column.contains(needles[name])
+
+        permutation = self.permutations[sort_by]
+        matched = mask[permutation]
+        order = permutation[matched]
+        tail = [row for row, texts in tail if self._tail_matches(row, texts, job_type, needles)]
+        if tail:
+            order = self._merge(order, self.sorted_keys[sort_by][matched], sort_by, tail)
+        page = order[offset:offset + limit if limit is not None else None]
+        return [self.rows[i] if i >= 0 else tail[-i - 1] for i in page], len(order)
+
+    def _tail_matches(self, row, texts, job_type, needles):
+        if job_type and self.collation.key(row['job_type']) != self.collation.key(job_type):
+            return False
+        for position, name in enumerate(SEARCH_FILTERS):
+            if name in needles and needles[name] not in texts[position]:
+                return False
+        return True
+
+    def _merge(self, order, keys, sort_by, tail):
+        """Insert tail rows, as negative indices ``-(i + 1)``, into a sorted order"""
+        if sort_by is None:
+            tail_keys = [0.0] * len(tail)
+        else:
+            field, descending = SORTS[sort_by]
+            if field == 'posting_date':
+                tail_keys = [float(np.datetime64(row['posting_date'], 'us').astype(np.int64)) for row in tail]
+            else:
+                tail_keys = [self.columns[field].rank_of(row[field]) for row in tail]
+            if descending:
+                tail_keys = [-key for key in tail_keys]
+
+        # Stable passes: id, then (for values new to the snapshot, which share
+        # a rank) the collation key, then the rank
+        entries = sorted(range(len(tail)), key=lambda i: tail[i]['id'])
+        if sort_by is not None and field != 'posting_date':
+            entries.sort(key=lambda i: self.collation.key(tail[i][field]), reverse=descending)
+        entries.sort(key=lambda i: tail_keys[i])
+
+        ids = self.ids[order]
+        positions = []
+        for i in entries:
+            low = int(np.searchsorted(keys, tail_keys[i], side='left'))
+            high = int(np.searchsorted(keys, tail_keys[i], side='right'))
+            positions.append(low + int(np.searchsorted(ids[low:high], tail[i]['id'])))
+        return np.insert(order, positions, [-(i + 1) for i in entries])
+
+
+class ColumnarJobStore:
+    """In-memory read engine answering get_jobs from a columnar snapshot.
+
+    Rows are the dumped job dicts, so responses are byte-for-byte what the
+    SQL path serialises. The normalised filter columns are kept next to them.
+    Writes in this worker arrive through signals; writes in other workers are
+    pulled from the change feed at most every COLUMNAR_SYNC_SECONDS. A write
+    clears the job's bit in the alive mask and puts its new row in a tail
+    that queries merge in; the snapshot is rebuilt only once the tail grows
+    past TAIL_RATIO of it.
+    """
+
+    def __init__(self, collation, sync_seconds):
+        self.collation = collation
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._rows = None
+        self._token = None
+        self._last_sync = 0.0
+        self._stale = False
+        self._snapshot = None
+        self._alive = None
+        self._row_index = {}
+        self._tail = {}
+        self.builds = 0
+
+    def _sync(self):
+        """Pull changes from the change cursor, or load everything on first use"""
+        try:
+            jobs, deleted, token = changed_jobs(parse_token(self._token))
+        except ChangeTokenExpired:
+            self._rows = None
+            jobs, deleted, token = changed_jobs(None)
+
+        if self._rows is None:
+            self._rows = {}
+            self._snapshot = None
+        # Skip dumping rows the overlapping read repeats
+        jobs = [job for job in jobs if job.id not in self._rows or self._rows[job.id][0]['version'] < job.version]
+        self._apply(_entries(jobs), deleted)
+        self._token = token or self._token
+        self._last_sync = time.monotonic()
+        self._stale = False
+
+    def _apply(self, updated, deleted):
+        for entry in updated:
+            # The change cursor re-delivers this worker's own writes and
+            # overlaps earlier reads; keep only the newest version of a job
+            job_id = entry[0]['id']
+            current = self._rows.get(job_id)
+            if current is None or current[0]['version'] < entry[0]['version']:
+                self._rows[job_id] = entry
+                self._retire(job_id)
+                self._tail[job_id] = entry
+        for job_id in deleted:
+            if self._rows.pop(job_id, None) is not None:
+                self._retire(job_id)
+                self._tail.pop(job_id, None)
+
+    def _retire(self, job_id):
+        """Hide the snapshot's row of a job"""
+        index = self._row_index.get(job_id)
+        if index is not None and self._snapshot is not None:
+            self._alive[index] = False
+
+    def upsert(self, jobs):
+        with self._lock:
+            if self._rows is not None:
+                self._apply(_entries(jobs), [])
+
+    def apply_changes(self, changes):
+        """Merge partial updates (see ``signals.jobs_saved``) into the stored rows.
+
+        A change to a version this store has not seen makes the next query
+        sync from the change feed instead.
+        """
+        with self._lock:
+            if self._rows is None:
+                return
+            entries = []
+            for change in changes:
+                current = self._rows.get(change['id'])
+                if current is None or current[0]['version'] != change['version'] - 1:
+                    self._stale = True
+                    continue
+                row, texts = current
+                texts = tuple((change[column] or '') if column in change else text
+                              for column, text in zip(SEARCH_FILTERS.values(), texts))
+                entries.append((dict(row, **job_list_schema.dump([change])[0]), texts))
+            self._apply(entries, [])
+
+    def remove(self, job_ids):
+        with self._lock:
+            if self._rows is not None:
+                self._apply([], job_ids)
+
+    def query(self, args, sort_by, limit=None, offset=0):
+        """Return ``(dumped jobs of the page, total matches)`` for get_jobs filters"""
+        with self._lock:
+            if self._rows is None or self._stale or time.monotonic() - self._last_sync >= self.sync_seconds:
+                self._sync()
+            if self._snapshot is None or len(self._tail) > TAIL_RATIO * len(self._snapshot.rows):
+                self._build()
+            snapshot, alive, tail = self._snapshot, self._alive.copy(), list(self._tail.values())
+        return snapshot.query(args, sort_by, alive, limit, offset, tail)
+
+    def _build(self):
+        ordered = sorted(self._rows.values(), key=lambda entry: entry[0]['id'])
+        rows = [row for row, _ in ordered]
+        self._snapshot = ColumnarSnapshot(rows, [texts for _, texts in ordered], self.collation)
+        self._alive = np.ones(len(rows), dtype=bool)
+        self._row_index = {row['id']: index for index, row in enumerate(rows)}
+        self._tail = {}
+        self.builds += 1
+
+
+def _entries(jobs):
+    """(dumped row, normalised filter texts) pairs the store keeps per job"""
+    return [
+        (row, tuple(getattr(job, column) or '' for column in SEARCH_FILTERS.values()))
+        for row, job in zip(job_list_schema.dump(jobs), jobs)
+    ]
+
+
+def _on_jobs_saved(app, jobs=(), changes=()):
+    store = app.extensions['columnar_store']
+    if jobs:
+        store.upsert(jobs)
+    if changes:
+        store.apply_changes(changes)
+
+
+def _on_jobs_deleted(app, job_ids):
+    app.extensions['columnar_store'].remove(job_ids)
+
+
+def init_columnar(app):
+    """Attach the columnar read engine when READ_ENGINE is 'columnar'"""
+    if app.config.get('READ_ENGINE') != 'columnar':
+        return
+    dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    app.extensions['columnar_store'] = ColumnarJobStore(Collation(dialect), app.config['COLUMNAR_SYNC_SECONDS'])
+    jobs_saved.connect(_on_jobs_saved, sender=app)
+    jobs_deleted.connect(_on_jobs_deleted, sender=app)
+
+
+def get_columnar_store():
+    """Return the columnar engine of the current app, or None when it is disabled"""
+    return current_app.extensions.get('columnar_store')
+
@@ -0,0 +1,107 @@
+import json
+import time
+from sqlalchemy import select, func
+from sqlalchemy.exc import OperationalError
+from db import db
+
+# Ways get_jobs can report how many jobs match
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+# Rows scanned to measure filter selectivity where the database has no row estimates
+SAMPLE_ROWS = 1000
+
+
+class CountTimeout(Exception):
+    """An exact count ran past its time budget"""
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def _explain_rows(statement):
+    """The planner's row estimate for ``statement`` on MySQL or PostgreSQL"""
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    if _dialect() == 'postgresql':
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params).mappings().all()
+    # rows: rows MySQL expects to read, filtered: percentage left after the WHERE clause
+    return int(sum((row['rows'] or 0) * float(row['filtered'] or 100) / 100 for row in rows))
+
+
+def _sqlite_table_rows(table):
+    """Row count from ANALYZE statistics, or the id range when there are none"""
+    try:
+        stat = db.session.execute(
+            db.text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1'), {'table': table.name}
+        ).scalar()
+    except OperationalError:
+        stat = None
+    if stat:
+        return int(stat.split()[0])
+    low, high = db.session.execute(select(func.min(table.c.id), func.max(table.c.id))).one()
+    return high - low + 1 if high is not None else 0
+
+
+def _sampled_estimate(table, conditions_for):
+    """Table size times the share of a sample of rows that passes the filters"""
+    total = _sqlite_table_rows(table)
+    conditions = conditions_for(table.c)
+    if not conditions or not total:
+        return total
+    sample = select(table).order_by(table.c.id.desc()).limit(SAMPLE_ROWS).subquery()
+    sampled, matched = db.session.execute(select(
+        func.count(),
+        func.count().filter(db.and_(*conditions_for(sample.c)))
+    ).select_from(sample)).one()
+    return round(total * matched / sampled) if sampled else 0
+
+
+def estimate_count(table, conditions_for):
+    """Estimated number of rows of ``table`` matching ``conditions_for(columns)``.
+
+    Uses the planner's statistics on MySQL and PostgreSQL; elsewhere the
+    table size is scaled by the selectivity measured on the newest rows.
+    """
+    if _dialect() in ('mysql', 'postgresql'):
+        return _explain_rows(select(table.c.id).where(*conditions_for(table.c)))
+    return _sampled_estimate(table, conditions_for)
+
+
+def exact_count(table, conditions_for, timeout_seconds):
+    """COUNT(*) of matching rows, or CountTimeout if it takes longer than allowed"""
+    statement = select(func.count()).select_from(table).where(*conditions_for(table.c))
+    timeout_ms = max(int(timeout_seconds * 1000), 1)
+    dialect = _dialect()
+    try:
+        # A savepoint keeps an aborted count from failing the request's transaction
+        with db.session.begin_nested():
+            if dialect == 'mysql':
+                statement = statement.prefix_with(f'/*+ MAX_EXECUTION_TIME({timeout_ms}) */')
+                return db.session.execute(statement).scalar()
+            if dialect == 'postgresql':
+                db.session.execute(db.text(f'SET LOCAL statement_timeout = {timeout_ms}'))
+                count = db.session.execute(statement).scalar()
+                db.session.execute(db.text('SET LOCAL statement_timeout TO DEFAULT'))
+                return count
+            if dialect == 'sqlite':
+                return _sqlite_count_with_deadline(statement, time.monotonic() + timeout_seconds)
+            return db.session.execute(statement).scalar()
+    except OperationalError as e:
+        raise CountTimeout() from e
+
+
+def _sqlite_count_with_deadline(statement, deadline):
+    # SQLite calls the progress handler every N virtual machine steps; a
+    # non-zero return interrupts the running statement
+    connection = db.session.connection().connection.dbapi_connection
+    connection.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+    try:
+        return db.session.execute(statement).scalar()
+    finally:
+        connection.set_progress_handler(None, 0)
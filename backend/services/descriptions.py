@@ -0,0 +1,66 @@
+import click
+from flask import current_app
+from sqlalchemy import inspect, text
+from db import db
+from models.job import JobDescription
+
+
+def has_inline_descriptions(table_name):
+    """True while a table still has the description column from before offloading"""
+    columns = inspect(db.engine).get_columns(table_name)
+    return any(column['name'] == 'description' for column in columns)
+
+
+def offload_descriptions(table_name, batch_size):
+    """Copy inline descriptions of ``table_name`` into job_descriptions, compressed.
+
+    Walks the table in primary key order, one short transaction per batch,
+    and skips jobs that already have a stored description, so it can be
+    re-run after an interruption. Returns the number of copied descriptions.
+    """
+    select_batch = text(
+        f'SELECT id, description FROM {table_name} '
+        'WHERE id > :last_id AND description IS NOT NULL ORDER BY id LIMIT :limit'
+    )
+    copied = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(select_batch, {'last_id': last_id, 'limit': batch_size}).all()
+        if not rows:
+            return copied
+
+        ids = [row.id for row in rows]
+        existing = {job_id for job_id, in db.session.query(JobDescription.job_id)
+                    .filter(JobDescription.job_id.in_(ids))}
+        db.session.bulk_insert_mappings(JobDescription, [
+            dict(JobDescription.pack(row.description), job_id=row.id)
+            for row in rows if row.id not in existing
+        ])
+        db.session.commit()
+        copied += len(rows) - len(existing)
+        last_id = ids[-1]
+
+
+def drop_inline_descriptions(table_name):
+    db.session.execute(text(f'ALTER TABLE {table_name} DROP COLUMN description'))
+    db.session.commit()
+
+
+def register_description_commands(app):
+    """Add ``flask offload-descriptions`` to migrate databases with inline descriptions"""
+
+    @app.cli.command('offload-descriptions')
+    @click.option('--batch-size', type=int, default=None, help='Descriptions copied per transaction.')
+    @click.option('--drop-column', is_flag=True, help='Drop the old description columns afterwards.')
+    def offload_descriptions_command(batch_size, drop_column):
+        """Move job descriptions into the compressed job_descriptions table"""
+        batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+        for table_name in ('jobs', 'jobs_archive'):
+            if not has_inline_descriptions(table_name):
+                click.echo(f'{table_name}: no inline descriptions')
+                continue
+            copied = offload_descriptions(table_name, batch_size)
+            click.echo(f'{table_name}: copied {copied} descriptions')
+            if drop_column:
+                drop_inline_descriptions(table_name)
+                click.echo(f'{table_name}: dropped description column')
@@ -0,0 +1,187 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+
+# Files written per profiled request, by download suffix
+PROFILE_FILES = {
+    'pstats': 'cProfile stats, open with pstats or snakeviz',
+    'folded': 'collapsed stacks for flamegraph.pl or speedscope',
+    'tracemalloc': 'tracemalloc.Snapshot.dump() of allocations made during the request',
+    'json': 'request summary and top allocations',
+}
+
+
+def profile_token_valid(config):
+    """True when the request carries the configured X-Profile-Token"""
+    token = request.headers.get('X-Profile-Token', '')
+    return bool(token) and hmac.compare_digest(token, config['PROFILING_TOKEN'])
+
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval into folded stacks"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """cProfile, stack samples and (if free) tracemalloc for one request"""
+
+    # cProfile and tracemalloc are process-wide (Python 3.12 refuses to
+    # enable a second profiler), so one request at a time is profiled
+    _lock = threading.Lock()
+
+    def __init__(self, config):
+        # Microseconds keep ids in creation order, which pruning relies on
+        self.id = f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}'
+        self.directory = config['PROFILING_DIR']
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), config['PROFILING_STACK_INTERVAL'])
+        self.traces_memory = False
+        self.started = None
+
+    def start(self):
+        """Start collecting; False while another request is being profiled"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        if not tracemalloc.is_tracing():  # Otherwise someone else traces already
+            self.traces_memory = True
+            tracemalloc.start(25)
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profiler.enable()
+        return True
+
+    def stop(self):
+        """Stop collecting and return the allocation snapshot, if any"""
+        try:
+            self.profiler.disable()
+            self.sampler.stop()
+            self.elapsed = time.perf_counter() - self.started
+            if not self.traces_memory:
+                return None
+            try:
+                # Leave out the profiler's own bookkeeping
+                return tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ])
+            finally:
+                tracemalloc.stop()
+        finally:
+            self._lock.release()
+
+    def save(self, snapshot, status):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.id)
+        self.profiler.dump_stats(f'{path}.pstats')
+        with open(f'{path}.folded', 'w') as folded:
+            folded.write(self.sampler.folded())
+
+        summary = {
+            'id': self.id,
+            'method': request.method,
+            'path': request.path,
+            'query': request.query_string.decode('utf-8', 'replace'),
+            'status': status,
+            'duration_ms': round(self.elapsed * 1000, 2),
+            'stack_samples': sum(self.sampler.stacks.values()),
+            'files': ['pstats', 'folded', 'json'],
+        }
+        if snapshot is not None:
+            snapshot.dump(f'{path}.tracemalloc')
+            summary['files'].insert(2, 'tracemalloc')
+            summary['top_allocations'] = [
+                {'line': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:20]
+            ]
+        with open(f'{path}.json', 'w') as summary_file:
+            json.dump(summary, summary_file, indent=2)
+
+
+def _prune(directory, keep):
+    """Delete the oldest profiles beyond ``keep``"""
+    ids = sorted({name.split('.')[0] for name in os.listdir(directory)})
+    for profile_id in ids[:-keep]:
+        for suffix in PROFILE_FILES:
+            try:
+                os.remove(os.path.join(directory, f'{profile_id}.{suffix}'))
+            except FileNotFoundError:
+                pass
+
+
+def init_profiling(app):
+    """Profile requests on demand when PROFILING_ENABLED is set.
+
+    A request is profiled when it carries ``X-Profile-Token`` with the
+    configured token, or at random with PROFILING_SAMPLE_RATE. Nothing is
+    registered while profiling is disabled, so it costs nothing then.
+    """
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+    if not app.config.get('PROFILING_TOKEN'):
+        raise RuntimeError('PROFILING_ENABLED requires PROFILING_TOKEN')
+    # Imported here so the routes only exist while profiling is enabled
+    from routes.profile_routes import profiles_bp
+    app.register_blueprint(profiles_bp)
+    sample_rate = app.config['PROFILING_SAMPLE_RATE']
+
+    @app.before_request
+    def start_profile():
+        if request.blueprint == profiles_bp.name:
+            return
+        if profile_token_valid(current_app.config) or (sample_rate and random.random() < sample_rate):
+            profile = RequestProfile(current_app.config)
+            if profile.start():
+                g.profile = profile
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.save(profile.stop(), response.status_code)
+            _prune(profile.directory, current_app.config['PROFILING_MAX_PROFILES'])
+            response.headers['X-Profile-Id'] = profile.id
+        return response
+
+    @app.teardown_request
+    def discard_profile(error=None):
+        # after_request does not run when the view raised
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.stop()
@@ -0,0 +1,249 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import func
+from db import db
+from models.job import Job, normalize_search_text
+from models.saved_search import SavedSearch, SavedSearchMatch
+from signals import jobs_saved
+
+logger = logging.getLogger(__name__)
+
+# Substring filters are indexed under one n-gram of their value. Any job text
+# containing the value contains that n-gram too, so looking up the n-grams of
+# a job finds every saved search that can possibly match it.
+NGRAM = 3
+
+# Normalised job column scanned by each substring filter, as in get_jobs
+FILTER_TEXTS = {
+    'tag': 'tags_norm',
+    'location': 'location_norm',
+    'search': 'search_blob',
+}
+
+
+def _ngrams(text):
+    """All substrings of length 1..NGRAM of a normalised text"""
+    grams = set()
+    for size in range(1, NGRAM + 1):
+        grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return grams
+
+
+class _Criteria:
+    """Normalised filters of one saved search"""
+    __slots__ = ('id', 'job_type', 'location', 'tag', 'search')
+
+    def __init__(self, saved_search):
+        self.id = saved_search.id
+        self.job_type = saved_search.job_type or None
+        self.location = normalize_search_text(saved_search.location) or None
+        self.tag = normalize_search_text(saved_search.tag) or None
+        self.search = normalize_search_text(saved_search.search) or None
+
+    def anchor(self):
+        """The single reverse-index key this search is filed under"""
+        for name in ('tag', 'search', 'location'):
+            value = getattr(self, name)
+            if value:
+                # The middle n-gram tends to be more selective than a common prefix
+                start = max((len(value) - NGRAM) // 2, 0)
+                return (name, value[start:start + NGRAM])
+        if self.job_type:
+            return ('job_type', self.job_type)
+        return ('all',)
+
+    def matches(self, texts, job_type):
+        """Exact check with get_jobs semantics against normalised job text"""
+        if self.job_type and self.job_type != job_type:
+            return False
+        for name in FILTER_TEXTS:
+            value = getattr(self, name)
+            if value and value not in texts[name]:
+                return False
+        return True
+
+
+class SavedSearchIndex:
+    """Reverse index from job terms, tags and job types to saved searches"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._criteria = {}
+        self._by_key = defaultdict(set)
+        self._stamp = None
+
+    def __len__(self):
+        return len(self._criteria)
+
+    def _table_stamp(self):
+        return tuple(db.session.query(func.count(SavedSearch.id), func.max(SavedSearch.id)).one())
+
+    def sync(self):
+        """Reload saved searches if another worker has changed the table"""
+        stamp = self._table_stamp()
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            self._criteria = {}
+            self._by_key = defaultdict(set)
+            for saved_search in SavedSearch.query.all():
+                self._add(saved_search)
+            self._stamp = stamp
+
+    def add(self, saved_search):
+        with self._lock:
+            self._add(saved_search)
+            self._stamp = self._table_stamp()
+
+    def remove(self, saved_search_id):
+        with self._lock:
+            criteria = self._criteria.pop(saved_search_id, None)
+            if criteria:
+                self._by_key[criteria.anchor()].discard(saved_search_id)
+            self._stamp = self._table_stamp()
+
+    def _add(self, saved_search):
+        criteria = _Criteria(saved_search)
+        self._criteria[criteria.id] = criteria
+        self._by_key[criteria.anchor()].add(criteria.id)
+
+    def match(self, job):
+        """Return ids of saved searches matching a job"""
+        texts = {name: getattr(job, column) or '' for name, column in FILTER_TEXTS.items()}
+        keys = [('all',), ('job_type', job.job_type)]
+        for name, text in texts.items():
+            keys.extend((name, gram) for gram in _ngrams(text))
+
+        matched = []
+        with self._lock:
+            for key in keys:
+                for saved_search_id in self._by_key.get(key, ()):
+                    if self._criteria[saved_search_id].matches(texts, job.job_type):
+                        matched.append(saved_search_id)
+        return matched
+
+
+class _JobTexts:
+    """The fields of a written job that matching reads, detached from the session"""
+    __slots__ = ('id', 'job_type', 'tags_norm', 'location_norm', 'search_blob')
+
+    def __init__(self, job):
+        self.id = job.id
+        self.job_type = job.job_type
+        for column in FILTER_TEXTS.values():
+            setattr(self, column, getattr(job, column))
+
+
+def record_matches(index, jobs):
+    """Store new saved search matches for a batch of created or updated jobs; the caller syncs ``index``"""
+    matched = {job.id: index.match(job) for job in jobs}
+    matched = {job_id: ids for job_id, ids in matched.items() if ids}
+    if not matched:
+        return
+    # One query for the whole batch: existing pairs, and jobs deleted since
+    live = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.id.in_(matched))}
+    existing = set(
+        db.session.query(SavedSearchMatch.job_id, SavedSearchMatch.saved_search_id)
+        .filter(SavedSearchMatch.job_id.in_(live))
+    )
+    for job_id in live:
+        for saved_search_id in matched[job_id]:
+            if (job_id, saved_search_id) not in existing:
+                db.session.add(SavedSearchMatch(saved_search_id=saved_search_id, job_id=job_id))
+    db.session.commit()
+
+
+class MatchQueue:
+    """Matches written jobs in batches on a background thread.
+
+    Writes only queue the job; a worker-local thread waits ``batch_seconds``
+    for more to arrive and records the whole batch in one transaction. With
+    ``batch_seconds`` of 0 jobs are matched as they are queued.
+    """
+
+    def __init__(self, app, index, batch_seconds):
+        self.app = app
+        self.index = index
+        self.batch_seconds = batch_seconds
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._run_lock = threading.Lock()
+        self._thread_pid = None
+
+    def submit(self, jobs=(), changes=()):
+        """Queue written jobs, or partial updates whose matched columns are loaded with the batch"""
+        # A change that leaves every matched column alone cannot add a match
+        changed_ids = [change['id'] for change in changes
+                       if any(column in change for column in ('job_type',) + tuple(FILTER_TEXTS.values()))]
+        if not jobs and not changed_ids:
+            return
+        with self._condition:
+            # A job written twice before the batch runs is matched once, as last written
+            self._pending.update((job.id, _JobTexts(job)) for job in jobs)
+            self._pending.update(dict.fromkeys(changed_ids))
+            if self.batch_seconds and self._thread_pid != os.getpid():
+                # Threads do not survive a fork; each worker starts its own
+                self._thread_pid = os.getpid()
+                threading.Thread(target=self._run, name='saved-search-matcher', daemon=True).start()
+            self._condition.notify()
+        if not self.batch_seconds:
+            self.flush()
+
+    def flush(self):
+        """Match every queued job now, in the calling thread"""
+        with self._run_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            self.index.sync()
+            unloaded = [job_id for job_id, texts in pending.items() if texts is None]
+            if unloaded and len(self.index):
+                # Jobs deleted since they were queued are not found and dropped
+                columns = [getattr(Job, column) for column in FILTER_TEXTS.values()]
+                rows = db.session.query(Job.id, Job.job_type, *columns).filter(Job.id.in_(unloaded))
+                pending.update((row.id, _JobTexts(row)) for row in rows)
+            jobs = [texts for texts in pending.values() if texts is not None]
+            if jobs:
+                record_matches(self.index, jobs)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            # Let the rest of a burst of writes join the batch
+            time.sleep(self.batch_seconds)
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Recording saved search matches failed')
+                finally:
+                    db.session.remove()
+
+
+def _on_jobs_saved(app, jobs=(), changes=()):
+    app.extensions['saved_search_matches'].submit(jobs, changes)
+
+
+def init_saved_search_matcher(app):
+    """Attach the saved search index to the app and match jobs as they are written"""
+    index = app.extensions['saved_search_index'] = SavedSearchIndex()
+    app.extensions['saved_search_matches'] = MatchQueue(app, index, app.config['SAVED_SEARCH_MATCH_BATCH_SECONDS'])
+    jobs_saved.connect(_on_jobs_saved, sender=app)
+
+
+def get_saved_search_index():
+    """Return the saved search index of the current app"""
+    return current_app.extensions['saved_search_index']
+
+
+def get_match_queue():
+    """Return the saved search match queue of the current app"""
+    return current_app.extensions['saved_search_matches']
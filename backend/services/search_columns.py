@@ -0,0 +1,53 @@
+import click
+from flask import current_app
+from db import db
+from models.job import Job, ArchivedJob, JobDescription, normalize_search_text, build_search_blob
+
+
+def backfill_search_columns(model, batch_size, rebuild=False):
+    """Fill search_blob, location_norm and tags_norm for rows written before they existed.
+
+    Walks the table in primary key order, one short transaction per batch.
+    With ``rebuild`` every row is rewritten, e.g. after changing the
+    normalisation rules. Returns the number of updated rows.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        query = db.session.query(model.id, model.title, model.company, model.location,
+                                 model.tags, JobDescription.body) \
+            .outerjoin(JobDescription, JobDescription.job_id == model.id) \
+            .filter(model.id > last_id)
+        if not rebuild:
+            query = query.filter(model.search_blob.is_(None))
+        rows = query.order_by(model.id).limit(batch_size).all()
+        if not rows:
+            return updated
+
+        db.session.bulk_update_mappings(model, [
+            {
+                'id': row.id,
+                'search_blob': build_search_blob(row.title, row.company, row.tags,
+                                                 JobDescription.unpack(row.body)),
+                'location_norm': normalize_search_text(row.location),
+                'tags_norm': normalize_search_text(row.tags),
+            }
+            for row in rows
+        ])
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def register_backfill_command(app):
+    """Add ``flask backfill-search-columns`` to run once after upgrading"""
+
+    @app.cli.command('backfill-search-columns')
+    @click.option('--batch-size', type=int, default=None, help='Rows updated per transaction.')
+    @click.option('--rebuild', is_flag=True, help='Rewrite every row, not only rows missing values.')
+    def backfill_search_columns_command(batch_size, rebuild):
+        """Populate the normalised columns used by list filters"""
+        batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+        for model in (Job, ArchivedJob):
+            updated = backfill_search_columns(model, batch_size, rebuild)
+            click.echo(f'Updated {updated} rows in {model.__tablename__}')
@@ -0,0 +1,410 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from scipy import sparse
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from models.job import Job
+from services.change_feed import ChangeTokenExpired, changed_jobs, parse_token
+from signals import jobs_saved, jobs_deleted
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'our', 'the', 'to', 'we', 'with', 'you', 'your'
+])
+
+# Title and tags describe a posting better than free text, so they count double
+FIELD_WEIGHTS = (('title', 2), ('tags', 2), ('description', 1))
+
+# Rebuild the matrix once this share of its rows belongs to deleted jobs
+COMPACT_RATIO = 0.25
+
+# Number of query rows scored against the matrix in one sparse product
+QUERY_BATCH_SIZE = 256
+
+
+def tokenize_job(job):
+    """Return term counts for a job's title, tags and description"""
+    counts = {}
+    for field, weight in FIELD_WEIGHTS:
+        text = getattr(job, field, None)
+        if not text:
+            continue
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            if token not in STOP_WORDS:
+                counts[token] = counts.get(token, 0) + weight
+    return counts
+
+
+class SimilarityIndex:
+    """Sparse TF-IDF matrix over all jobs with batched cosine top-k lookup.
+
+    Raw term counts are kept in a CSR matrix (one row per job). Deleting a
+    job only masks its row; updates mask the old row and append a new one.
+    IDF weighting and row normalisation are applied in one vectorised pass
+    and cached until the next write.
+
+    The file at ``path`` is a snapshot stamped with the change-feed token
+    it reflects. Loading it replays the changes made since, so workers never
+    rebuild because another worker wrote; writes from other workers arrive
+    the same way, at most every ``sync_seconds``. Writes only mark the index
+    dirty; once ``start_saver`` has been called, a background thread saves
+    it every ``save_seconds``.
+    """
+
+    def __init__(self, path=None, sync_seconds=2.0, save_seconds=30.0):
+        self.path = path
+        self.sync_seconds = sync_seconds
+        self.save_seconds = save_seconds
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._token = None
+        self._last_sync = 0.0
+        self._stale = False
+        self._dirty = False
+        self._saver_pid = None
+        self.rebuilds = 0
+        self._reset()
+
+    def _reset(self):
+        self._terms = []
+        self._vocab = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self._tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._row_ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of = {}
+        self._versions = {}
+        self._pending = []
+        self._weighted = None
+
+    # Loading and persistence
+
+    def ensure_loaded(self):
+        """Load the snapshot and catch up from the change feed, or build from scratch without one"""
+        with self._lock:
+            if self._loaded:
+                return
+            if not (self.path and os.path.exists(self.path) and self._load(self.path)):
+                self.rebuild()
+            self.sync(force=True)
+
+    def _load(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            if 'token' not in data:
+                return False  # Written before snapshots carried a token
+            self._reset()
+            self._token = str(data['token']) or None
+            self._terms = data['terms'].tolist()
+            self._vocab = {term: col for col, term in enumerate(self._terms)}
+            self._df = data['df']
+            self._tf = sparse.csr_matrix(
+                (data['tf_data'], data['tf_indices'], data['tf_indptr']),
+                shape=tuple(data['tf_shape'])
+            )
+            self._row_ids = data['row_ids']
+            self._alive = data['alive']
+            self._versions = dict(zip(data['version_ids'].tolist(), data['versions'].tolist()))
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._row_ids) if self._alive[row]}
+        self._loaded = True
+        return True
+
+    def save(self):
+        """Atomically write a snapshot to the configured path"""
+        if not self.path:
+            return
+        with self._lock:
+            self._flush()
+            # Copy under the lock: writes mutate alive, df and the matrix in place
+            snapshot = {
+                'token': np.array(self._token or ''),
+                'terms': np.array(self._terms, dtype=str),
+                'df': self._df[:len(self._terms)].copy(),
+                'tf_data': self._tf.data.copy(),
+                'tf_indices': self._tf.indices.copy(),
+                'tf_indptr': self._tf.indptr.copy(),
+                'tf_shape': np.array(self._tf.shape),
+                'row_ids': self._row_ids.copy(),
+                'alive': self._alive.copy(),
+                'version_ids': np.fromiter(self._versions.keys(), dtype=np.int64, count=len(self._versions)),
+                'versions': np.fromiter(self._versions.values(), dtype=np.int64, count=len(self._versions)),
+            }
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            self._dirty = True
+            raise
+
+    def _mark_dirty(self):
+        """Have the background saver write a snapshot soon"""
+        self._dirty = True
+
+    def start_saver(self):
+        """Save dirty changes every ``save_seconds`` from a thread of this process.
+
+        Call it in each worker after the fork (gunicorn's post_fork), never in
+        the master: a thread there would not survive the fork, and could hold
+        the index lock while the workers are forked.
+        """
+        if not self.path or not self.save_seconds or self._saver_pid == os.getpid():
+            return
+        self._saver_pid = os.getpid()
+        threading.Thread(target=self._save_periodically, name='similarity-save', daemon=True).start()
+
+    def _save_periodically(self):
+        while True:
+            time.sleep(self.save_seconds)
+            if self._dirty:
+                try:
+                    self.save()
+                except Exception:
+                    logger.exception('Saving the similarity index to %s failed', self.path)
+
+    def save_if_dirty(self):
+        if self._dirty:
+            self.save()
+
+    def rebuild(self):
+        """Build the whole index from the jobs table"""
+        with self._lock:
+            self._reset()
+            # Changes committed while the table is read are replayed by the next sync
+            token = datetime.utcnow().isoformat()
+            # Descriptions live in a side table; load them per chunk, not per job
+            for job in Job.query.options(selectinload(Job.description_record)).yield_per(1000):
+                self._append(job)
+            self._flush()
+            self._token = token
+            self._loaded = True
+            self._last_sync = time.monotonic()
+            self._stale = False
+            self.rebuilds += 1
+            try:
+                self.save()
+            except Exception:
+                logger.exception('Saving the similarity index to %s failed', self.path)
+
+    def sync(self, force=False):
+        """Apply jobs written by other workers, or partially updated here, since the last sync"""
+        with self._lock:
+            if not (force or self._stale) and time.monotonic() - self._last_sync < self.sync_seconds:
+                return
+            try:
+                jobs, deleted, token = changed_jobs(parse_token(self._token), include_description=True)
+            except ChangeTokenExpired:
+                # Only a snapshot older than the tombstone retention gets here
+                self.rebuild()
+                return
+            self._apply(jobs, deleted)
+            self._token = token or self._token
+            self._last_sync = time.monotonic()
+            self._stale = False
+
+    # Incremental updates
+
+    def add_or_update(self, jobs):
+        """Index new jobs or re-index changed ones"""
+        with self._lock:
+            self.ensure_loaded()
+            self._apply(jobs, [])
+
+    def apply_changes(self, changes):
+        """Take partial updates (see ``signals.jobs_saved``) without reading the jobs.
+
+        A change that leaves the indexed text alone only moves the version on.
+        One that rewrites it, or follows a version this index has not seen,
+        makes the next lookup sync from the change feed.
+        """
+        with self._lock:
+            self.ensure_loaded()
+            for change in changes:
+                job_id = change['id']
+                indexed = job_id in self._row_of and self._versions.get(job_id) == change['version'] - 1
+                if indexed and not any(field in change for field, _ in FIELD_WEIGHTS):
+                    self._versions[job_id] = change['version']
+                else:
+                    self._stale = True
+
+    def remove(self, job_ids):
+        """Drop deleted jobs from the index"""
+        with self._lock:
+            self.ensure_loaded()
+            self._apply([], job_ids)
+
+    def _apply(self, jobs, deleted_ids):
+        # The change feed repeats changes and this worker's own writes; skip
+        # versions already indexed
+        jobs = [job for job in jobs if self._versions.get(job.id, 0) < (job.version or 0)]
+        gone = [job_id for job_id in deleted_ids if job_id in self._row_of]
+        if not jobs and not gone:
+            return
+        self._discard([job.id for job in jobs] + gone)
+        for job in jobs:
+            self._append(job)
+        self._after_write()
+
+    def _append(self, job):
+        counts = tokenize_job(job)
+        cols = []
+        for term in counts:
+            col = self._vocab.get(term)
+            if col is None:
+                col = len(self._terms)
+                self._vocab[term] = col
+                self._terms.append(term)
+            cols.append(col)
+        cols = np.array(cols, dtype=np.int32)
+        values = np.array(list(counts.values()), dtype=np.float32)
+
+        if len(self._terms) > len(self._df):
+            # Grow geometrically so a rebuild does not copy the array per new term
+            grown = np.zeros(max(2 * len(self._df), len(self._terms), 1024), dtype=np.int64)
+            grown[:len(self._df)] = self._df
+            self._df = grown
+        self._df[cols] += 1
+
+        self._row_of[job.id] = self._tf.shape[0] + len(self._pending)
+        self._versions[job.id] = job.version or 0
+        self._pending.append((job.id, cols, values))
+
+    def _discard(self, job_ids):
+        rows = [row for row in (self._row_of.pop(job_id, None) for job_id in job_ids) if row is not None]
+        for job_id in job_ids:
+            self._versions.pop(job_id, None)
+        if not rows:
+            return
+        if max(rows) >= self._tf.shape[0]:
+            self._flush()  # Once per batch, not once per job
+        self._alive[rows] = False
+        for row in rows:
+            cols = self._tf.indices[self._tf.indptr[row]:self._tf.indptr[row + 1]]
+            self._df[cols] -= 1
+
+    def _flush(self):
+        """Append pending rows to the CSR matrix and widen it to the vocabulary"""
+        n_terms = len(self._terms)
+        if not self._pending and self._tf.shape[1] == n_terms:
+            return
+        lengths = [len(cols) for _, cols, _ in self._pending]
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        if self._pending:
+            indices = np.concatenate([cols for _, cols, _ in self._pending])
+            data = np.concatenate([values for _, _, values in self._pending])
+            self._row_ids = np.concatenate([self._row_ids, [job_id for job_id, _, _ in self._pending]]).astype(np.int64)
+            self._alive = np.concatenate([self._alive, np.ones(len(self._pending), dtype=bool)])
+        else:
+            indices = np.zeros(0, dtype=np.int32)
+            data = np.zeros(0, dtype=np.float32)
+        new_rows = sparse.csr_matrix((data, indices, indptr), shape=(len(self._pending), n_terms))
+        current = self._tf
+        current.resize((current.shape[0], n_terms))
+        self._tf = sparse.vstack([current, new_rows], format='csr')
+        self._pending = []
+        self._weighted = None
+
+    def _after_write(self):
+        self._weighted = None
+        dead = len(self._alive) - len(self._row_of)
+        if len(self._alive) and dead / len(self._alive) > COMPACT_RATIO:
+            self._compact()
+        self._mark_dirty()
+
+    def _compact(self):
+        """Physically drop masked rows"""
+        self._flush()
+        keep = np.flatnonzero(self._alive)
+        self._tf = self._tf[keep]
+        self._row_ids = self._row_ids[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self._row_ids)}
+        self._weighted = None
+
+    # Queries
+
+    def _weighted_matrix(self):
+        """L2-normalised TF-IDF matrix, cached between writes"""
+        if self._weighted is None:
+            self._flush()
+            n_docs = len(self._row_of)
+            df = self._df[:len(self._terms)]
+            idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+            weighted = self._tf.multiply(idf).tocsr()
+            norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+            inv_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+            self._weighted = sparse.diags(inv_norms.astype(np.float32)) @ weighted
+        return self._weighted
+
+    def most_similar(self, job_ids, k=10):
+        """Return ``{job_id: [(similar_id, score), ...]}`` for each known job id"""
+        with self._lock:
+            self.ensure_loaded()
+            self.sync()
+            matrix = self._weighted_matrix()
+            alive = self._alive
+            row_ids = self._row_ids
+            rows = np.array([self._row_of[job_id] for job_id in job_ids if job_id in self._row_of], dtype=np.int64)
+
+        results = {}
+        k = min(k, max(len(row_ids) - 1, 0))
+        if k == 0 or len(rows) == 0:
+            return {int(row_ids[row]): [] for row in rows}
+
+        for start in range(0, len(rows), QUERY_BATCH_SIZE):
+            batch = rows[start:start + QUERY_BATCH_SIZE]
+            # Sparse product: only jobs sharing a term with the query get a score
+            scores = (matrix[batch] @ matrix.T).tocsr()
+            for i, row in enumerate(batch):
+                cols = scores.indices[scores.indptr[i]:scores.indptr[i + 1]]
+                values = scores.data[scores.indptr[i]:scores.indptr[i + 1]]
+                keep = alive[cols] & (cols != row) & (values > 0)
+                cols, values = cols[keep], values[keep]
+                if len(cols) > k:
+                    top = np.argpartition(-values, k - 1)[:k]
+                    cols, values = cols[top], values[top]
+                order = np.argsort(-values)
+                results[int(row_ids[row])] = [
+                    (int(row_ids[col]), float(score)) for col, score in zip(cols[order], values[order])
+                ]
+        return results
+
+
+def _on_jobs_saved(app, jobs=(), changes=()):
+    index = app.extensions['similarity_index']
+    if jobs:
+        index.add_or_update(jobs)
+    if changes:
+        index.apply_changes(changes)
+
+
+def _on_jobs_deleted(app, job_ids):
+    app.extensions['similarity_index'].remove(job_ids)
+
+
+def init_similarity(app):
+    """Attach a similarity index to the app and keep it in sync with writes"""
+    app.extensions['similarity_index'] = SimilarityIndex(
+        app.config.get('SIMILARITY_INDEX_PATH'),
+        app.config.get('SIMILARITY_SYNC_SECONDS', 2.0),
+        app.config.get('SIMILARITY_SAVE_SECONDS', 30.0)
+    )
+    jobs_saved.connect(_on_jobs_saved, sender=app)
+    jobs_deleted.connect(_on_jobs_deleted, sender=app)
+
+
+def get_similarity_index():
+    """Return the similarity index of the current app"""
+    return current_app.extensions['similarity_index']
@@ -0,0 +1,30 @@
+from blinker import Namespace
+from db import db
+
+# Signals fired by the job routes after a successful commit.
+# Receivers are connected per app, so the sender is always the Flask app.
+_signals = Namespace()
+
+# Sent after jobs are created or updated, with ``jobs=[Job, ...]`` or, for
+# partial updates, ``changes=[dict, ...]``: the columns the UPDATE wrote plus
+# ``id`` and the new ``version``. Receivers accept both; one that needs
+# columns a change lacks catches up from the change feed instead.
+jobs_saved = _signals.signal('jobs-saved')
+
+# Sent with ``job_ids=[int, ...]`` after jobs are deleted
+jobs_deleted = _signals.signal('jobs-deleted')
+
+def send_after_commit(signal, app, **kwargs):
+    """Call every receiver of ``signal``; a receiver that fails is logged, not raised.
+
+    The write is already committed when this runs, so a broken side effect
+    (an index, a notification) must not turn the response into an error or
+    keep the receivers after it from running.
+    """
+    for receiver in list(signal.receivers_for(app)):
+        try:
+            receiver(app, **kwargs)
+        except Exception:
+            # Leave the session usable for the rest of the request
+            db.session.rollback()
+            app.logger.exception('%s receiver %s failed', signal.name, getattr(receiver, '__name__', receiver))
@@ -0,0 +1,32 @@
+"""Fixtures shared by the backend tests: a fresh app on an in-memory
+database per test, its test client, and a helper that creates jobs."""
+import os
+import sys
+import pytest
+
+# The app's modules import each other from backend/, as under wsgi.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+
+@pytest.fixture
+def app():
+    return create_app('testing')
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def create_job(client):
+    """Creates a job through the API and returns it; only a title is needed"""
+    def create(title='Pricing Actuary', **fields):
+        response = client.post('/api/jobs', json=dict(
+            {'title': title, 'company': 'Acme', 'location': 'Remote'}, **fields
+        ))
+        assert response.status_code == 201
+        return response.get_json()['data']
+    return create
@@ -0,0 +1,59 @@
+"""Admission control: limits sized to the worker's threads, and early 503s
+with Retry-After once a class is full or could not finish in time."""
+import threading
+import time
+import pytest
+from services.admission import class_limits
+
+
+@pytest.fixture
+def limiter(app, create_job):
+    create_job('Actuary')
+    return app.extensions['admission_limiters']['expensive']
+
+
+def test_class_limits_fit_the_thread_pool():
+    assert class_limits(4, 0.25, 0.25) == (1, 1)
+    assert class_limits(4, 0.5, 0.25) == (2, 1)
+    assert class_limits(4, 1.0, 0) == (4, 0)
+    # A waiting request holds a thread too
+    assert class_limits(4, 0.75, 0.5) == (3, 1)
+    assert class_limits(1, 0.25, 0.25) == (1, 0)
+
+
+def test_full_queue_is_rejected_with_retry_after(app, client, limiter):
+    assert (limiter.max_concurrent, limiter.max_queue) == (1, 1)
+
+    # One expensive request running and one queued behind it
+    assert limiter.acquire(time.monotonic() + 5)
+    queued = threading.Thread(target=lambda: limiter.acquire(time.monotonic() + 5))
+    queued.start()
+    while limiter.stats()['waiting'] < 1:
+        time.sleep(0.005)
+
+    response = client.get('/api/jobs')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    # Other classes still get through
+    assert client.get('/api/jobs/1').status_code == 200
+
+    limiter.release(0.01)
+    queued.join()
+    limiter.release(0.01)
+    assert client.get('/api/jobs').status_code == 200
+    assert app.extensions['admission_limiters']['expensive'].stats()['rejected'] == 1
+
+
+def test_request_that_could_not_finish_in_time_is_rejected(client, limiter):
+    # Requests of this class take about 2s; one is running
+    limiter.acquire(time.monotonic() + 5)
+    limiter.release(2.0)
+    limiter.acquire(time.monotonic() + 5)
+
+    # Waiting 2s for the slot fits a 2.4s budget, but serving it as well does not
+    started = time.monotonic()
+    response = client.get('/api/jobs', headers={'X-Request-Timeout-Ms': '3000'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+    assert time.monotonic() - started < 1
+    limiter.release(2.0)
@@ -0,0 +1,39 @@
+"""Archiving: expired postings leave the hot table in batches and stay
+reachable with include_archived."""
+from datetime import datetime, timedelta
+from models.job import ArchivedJob, Job, JobTombstone
+from services.archive import archive_expired_jobs
+
+
+def posted(create_job, title, days_old):
+    posting_date = datetime.utcnow() - timedelta(days=days_old)
+    return create_job(title, posting_date=posting_date.isoformat(), description=f'{title} description')['id']
+
+
+def listed_ids(client, **args):
+    response = client.get('/api/jobs', query_string=args)
+    assert response.status_code == 200
+    return sorted(job['id'] for job in response.get_json()['data'])
+
+
+def test_expired_jobs_move_to_the_archive(app, client, create_job):
+    expired = [posted(create_job, f'Expired {n}', 200 + n) for n in range(5)]
+    current = posted(create_job, 'Current', 10)
+
+    with app.app_context():
+        assert archive_expired_jobs(180, batch_size=2) == 5
+        assert sorted(job.id for job in ArchivedJob.query) == expired
+        assert [job.id for job in Job.query] == [current]
+        # Change feeds see archived jobs as deleted
+        assert sorted(tombstone.job_id for tombstone in JobTombstone.query) == expired
+        assert archive_expired_jobs(180, batch_size=2) == 0
+
+    assert listed_ids(client) == [current]
+    assert listed_ids(client, include_archived=1) == sorted(expired + [current])
+    assert client.get(f'/api/jobs/{expired[0]}').status_code == 404
+    archived = client.get(f'/api/jobs/{expired[0]}', query_string={'include_archived': 1})
+    assert archived.get_json()['data']['description'] == 'Expired 0 description'
+
+    stats = client.get('/api/jobs/stats', query_string={'include_archived': 1}).get_json()['data']
+    assert stats['total_jobs'] == 6
+    assert client.get('/api/jobs/stats').get_json()['data']['total_jobs'] == 1
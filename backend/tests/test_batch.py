@@ -0,0 +1,67 @@
+"""Batch endpoints: jobs selected by ids or filter are fetched, updated or
+deleted with one statement, and malformed selections are rejected."""
+import pytest
+from models.job import JobTombstone
+
+
+@pytest.fixture(autouse=True)
+def jobs(create_job):
+    for title, location in (('Pricing Actuary', 'Remote'), ('Reserving Actuary', 'London'),
+                            ('Data Scientist', 'Remote'), ('Actuarial Analyst', 'Chicago, IL')):
+        create_job(title, location=location, description=f'{title} role')
+
+
+def test_get_batch_keeps_order_and_reports_missing(client):
+    body = client.get('/api/jobs/batch?ids=3,1,99&ids=3').get_json()
+    assert [job['id'] for job in body['data']] == [3, 1]
+    assert body['data'][0]['description'] == 'Data Scientist role'
+    assert body['missing'] == [99]
+    assert client.get('/api/jobs/batch?ids=1,x').status_code == 400
+
+
+def test_patch_batch_by_ids_and_filter(client):
+    response = client.patch('/api/jobs/batch', json={'ids': [1, 2], 'changes': {'job_type': 'Contract'}})
+    assert response.get_json()['data'] == {'updated': 2, 'ids': [1, 2]}
+
+    response = client.patch('/api/jobs/batch', json={
+        'filter': {'location': 'remote'}, 'changes': {'title': 'Remote Role', 'description': 'Anywhere'}
+    })
+    assert response.get_json()['data'] == {'updated': 2, 'ids': [1, 3]}
+
+    jobs = {job['id']: job for job in client.get('/api/jobs/batch?ids=1,2,3').get_json()['data']}
+    assert (jobs[1]['title'], jobs[1]['job_type'], jobs[1]['version']) == ('Remote Role', 'Contract', 3)
+    assert (jobs[2]['title'], jobs[2]['job_type'], jobs[2]['version']) == ('Reserving Actuary', 'Contract', 2)
+    assert jobs[3]['description'] == 'Anywhere'
+    # The search column follows the new titles
+    assert sorted(job['id'] for job in client.get('/api/jobs?search=remote role').get_json()['data']) == [1, 3]
+
+
+def test_delete_batch_by_filter_records_tombstones(app, client):
+    response = client.delete('/api/jobs/batch', json={'filter': {'search': 'actuar'}})
+    assert response.get_json()['data'] == {'deleted': 3, 'ids': [1, 2, 4]}
+    assert [job['id'] for job in client.get('/api/jobs').get_json()['data']] == [3]
+    with app.app_context():
+        assert sorted(tombstone.job_id for tombstone in JobTombstone.query) == [1, 2, 4]
+
+
+def test_malformed_batches_are_rejected(app, client):
+    selections = [
+        {'ids': ['abc']},
+        {'ids': 5.5},
+        {'ids': [{'id': 1}]},
+        {'filter': 'remote'},
+        {'filter': ['remote']},
+        {'filter': {'location': 5}},
+        {'filter': {'company': 'Acme'}},
+        {},
+    ]
+    for selection in selections:
+        assert client.patch('/api/jobs/batch', json=dict(selection, changes={'title': 'X'})).status_code == 400
+        assert client.delete('/api/jobs/batch', json=selection).status_code == 400, selection
+    assert client.patch('/api/jobs/batch', json={'ids': [1]}).status_code == 400
+    assert client.patch('/api/jobs/batch', json=[1, 2]).status_code == 400
+    assert client.delete('/api/jobs/batch', json=[1, 2]).status_code == 400
+
+    app.config['BATCH_MAX_JOBS'] = 2
+    assert client.delete('/api/jobs/batch', json={'filter': {'search': 'a'}}).status_code == 400
+    assert len(client.get('/api/jobs').get_json()['data']) == 4
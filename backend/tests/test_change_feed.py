@@ -0,0 +1,140 @@
+"""Change feed: deltas since a token, tombstones for deletes, and writes that
+stay successful when a post-commit side effect fails."""
+import json
+from datetime import datetime, timedelta
+from db import db
+from models.job import Job, JobTombstone
+from services.change_feed import parse_token
+from signals import jobs_saved, jobs_deleted
+
+
+def changes(client, since=None):
+    response = client.get('/api/jobs/changes', query_string={'since': since} if since else {})
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+
+def failing_receiver(app, **kwargs):
+    raise RuntimeError('index is unwritable')
+
+
+def test_changes_since_token(client, create_job):
+    first = create_job('First')
+    full = changes(client)
+    assert [job['id'] for job in full['updated']] == [first['id']]
+
+    second = create_job('Second')
+    client.put(f'/api/jobs/{first["id"]}', json={'title': 'First, renamed'})
+    client.delete(f'/api/jobs/{second["id"]}')
+    delta = changes(client, full['token'])
+    assert [job['title'] for job in delta['updated']] == ['First, renamed']
+    assert delta['deleted'] == [second['id']]
+
+
+def test_invalid_token_is_rejected(client):
+    for token in ('yesterday', '2024-13-01T00:00:00', '2024-01-01T00:00:00+25:00'):
+        assert client.get('/api/jobs/changes', query_string={'since': token}).status_code == 400
+        assert client.get('/api/jobs/changes/stream', query_string={'since': token}).status_code == 400
+
+
+def test_tokens_with_an_offset_are_read_as_utc(client, create_job):
+    create_job('First')
+    token = changes(client)['token']
+    create_job('Second')
+    since = parse_token(token)
+    for aware in (since.isoformat() + 'Z', (since + timedelta(hours=2)).isoformat() + '+02:00'):
+        assert parse_token(aware) == since
+        assert [job['title'] for job in changes(client, aware)['updated']] == \
+            [job['title'] for job in changes(client, token)['updated']]
+    # Old enough to be expired rather than a server error
+    assert client.get('/api/jobs/changes?since=2024-01-01T00:00:00Z').status_code == 410
+
+
+def test_tombstones_are_purged_by_the_archive_command(app, client, create_job):
+    job = create_job()
+    client.delete(f'/api/jobs/{job["id"]}')
+    with app.app_context():
+        db.session.add(JobTombstone(job_id=999, deleted_at=datetime.utcnow() - timedelta(days=31)))
+        db.session.commit()
+    # Deleting does not purge; the scheduled command does
+    create_job('Another')
+    client.delete(f'/api/jobs/{job["id"] + 1}')
+    with app.app_context():
+        assert JobTombstone.query.count() == 3
+
+    result = app.test_cli_runner().invoke(args=['archive-jobs'])
+    assert 'Purged 1 expired change feed tombstones' in result.output
+    with app.app_context():
+        assert sorted(tombstone.job_id for tombstone in JobTombstone.query.all()) == [job['id'], job['id'] + 1]
+
+
+def test_failing_receiver_does_not_fail_committed_writes(app, client, create_job):
+    calls = []
+
+    def recording_receiver(app, **kwargs):
+        calls.append(kwargs)
+
+    for signal in (jobs_saved, jobs_deleted):
+        signal.connect(failing_receiver, sender=app, weak=False)
+        signal.connect(recording_receiver, sender=app, weak=False)
+    try:
+        job = create_job()
+        assert client.put(f'/api/jobs/{job["id"]}', json={'title': 'Renamed'}).status_code == 200
+        assert client.get(f'/api/jobs/{job["id"]}').get_json()['data']['title'] == 'Renamed'
+        assert client.delete(f'/api/jobs/{job["id"]}').status_code == 200
+    finally:
+        for signal in (jobs_saved, jobs_deleted):
+            signal.disconnect(failing_receiver, sender=app)
+            signal.disconnect(recording_receiver, sender=app)
+
+    # Receivers after the failing one still ran, and the tombstone was
+    # committed with the delete rather than by a receiver
+    assert len(calls) == 3
+    with app.app_context():
+        assert [tombstone.job_id for tombstone in JobTombstone.query.all()] == [job['id']]
+
+
+def test_late_commit_is_not_skipped(app, client, create_job):
+    job = create_job()
+    token = changes(client)['token']
+
+    # A write stamped before the token but committed after it was handed out
+    with app.app_context():
+        late = Job.query.get(job['id'])
+        late.title = 'Committed late'
+        late.updated_at = parse_token(token) - timedelta(seconds=1)
+        db.session.commit()
+
+    delta = changes(client, token)
+    assert [item['title'] for item in delta['updated']] == ['Committed late']
+    assert delta['token'] >= token
+
+
+def test_stream_sends_each_change_once(app, client, create_job):
+    app.config.update(CHANGE_FEED_POLL_SECONDS=0.01, CHANGE_FEED_STREAM_SECONDS=0.3)
+    first = create_job('First')
+    token = changes(client)['token']
+    second = create_job('Second')
+    client.delete(f'/api/jobs/{first["id"]}')
+
+    body = client.get('/api/jobs/changes/stream', query_string={'since': token}).get_data(as_text=True)
+    events = [json.loads(line[len('data: '):]) for line in body.splitlines() if line.startswith('data: {"')]
+    assert [job['id'] for event in events for job in event['updated']] == [second['id']]
+    assert [job_id for event in events for job_id in event['deleted']] == [first['id']]
+
+
+def test_streams_per_worker_are_capped(app, client):
+    app.config.update(CHANGE_FEED_MAX_STREAMS=1, CHANGE_FEED_POLL_SECONDS=0.01)
+
+    first = client.get('/api/jobs/changes/stream', buffered=False)
+    assert first.status_code == 200
+    refused = client.get('/api/jobs/changes/stream')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '3'
+
+    # Closing a stream frees its slot
+    first.close()
+    second = client.get('/api/jobs/changes/stream', buffered=False)
+    assert second.status_code == 200
+    second.close()
+    assert app.extensions['change_notifier'].streams == 0
@@ -0,0 +1,93 @@
+"""Single-flight coalescing: identical concurrent list queries share one
+execution, its result and its errors; nothing is cached afterwards."""
+import threading
+import time
+from werkzeug.datastructures import MultiDict
+from services.coalescing import SingleFlight, list_query_key
+
+
+def run_concurrently(single_flight, key, fn, callers):
+    results = [None] * callers
+
+    def call(i):
+        try:
+            results[i] = single_flight.do(key, fn)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def wait_for_followers(single_flight, count):
+    deadline = time.monotonic() + 5
+    while single_flight.coalesced < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_followers_share_the_leaders_result():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def query():
+        runs.append(1)
+        release.wait(5)
+        return ['job']
+
+    threads, results = run_concurrently(single_flight, 'key', query, 5)
+    wait_for_followers(single_flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert results == [['job']] * 5
+    assert single_flight.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0, 'coalescing_ratio': 0.8}
+    # Nothing is cached once the leader is done
+    assert single_flight.do('key', lambda: ['fresh']) == ['fresh']
+
+
+def test_followers_share_the_leaders_error():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def query():
+        release.wait(5)
+        raise RuntimeError('database went away')
+
+    threads, results = run_concurrently(single_flight, 'key', query, 3)
+    wait_for_followers(single_flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_follower_runs_the_query_itself_when_the_leader_is_stuck():
+    single_flight = SingleFlight(follower_timeout=0.05)
+    release = threading.Event()
+    leader, _ = run_concurrently(single_flight, 'key', lambda: release.wait(5) and 'leader', 1)
+    while not single_flight.stats()['in_flight']:
+        time.sleep(0.005)
+
+    assert single_flight.do('key', lambda: 'follower') == 'follower'
+    release.set()
+    leader[0].join()
+    assert single_flight.stats()['executed'] == 2
+
+
+def test_equivalent_list_queries_share_a_key():
+    assert list_query_key(MultiDict({'tag': 'python', 'search': ''})) == \
+        list_query_key(MultiDict([('sort', 'posting_date_desc'), ('tag', 'python')]))
+    assert list_query_key(MultiDict({'tag': 'python'})) != list_query_key(MultiDict({'tag': 'r'}))
+
+
+def test_list_endpoint_reports_coalescing_metrics(client, create_job):
+    create_job('Actuary')
+    for _ in range(2):
+        assert client.get('/api/jobs?tag=').get_json()['count'] == 1
+    stats = client.get('/api/metrics').get_json()['data']['list_coalescing']
+    assert (stats['executed'], stats['coalesced'], stats['in_flight']) == (2, 0, 0)
@@ -0,0 +1,66 @@
+"""List counts: count=exact|estimate|none, free exact counts on the last
+page, and a timed-out exact count falling back to an estimate."""
+import pytest
+from sqlalchemy import true
+from models.job import Job
+from services import counting
+
+
+def seed(create_job, jobs=30):
+    for n in range(jobs):
+        create_job(f'Actuary {n}', location='Remote' if n % 3 else 'London')
+
+
+def listing(client, **args):
+    response = client.get('/api/jobs', query_string=args)
+    assert response.status_code == 200
+    body = response.get_json()
+    return len(body['data']), body['count'], body['count_type']
+
+
+def test_count_modes(client, create_job):
+    seed(create_job)
+    assert listing(client) == (30, 30, 'exact')
+    assert listing(client, limit=10) == (10, 30, 'exact')
+    assert listing(client, limit=10, location='london') == (10, 10, 'exact')
+    assert listing(client, limit=5, location='london', count='none') == (5, None, 'none')
+    # A short page proves the total without counting
+    assert listing(client, limit=10, offset=25, count='estimate') == (5, 30, 'exact')
+    assert listing(client, limit=10, offset=40) == (0, 30, 'exact')
+    assert client.get('/api/jobs?count=maybe').status_code == 400
+
+
+def test_estimates_never_undercount_the_page(client, create_job):
+    seed(create_job)
+    rows, count, count_type = listing(client, limit=10, count='estimate')
+    assert (rows, count_type) == (10, 'estimate')
+    assert 10 <= count <= 60
+    rows, count, count_type = listing(client, limit=4, offset=6, location='london', count='estimate')
+    assert (rows, count_type) == (4, 'estimate')
+    assert count >= 10
+
+
+def test_exact_count_falls_back_to_an_estimate_on_timeout(client, create_job, monkeypatch):
+    seed(create_job)
+
+    def timed_out(*args):
+        raise counting.CountTimeout()
+
+    monkeypatch.setattr('routes.job_routes.exact_count', timed_out)
+    rows, count, count_type = listing(client, limit=10)
+    assert (rows, count_type) == (10, 'estimate')
+    assert count >= 10
+
+
+def test_sqlite_count_is_interrupted_at_its_deadline(app, create_job):
+    seed(create_job, jobs=200)
+    with app.app_context():
+        jobs = Job.__table__
+        assert counting.exact_count(jobs, lambda columns: [columns.id > 0], 5) == 200
+        # 200 ** 3 rows take far longer than a zero budget
+        first, second, third = jobs.alias(), jobs.alias(), jobs.alias()
+        cross_join = first.join(second, true()).join(third, true())
+        with pytest.raises(counting.CountTimeout):
+            counting.exact_count(cross_join, lambda columns: [], 0)
+        # The request can carry on after the aborted count
+        assert counting.exact_count(jobs, lambda columns: [], 5) == 200
@@ -0,0 +1,71 @@
+"""Descriptions stored zlib-compressed in job_descriptions, and the migration
+of databases that still keep them inline in the job tables."""
+import zlib
+from sqlalchemy import text
+from db import db
+from models.job import JobDescription
+from services.descriptions import has_inline_descriptions
+
+OLD_DESCRIPTIONS = {
+    'Pricing Actuary': 'Build pricing models. ' * 50,
+    'Reserving Actuary': 'Quarterly reserve reviews, with ünïcode.',
+    'Data Scientist': None,
+}
+
+
+def add_inline_descriptions(app, create_job):
+    """Jobs as an older version of the app stored them: description in the row"""
+    ids = {title: create_job(title)['id'] for title in OLD_DESCRIPTIONS}
+    with app.app_context():
+        for table_name in ('jobs', 'jobs_archive'):
+            db.session.execute(text(f'ALTER TABLE {table_name} ADD COLUMN description TEXT'))
+        for title, description in OLD_DESCRIPTIONS.items():
+            db.session.execute(text('UPDATE jobs SET description = :description WHERE id = :id'),
+                               {'description': description, 'id': ids[title]})
+        # One job was already copied by an interrupted run
+        db.session.add(JobDescription(job_id=ids['Pricing Actuary'],
+                                      **JobDescription.pack(OLD_DESCRIPTIONS['Pricing Actuary'])))
+        db.session.commit()
+    return ids
+
+
+def test_descriptions_are_stored_compressed(app, client, create_job):
+    description = 'Model mortality and lapse assumptions. ' * 40
+    job = create_job(description=description)
+    with app.app_context():
+        stored = db.session.get(JobDescription, job['id'])
+        assert zlib.decompress(stored.body).decode('utf-8') == description
+        assert stored.size == len(description.encode('utf-8')) > stored.compressed_size == len(stored.body)
+    assert client.get(f'/api/jobs/{job["id"]}').get_json()['data']['description'] == description
+    assert 'description' not in client.get('/api/jobs').get_json()['data'][0]
+
+
+def test_offload_migrates_inline_descriptions(app, client, create_job):
+    ids = add_inline_descriptions(app, create_job)
+
+    result = app.test_cli_runner().invoke(args=['offload-descriptions', '--batch-size', '1', '--drop-column'])
+    assert result.output.splitlines() == [
+        'jobs: copied 1 descriptions',
+        'jobs: dropped description column',
+        'jobs_archive: copied 0 descriptions',
+        'jobs_archive: dropped description column',
+    ]
+    with app.app_context():
+        assert not has_inline_descriptions('jobs') and not has_inline_descriptions('jobs_archive')
+        stored = {row.job_id: row for row in JobDescription.query}
+        assert set(stored) == {ids['Pricing Actuary'], ids['Reserving Actuary']}
+        for title in ('Pricing Actuary', 'Reserving Actuary'):
+            row = stored[ids[title]]
+            assert zlib.decompress(row.body).decode('utf-8') == OLD_DESCRIPTIONS[title]
+            assert (row.size, row.compressed_size) == (len(OLD_DESCRIPTIONS[title].encode('utf-8')), len(row.body))
+
+    for title, description in OLD_DESCRIPTIONS.items():
+        assert client.get(f'/api/jobs/{ids[title]}').get_json()['data']['description'] == description
+    listed = client.get('/api/jobs', query_string={'include': 'description'}).get_json()['data']
+    assert {job['title']: job['description'] for job in listed} == OLD_DESCRIPTIONS
+
+    # Running it again finds nothing left to do
+    assert app.test_cli_runner().invoke(args=['offload-descriptions']).output.splitlines() == [
+        'jobs: no inline descriptions',
+        'jobs_archive: no inline descriptions',
+    ]
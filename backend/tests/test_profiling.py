@@ -0,0 +1,79 @@
+"""On-demand request profiling: token checks, stored profiles and their
+downloads, pruning, one profile at a time, and no hooks while disabled."""
+import pstats
+import pytest
+from app import create_app
+from services.profiling import RequestProfile, init_profiling
+
+TOKEN = {'X-Profile-Token': 'secret'}
+
+
+@pytest.fixture
+def app(app, tmp_path):
+    app.config.update(PROFILING_ENABLED=True, PROFILING_TOKEN='secret', PROFILING_DIR=str(tmp_path),
+                      PROFILING_MAX_PROFILES=3)
+    init_profiling(app)
+    return app
+
+
+def profile_ids(client):
+    response = client.get('/api/profiles', headers=TOKEN)
+    assert response.status_code == 200
+    return [summary['id'] for summary in response.get_json()['data']]
+
+
+def test_profile_routes_require_the_token(client):
+    assert client.get('/api/profiles').status_code == 403
+    assert client.get('/api/profiles', headers={'X-Profile-Token': 'wrong'}).status_code == 403
+    assert client.get('/api/profiles/x.pstats').status_code == 403
+    assert profile_ids(client) == []
+
+
+def test_requests_with_the_token_are_profiled(client, create_job, tmp_path):
+    create_job()
+    assert 'X-Profile-Id' not in client.get('/api/jobs').headers
+
+    response = client.get('/api/jobs', headers=TOKEN)
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    assert profile_ids(client) == [profile_id]
+
+    download = client.get(f'/api/profiles/{profile_id}.pstats', headers=TOKEN)
+    assert download.status_code == 200
+    (tmp_path / 'download.pstats').write_bytes(download.data)
+    functions = pstats.Stats(str(tmp_path / 'download.pstats')).stats
+    assert any(name == 'get_jobs' for _, _, name in functions)
+
+    folded = client.get(f'/api/profiles/{profile_id}.folded', headers=TOKEN)
+    assert folded.status_code == 200
+    for line in folded.get_data(as_text=True).splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert stack and int(count) > 0
+    assert client.get(f'/api/profiles/{profile_id}.exe', headers=TOKEN).status_code == 404
+
+
+def test_only_the_newest_profiles_are_kept(client, tmp_path):
+    profiled = [client.get('/api/jobs', headers=TOKEN).headers['X-Profile-Id'] for _ in range(5)]
+    assert profile_ids(client) == profiled[:1:-1]
+    assert sorted(path.name.split('.')[0] for path in tmp_path.iterdir()) == sorted(profiled[2:] * 4)
+
+
+def test_requests_are_not_profiled_while_another_one_is(client):
+    assert RequestProfile._lock.acquire(blocking=False)
+    try:
+        response = client.get('/api/jobs', headers=TOKEN)
+    finally:
+        RequestProfile._lock.release()
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get('/api/jobs', headers=TOKEN).headers['X-Profile-Id']
+
+
+def test_disabled_profiling_is_a_no_op():
+    app = create_app('testing')
+    assert not app.config['PROFILING_ENABLED'] and 'profiles' not in app.blueprints
+    client = app.test_client()
+    response = client.get('/api/jobs', headers=TOKEN)
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert client.get('/api/profiles', headers=TOKEN).status_code == 404
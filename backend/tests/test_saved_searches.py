@@ -0,0 +1,59 @@
+"""Saved searches: jobs matched with list-filter semantics, once per pair,
+in batches recorded off the request path."""
+from services.saved_search_matcher import MatchQueue
+
+
+def save_search(client, **filters):
+    response = client.post('/api/saved-searches', json=filters)
+    assert response.status_code == 201
+    return response.get_json()['data']['id']
+
+
+def matched_ids(client, search_id):
+    response = client.get(f'/api/saved-searches/{search_id}/matches')
+    assert response.status_code == 200
+    return [job['id'] for job in response.get_json()['data']]
+
+
+def test_jobs_match_saved_searches_once(client, create_job):
+    remote_pricing = save_search(client, search='pricing', location='remote')
+    contract = save_search(client, job_type='Contract')
+
+    pricing = create_job('Pricing Actuary')
+    create_job('Pricing Actuary', location='London')
+    reserving = create_job('Reserving Actuary', job_type='Contract')
+    assert matched_ids(client, remote_pricing) == [pricing['id']]
+    assert matched_ids(client, contract) == [reserving['id']]
+
+    # Updating a matched job does not match it again; a job that starts
+    # matching after an update does
+    client.put(f'/api/jobs/{pricing["id"]}', json={'title': 'Senior Pricing Actuary'})
+    client.put(f'/api/jobs/{reserving["id"]}', json={'title': 'Pricing and Reserving Actuary'})
+    assert matched_ids(client, remote_pricing) == [pricing['id'], reserving['id']]
+
+
+def test_patched_jobs_are_matched(client, create_job):
+    search_id = save_search(client, search='pricing', location='london')
+    job = create_job('Pricing Actuary')
+    client.patch(f'/api/jobs/{job["id"]}', json={'url': 'https://example.com/1'})
+    assert matched_ids(client, search_id) == []
+    # Only location is patched; the title it is matched on is loaded with the batch
+    client.patch(f'/api/jobs/{job["id"]}', json={'location': 'London'})
+    assert matched_ids(client, search_id) == [job['id']]
+
+
+def test_matches_are_recorded_in_batches_off_the_request_path(app, client, create_job):
+    # Long enough that the background thread never runs during the test
+    queue = app.extensions['saved_search_matches'] = MatchQueue(app, app.extensions['saved_search_index'], 60)
+    search_id = save_search(client, search='actuary')
+
+    first = create_job('Pricing Actuary')
+    second = create_job('Reserving Actuary')
+    client.put(f'/api/jobs/{first["id"]}', json={'title': 'Senior Pricing Actuary'})
+    client.delete(f'/api/jobs/{second["id"]}')
+    assert matched_ids(client, search_id) == []
+
+    with app.app_context():
+        queue.flush()
+    # The deleted job is skipped, the updated one matched once
+    assert matched_ids(client, search_id) == [first['id']]
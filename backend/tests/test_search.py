@@ -0,0 +1,57 @@
+"""Text filters on the normalised columns: case and accent folding, literal
+wildcards, and the backfill for rows written before the columns existed."""
+from sqlalchemy import update
+from db import db
+from models.job import Job
+
+
+def titles(client, **query):
+    response = client.get('/api/jobs', query_string=query)
+    assert response.status_code == 200
+    return sorted(job['title'] for job in response.get_json()['data'])
+
+
+def test_filters_ignore_case_and_accents(client, create_job):
+    create_job('Senior ACTUARY', company='Zürich Insurance', location='Zürich', tags='Python,R',
+               description='Stochastic modelling')
+    create_job('Data Scientist', company='Acme', location='New York, NY', tags='SQL')
+
+    for search in ('zurich', 'ZURICH', 'Zürich', 'zÜrich', 'actuary', 'Actuary', 'STOCHASTIC'):
+        assert titles(client, search=search) == ['Senior ACTUARY'], search
+    for location in ('zurich', 'ZÜRICH'):
+        assert titles(client, location=location) == ['Senior ACTUARY'], location
+    assert titles(client, tag='PYTHON') == ['Senior ACTUARY']
+    assert titles(client, location='new york') == ['Data Scientist']
+
+
+def test_wildcards_are_matched_literally(client, create_job):
+    create_job('100% Remote Actuary')
+    create_job('Analyst_2')
+    create_job('Analyst 2')
+    assert titles(client, search='100%') == ['100% Remote Actuary']
+    assert titles(client, search='%') == ['100% Remote Actuary']
+    assert titles(client, search='analyst_') == ['Analyst_2']
+
+
+def test_backfill_fills_existing_rows(app, client, create_job):
+    create_job('Zürich Pricing Actuary', location='Zürich', tags='Life,Pricing', description='Mortality')
+    create_job('Data Scientist', location='Remote', tags='Python')
+    with app.app_context():
+        expected = {job.id: (job.search_blob, job.location_norm, job.tags_norm) for job in Job.query}
+        # Rows as an older version of the app left them
+        db.session.execute(update(Job).values(search_blob=None, location_norm=None, tags_norm=None))
+        db.session.commit()
+    assert titles(client, search='zurich') == []
+
+    result = app.test_cli_runner().invoke(args=['backfill-search-columns', '--batch-size', '1'])
+    assert 'Updated 2 rows in jobs\n' in result.output
+    with app.app_context():
+        assert {job.id: (job.search_blob, job.location_norm, job.tags_norm) for job in Job.query} == expected
+    assert titles(client, search='zurich') == ['Zürich Pricing Actuary']
+    assert titles(client, search='mortality', location='ZURICH', tag='life') == ['Zürich Pricing Actuary']
+    assert titles(client, tag='python') == ['Data Scientist']
+
+    # Nothing is left to fill; --rebuild rewrites every row
+    assert 'Updated 0 rows in jobs\n' in app.test_cli_runner().invoke(args=['backfill-search-columns']).output
+    rebuilt = app.test_cli_runner().invoke(args=['backfill-search-columns', '--rebuild']).output
+    assert 'Updated 2 rows in jobs\n' in rebuilt
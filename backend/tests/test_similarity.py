@@ -0,0 +1,81 @@
+"""Similar jobs: ranking, snapshots shared between workers, and writes that
+do not depend on the index file."""
+import threading
+from services.similarity import SimilarityIndex
+
+
+def test_similar_jobs_are_ranked_by_score(client, create_job):
+    life = create_job('Life Pricing Actuary', tags='life,pricing,actuarial')
+    health = create_job('Health Pricing Actuary', tags='health,pricing,actuarial')
+    reserving = create_job('Reserving Actuary', tags='reserving')
+    create_job('Frontend Developer', tags='react')
+
+    data = client.get(f'/api/jobs/{life["id"]}/similar').get_json()['data']
+    assert [job['id'] for job in data] == [health['id'], reserving['id']]
+    assert data[0]['similarity'] > data[1]['similarity'] > 0
+    assert client.get('/api/jobs/999/similar').status_code == 404
+
+
+def test_workers_share_snapshot_without_rebuilding(app, client, create_job, tmp_path):
+    path = str(tmp_path / 'similarity_index.npz')
+    writer = app.extensions['similarity_index'] = SimilarityIndex(path, sync_seconds=0, save_seconds=0)
+    first = create_job('Pricing Actuary')
+    second = create_job('Senior Pricing Actuary')
+    with app.app_context():
+        writer.save()
+
+        # Another worker starts from the snapshot, then sees later writes
+        # through the change feed
+        reader = SimilarityIndex(path, sync_seconds=0, save_seconds=0)
+        reader.ensure_loaded()
+        third = create_job('Pricing Actuary, Motor')
+        client.delete(f'/api/jobs/{second["id"]}')
+        similar = dict(reader.most_similar([first['id']])[first['id']])
+
+    assert list(similar) == [third['id']]
+    assert (writer.rebuilds, reader.rebuilds) == (1, 0)
+
+
+def test_unwritable_index_path_does_not_fail_writes(app, client, create_job, tmp_path):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    app.extensions['similarity_index'] = SimilarityIndex(str(blocker / 'similarity_index.npz'), save_seconds=0)
+
+    first = create_job('Pricing Actuary')
+    second = create_job('Pricing Actuary, Motor')
+    assert client.put(f'/api/jobs/{second["id"]}', json={'title': 'Senior Pricing Actuary'}).status_code == 200
+    data = client.get(f'/api/jobs/{first["id"]}/similar').get_json()['data']
+    assert [job['id'] for job in data] == [second['id']]
+
+
+def test_patches_reach_the_index_without_rereading_the_job(app, client, create_job):
+    app.extensions['similarity_index'].sync_seconds = 3600
+    pricing = create_job('Pricing Actuary')
+    other = create_job('Frontend Developer')
+    assert client.get(f'/api/jobs/{pricing["id"]}/similar').get_json()['data'] == []
+
+    # New text is picked up from the change feed on the next lookup
+    client.patch(f'/api/jobs/{other["id"]}', json={'title': 'Senior Pricing Actuary'})
+    data = client.get(f'/api/jobs/{pricing["id"]}/similar').get_json()['data']
+    assert [job['id'] for job in data] == [other['id']]
+    # Other columns only move the indexed version on
+    client.patch(f'/api/jobs/{other["id"]}', json={'location': 'London'})
+    assert app.extensions['similarity_index']._versions[other['id']] == 3
+
+
+def test_writes_do_not_start_the_saver_before_the_fork(app, client, create_job, tmp_path):
+    index = app.extensions['similarity_index'] = SimilarityIndex(str(tmp_path / 'similarity_index.npz'))
+
+    def savers():
+        return [thread for thread in threading.enumerate() if thread.name == 'similarity-save']
+
+    # Loaded in the master, as warm_up_shared does, then written to
+    with app.app_context():
+        index.ensure_loaded()
+    create_job('Pricing Actuary')
+    assert savers() == [] and index._dirty
+
+    # Each worker starts its own after the fork, once
+    index.start_saver()
+    index.start_saver()
+    assert len(savers()) == 1
@@ -0,0 +1,101 @@
+"""Optimistic concurrency: ETags on reads and writes, and 409 instead of a
+lost update when a write names a version that is no longer current."""
+import pytest
+from sqlalchemy import event
+from db import db
+
+
+@pytest.fixture
+def job_id(create_job):
+    return create_job(description='Long text')['id']
+
+
+def test_patch_returns_the_new_version_without_the_whole_job(client, job_id):
+    etag = client.get(f'/api/jobs/{job_id}').headers['ETag']
+    assert etag == f'"{job_id}-1"'
+
+    response = client.patch(f'/api/jobs/{job_id}', json={'title': 'Senior Pricing Actuary'},
+                            headers={'If-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{job_id}-2"'
+    assert response.get_json()['data'] == {'id': job_id, 'version': 2, 'title': 'Senior Pricing Actuary'}
+
+    # Unconditional patches still report the version they produced
+    response = client.patch(f'/api/jobs/{job_id}', json={'location': 'London'})
+    assert response.get_json()['data']['version'] == 3
+    assert response.headers['ETag'] == f'"{job_id}-3"'
+    job = client.get(f'/api/jobs/{job_id}').get_json()['data']
+    assert (job['title'], job['location'], job['description'], job['version']) == \
+        ('Senior Pricing Actuary', 'London', 'Long text', 3)
+
+
+def test_patch_is_a_single_update(app, client, job_id):
+    client.get(f'/api/jobs/{job_id}/similar')  # Load the similarity index first
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(' '.join(statement.split()[:2]))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        # Guarded and leaving searched columns alone: nothing but the UPDATE
+        client.patch(f'/api/jobs/{job_id}', json={'url': 'https://example.com/1'}, headers={'If-Match': f'"{job_id}-1"'})
+        assert statements == ['UPDATE jobs']
+        # A searched column: one locked read of the other blob sources first
+        statements.clear()
+        client.patch(f'/api/jobs/{job_id}', json={'title': 'Reserving Actuary'}, headers={'If-Match': f'"{job_id}-2"'})
+        assert statements[:2] == ['SELECT jobs.version', 'UPDATE jobs']
+        assert 'SELECT jobs.id' not in statements  # No re-read for the receivers
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_patched_search_text_keeps_the_other_fields(client, job_id):
+    client.patch(f'/api/jobs/{job_id}', json={'title': 'Réserving Actuary'})
+    client.patch(f'/api/jobs/{job_id}', json={'description': 'Motor pricing'})
+    for search, count in (('reserving', 1), ('acme', 1), ('motor', 1), ('long text', 0), ('pricing actuary', 0)):
+        assert client.get('/api/jobs', query_string={'search': search}).get_json()['count'] == count, search
+
+
+def test_stale_writes_get_409_with_the_current_version(client, job_id):
+    client.patch(f'/api/jobs/{job_id}', json={'title': 'Renamed'})
+
+    for response in (
+        client.patch(f'/api/jobs/{job_id}', json={'title': 'Lost'}, headers={'If-Match': f'"{job_id}-1"'}),
+        client.patch(f'/api/jobs/{job_id}', json={'title': 'Lost', 'version': 1}),
+        client.put(f'/api/jobs/{job_id}', json={'title': 'Lost'}, headers={'If-Match': f'"{job_id}-1"'}),
+        client.put(f'/api/jobs/{job_id}', json={'title': 'Lost', 'version': '1'}),
+        client.delete(f'/api/jobs/{job_id}', headers={'If-Match': f'"{job_id}-1"'}),
+        # An ETag of another job never matches
+        client.patch(f'/api/jobs/{job_id}', json={'title': 'Lost'}, headers={'If-Match': '"99-2"'}),
+    ):
+        assert response.status_code == 409
+        assert response.get_json()['current_version'] == 2
+        assert response.headers['ETag'] == f'"{job_id}-2"'
+    assert client.get(f'/api/jobs/{job_id}').get_json()['data']['title'] == 'Renamed'
+
+    assert client.patch('/api/jobs/99', json={'title': 'Gone'}).status_code == 404
+    assert client.patch('/api/jobs/99', json={'title': 'Gone', 'version': 1}).status_code == 404
+
+
+def test_put_honours_if_match_and_returns_an_etag(client, job_id):
+    response = client.put(f'/api/jobs/{job_id}', json={'title': 'Renamed'}, headers={'If-Match': f'"{job_id}-1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{job_id}-2"'
+    assert response.get_json()['data']['version'] == 2
+
+    response = client.put(f'/api/jobs/{job_id}', json={'title': 'Again', 'version': 2})
+    assert response.headers['ETag'] == f'"{job_id}-3"'
+
+
+def test_invalid_versions_are_rejected(client, job_id):
+    for version in ('abc', -1, 1.5, True):
+        for method in (client.patch, client.put):
+            response = method(f'/api/jobs/{job_id}', json={'title': 'X', 'version': version})
+            assert response.status_code == 400, (method, version)
+            assert 'version' in response.get_json()['errors']
+    assert client.patch(f'/api/jobs/{job_id}', json=['title']).status_code == 400
+    assert client.put(f'/api/jobs/{job_id}', json=['title']).status_code == 400
+    assert client.get(f'/api/jobs/{job_id}').get_json()['data']['version'] == 1
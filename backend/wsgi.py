@@ -0,0 +1,67 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is created once here. With ``preload_app`` gunicorn imports this
+module in the master, so workers inherit the loaded code and read-mostly
+caches as shared copy-on-write pages instead of building their own.
+"""
+import gc
+import os
+from sqlalchemy import text
+from app import create_app
+from db import db
+from services.similarity import get_similarity_index
+from services.saved_search_matcher import get_match_queue
+from services.columnar import get_columnar_store
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'))
+
+def warm_up_shared(app):
+    """Load caches every worker reads, once, before the workers are forked"""
+    with app.app_context():
+        get_similarity_index().ensure_loaded()
+        db.session.remove()
+        # Connections must not cross the fork; the pool is refilled per worker
+        db.engine.dispose()
+    # Objects created so far are never freed; keeping them out of the
+    # collector stops it from touching (and so copying) their pages
+    gc.freeze()
+
+def warm_up_worker(app, connections):
+    """Open the worker's own pool connections and fill its per-process caches"""
+    with app.app_context():
+        # Threads do not survive the fork, so each worker starts its own saver
+        get_similarity_index().start_saver()
+
+        # Drop anything inherited from the master without closing its sockets
+        db.engine.dispose(close=False)
+        opened = [db.engine.connect() for _ in range(connections)]
+        for connection in opened:
+            connection.execute(text('SELECT 1'))
+            connection.close()
+
+        columnar_store = get_columnar_store()
+        if columnar_store:
+            columnar_store.query({}, None)
+        db.session.remove()
+
+def shut_down_worker(app):
+    """End event streams so in-flight requests can finish within the grace period"""
+    app.extensions['change_notifier'].close()
+
+def close_worker(app):
+    """Flush per-worker state that would otherwise be lost, then close the database pool"""
+    with app.app_context():
+        # Record matches still waiting for their batch
+        try:
+            get_match_queue().flush()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('Recording saved search matches failed')
+        # Keep this worker's index changes for the next start
+        try:
+            get_similarity_index().save_if_dirty()
+        except Exception:
+            app.logger.exception('Saving the similarity index failed')
+        db.engine.dispose()
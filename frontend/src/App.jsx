@@ -53,9 +53,16 @@ function App() {
     setShowJobForm(true);
   };
 
-  const handleEditJob = (job) => {
-    setEditingJob(job);
-    setShowJobForm(true);
+  const handleEditJob = async (job) => {
+    try {
+      setError('');
+      // List rows have no description; edit the full job so saving keeps it
+      const response = await jobAPI.getJob(job.id);
+      setEditingJob(response.data);
+      setShowJobForm(true);
+    } catch (err) {
+      setError(err.message || 'Failed to load job');
+    }
   };
 
   const handleDeleteJob = async (jobId) => {
@@ -1,7 +1,28 @@
-import React from 'react';
+import React, { useState } from 'react';
 import DeleteJob from './DeleteJob';
+import { jobAPI } from '../api.jsx';
 
 const JobCard = ({ job, onEdit, onDelete }) => {
+  // The list omits descriptions; fetch this job's only when asked to show it
+  const [description, setDescription] = useState(null);
+  const [loadingDescription, setLoadingDescription] = useState(false);
+
+  const toggleDescription = async () => {
+    if (description !== null) {
+      setDescription(null);
+      return;
+    }
+    try {
+      setLoadingDescription(true);
+      const response = await jobAPI.getJob(job.id);
+      setDescription(response.data.description || 'No description');
+    } catch (error) {
+      setDescription('Description not available');
+    } finally {
+      setLoadingDescription(false);
+    }
+  };
+
   const formatDate = (dateString) => {
     try {
       const date = new Date(dateString);
@@ -49,9 +70,9 @@ const JobCard = ({ job, onEdit, onDelete }) => {
         </div>
       )}
 
-      {job.description && (
+      {description !== null && (
         <div className="job-description">
-          {job.description}
+          {description}
         </div>
       )}
 
@@ -66,6 +87,13 @@ const JobCard = ({ job, onEdit, onDelete }) => {
             View Original
           </a>
         )}
+        <button
+          className="btn btn-view"
+          onClick={toggleDescription}
+          disabled={loadingDescription}
+        >
+          {description !== null ? 'Hide Description' : 'Description'}
+        </button>
         <button
           className="btn btn-edit"
           onClick={() => onEdit(job)}
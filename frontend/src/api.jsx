@@ -13,6 +13,8 @@ const api = axios.create({
 api.interceptors.request.use(
   (config) => {
     console.log(`Making ${config.method.toUpperCase()} request to ${config.url}`);
+    // Lets the server reject requests it cannot answer before we give up
+    config.headers['X-Request-Timeout-Ms'] = config.timeout;
     return config;
   },
   (error) => {